@@ -0,0 +1,15 @@
+"""
+Endpoint benchmarks for the blog API.
+
+Run from the backend directory:
+
+    python -m benchmarks.run                      # in-process through the WSGI app
+    python -m benchmarks.run --mode asgi          # in-process through the ASGI app
+    python -m benchmarks.run --mode http --url http://127.0.0.1:8000
+
+The benchmark uses its own SQLite database (benchmarks/bench.sqlite3, see
+benchmarks/settings.py) and seeds it on first use. To benchmark a running
+server, start it with the same settings so both sides see the same data:
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings python manage.py runserver --noreload
+"""
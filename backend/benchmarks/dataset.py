@@ -0,0 +1,26 @@
+"""Deterministic benchmark dataset (built with the generate_data command)."""
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+User = get_user_model()
+
+BENCH_EMAIL = 'bench@example.com'
+BENCH_PASSWORD = 'Bench-pass-2024!'
+
+
+def is_seeded():
+    return User.objects.filter(email=BENCH_EMAIL).exists()
+
+
+def seed(users=200, blogs=2000, seed=42):
+    """Generate the dataset and the (staff) user the benchmark logs in as."""
+    call_command(
+        'generate_data',
+        users=users,
+        blogs=blogs,
+        seed=seed,
+        prefix='bench',
+        verbosity=0,
+    )
+    # Staff, so the admin-only hashing-stats route can be measured too.
+    User.objects.create_user(email=BENCH_EMAIL, name='Bench User', password=BENCH_PASSWORD, is_staff=True)
@@ -0,0 +1,106 @@
+"""
+Password hashing cost and isolation benchmark.
+
+    python -m benchmarks.hashing [--iterations 100000 300000 600000]
+                                 [--burst 16] [--requests 200]
+
+First measures the time of one PBKDF2 hash per iteration count. Then it
+measures blog read latency alone and again while `--burst` threads keep
+logging in, and reports how many logins were rejected by the bounded
+hashing pool (users/hashing.py).
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+
+def hash_cost(iterations, rounds):
+    from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+    hasher = PBKDF2PasswordHasher()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        hasher.encode('benchmark-password', hasher.salt(), iterations)
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark password hashing cost and isolation.')
+    parser.add_argument('--iterations', type=int, nargs='*', default=[100000, 300000, 600000, 1000000],
+                        help='PBKDF2 iteration counts to time.')
+    parser.add_argument('--rounds', type=int, default=5, help='Hashes timed per iteration count.')
+    parser.add_argument('--burst', type=int, default=16, help='Threads logging in during the burst phase.')
+    parser.add_argument('--requests', type=int, default=200, help='Blog reads measured per phase.')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent readers.')
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+
+    from users.hashing import hashing_pool, hashing_setting
+
+    from . import dataset
+    from .run import summarize
+    from .runner import WSGITransport, run_threaded
+    from .scenarios import SCENARIOS, Fixtures
+
+    print('PBKDF2-SHA256 cost per hash:')
+    for iterations in args.iterations:
+        print(f'  {iterations:>9} iterations: {hash_cost(iterations, args.rounds):8.1f} ms')
+    print(f"  (configured: {hashing_setting('ITERATIONS')})\n")
+
+    call_command('migrate', verbosity=0)
+    if not dataset.is_seeded():
+        print('Seeding benchmark dataset...', file=sys.stderr)
+        dataset.seed()
+
+    transport = WSGITransport()
+    fixtures = Fixtures.load('hashing')
+    read = next(scenario for scenario in SCENARIOS if scenario.name == 'blog-detail')
+
+    baseline = summarize(run_threaded(transport, read, fixtures, args.requests, args.concurrency))
+
+    stop = threading.Event()
+    logins = {}
+    lock = threading.Lock()
+
+    def login_loop():
+        try:
+            while not stop.is_set():
+                status, _, _ = transport.request(
+                    'POST', '/api/auth/login/',
+                    {'email': dataset.BENCH_EMAIL, 'password': dataset.BENCH_PASSWORD},
+                )
+                with lock:
+                    logins[status] = logins.get(status, 0) + 1
+        finally:
+            transport.close()
+
+    hashing_pool.reset_stats()
+    burst = [threading.Thread(target=login_loop) for _ in range(args.burst)]
+    for thread in burst:
+        thread.start()
+    time.sleep(0.5)
+    during = summarize(run_threaded(transport, read, fixtures, args.requests, args.concurrency))
+    stop.set()
+    for thread in burst:
+        thread.join()
+
+    print(f"{'blog-detail':<24} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for label, stats in (('alone', baseline), (f'during {args.burst}-thread login burst', during)):
+        print(
+            f"{label:<24} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} "
+            f"{stats['p99_ms']:>8.1f} {stats['throughput_rps']:>8.1f}"
+        )
+    print(f'\nLogin responses during the burst: {dict(sorted(logins.items()))}')
+    print(f'Hashing pool: {hashing_pool.stats()}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+Benchmark every blog and user API route.
+
+    python -m benchmarks.run [--mode wsgi|asgi|http] [--url URL]
+                             [--requests N] [--concurrency C] [--only NAME ...]
+                             [--save-baseline FILE] [--baseline FILE]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import uuid
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(result):
+    latencies = sorted(sample.seconds * 1000 for sample in result.samples)
+    queries = [sample.queries for sample in result.samples if sample.queries is not None]
+    statuses = {}
+    for sample in result.samples:
+        statuses[str(sample.status)] = statuses.get(str(sample.status), 0) + 1
+    return {
+        'requests': len(result.samples),
+        'errors': result.errors,
+        'statuses': statuses,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'mean_ms': sum(latencies) / len(latencies) if latencies else None,
+        'throughput_rps': len(result.samples) / result.wall_seconds if result.wall_seconds else None,
+        'queries_mean': sum(queries) / len(queries) if queries else None,
+        'queries_max': max(queries) if queries else None,
+    }
+
+
+def fmt(value, digits=1):
+    if value is None:
+        return '-'
+    return f'{value:.{digits}f}' if isinstance(value, float) else str(value)
+
+
+def print_report(results, stream=sys.stdout):
+    header = f"{'endpoint':<24} {'reqs':>5} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'queries':>8}"
+    print(header, file=stream)
+    print('-' * len(header), file=stream)
+    for name, stats in results.items():
+        print(
+            f"{name:<24} {stats['requests']:>5} {stats['errors']:>4} "
+            f"{fmt(stats['p50_ms']):>8} {fmt(stats['p95_ms']):>8} {fmt(stats['p99_ms']):>8} "
+            f"{fmt(stats['throughput_rps']):>8} {fmt(stats['queries_mean']):>8}",
+            file=stream,
+        )
+
+
+def change(current, previous):
+    if current is None or previous in (None, 0):
+        return None
+    return (current - previous) / previous * 100
+
+
+def compare(results, baseline, threshold, stream=sys.stdout):
+    """Print the difference against a baseline. Returns the names of regressed endpoints."""
+    regressions = []
+    print(f"\nCompared with baseline ({baseline['meta'].get('created', 'unknown date')}):", file=stream)
+    header = f"{'endpoint':<24} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>9} {'queries':>9}"
+    print(header, file=stream)
+    print('-' * len(header), file=stream)
+    for name, stats in results.items():
+        before = baseline['results'].get(name)
+        if before is None:
+            print(f'{name:<24} (new endpoint)', file=stream)
+            continue
+        deltas = {key: change(stats[key], before[key]) for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps')}
+        query_delta = None
+        if stats['queries_mean'] is not None and before['queries_mean'] is not None:
+            query_delta = stats['queries_mean'] - before['queries_mean']
+
+        regressed = (
+            any((deltas[key] or 0) > threshold for key in ('p50_ms', 'p95_ms')) or
+            (deltas['throughput_rps'] or 0) < -threshold or
+            (query_delta or 0) > 0
+        )
+        if regressed:
+            regressions.append(name)
+        cells = ' '.join(
+            f"{fmt(deltas[key], 0) + '%' if deltas[key] is not None else '-':>9}"
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps')
+        )
+        queries = f'{query_delta:+.1f}' if query_delta is not None else '-'
+        print(f"{name:<24} {cells} {queries:>9}{'  REGRESSION' if regressed else ''}", file=stream)
+    return regressions
+
+
+def check_budgets(results, budgets, stream=sys.stdout):
+    """Print endpoints that ran more queries than budgeted, or reported none; return their names."""
+    over = []
+    for name, stats in results.items():
+        budget = budgets.get(name)
+        if budget is None:
+            continue
+        if stats['queries_max'] is None:
+            over.append(name)
+            print(f'QUERY BUDGET UNCHECKED: {name} reported no query counts (X-Query-Count header)', file=stream)
+        elif stats['queries_max'] > budget:
+            over.append(name)
+            print(f"QUERY BUDGET EXCEEDED: {name} ran {stats['queries_max']} queries (budget {budget})", file=stream)
+    return over
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description='Benchmark the blog API endpoints.')
+    parser.add_argument('--mode', choices=['wsgi', 'asgi', 'http'], default='wsgi',
+                        help='In-process through the WSGI or ASGI app, or against a running server.')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server URL for --mode http.')
+    parser.add_argument('--requests', type=int, default=100, help='Requests per endpoint.')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent clients.')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per endpoint before measuring.')
+    parser.add_argument('--only', nargs='*', default=None, help='Only run these endpoints.')
+    parser.add_argument('--skip-writes', action='store_true', help='Only run GET endpoints.')
+    parser.add_argument('--output', help='Write the results as JSON to this file.')
+    parser.add_argument('--save-baseline', metavar='FILE', help='Save the results as a baseline.')
+    parser.add_argument('--baseline', metavar='FILE', help='Compare the results with a saved baseline.')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='Percent change that counts as a regression when comparing.')
+    parser.add_argument('--check-budgets', action='store_true',
+                        help='Exit with status 1 if an endpoint exceeds its query budget (scenarios.QUERY_BUDGETS).')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with status 1 if any endpoint regressed against the baseline.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+
+    from . import dataset
+    from .runner import HTTPTransport, WSGITransport, run_asgi, run_threaded
+    from .scenarios import QUERY_BUDGETS, SCENARIOS, Fixtures
+
+    call_command('migrate', verbosity=0)
+    if not dataset.is_seeded():
+        print('Seeding benchmark dataset...', file=sys.stderr)
+        dataset.seed()
+
+    scenarios = [
+        scenario for scenario in SCENARIOS
+        if (args.only is None or scenario.name in args.only)
+        and not (args.skip_writes and scenario.method != 'GET')
+    ]
+    if not scenarios:
+        print('No endpoints selected.', file=sys.stderr)
+        return 2
+
+    run_id = uuid.uuid4().hex[:8]
+    fixtures = Fixtures.load(run_id)
+    pool_size = args.requests + args.warmup
+    pools = {scenario.pool for scenario in scenarios}
+    fixtures.fill_pools(**{
+        name: pool_size if name in pools else 0
+        for name in ('blogs', 'comments', 'refresh', 'logout')
+    })
+
+    if args.mode == 'http':
+        transport = HTTPTransport(args.url)
+    else:
+        transport = WSGITransport()
+    status, _, body = transport.request(
+        'POST', '/api/auth/login/', {'email': dataset.BENCH_EMAIL, 'password': dataset.BENCH_PASSWORD}
+    )
+    if status != 200:
+        print(f'Could not log in the benchmark user (HTTP {status}).', file=sys.stderr)
+        return 2
+    content = body.content if hasattr(body, 'content') else body
+    fixtures.tokens = json.loads(content)['tokens']
+
+    results = {}
+    for scenario in scenarios:
+        # Warm-up requests use indexes after the measured ones, so they never
+        # reuse a measured request's unique data or pooled row.
+        if args.mode == 'asgi':
+            run_asgi(scenario, fixtures, args.warmup, 1, start=args.requests)
+            result = run_asgi(scenario, fixtures, args.requests, args.concurrency)
+        else:
+            run_threaded(transport, scenario, fixtures, args.warmup, 1, start=args.requests)
+            result = run_threaded(transport, scenario, fixtures, args.requests, args.concurrency)
+        results[scenario.name] = summarize(result)
+
+    print(f'mode={args.mode} requests={args.requests} concurrency={args.concurrency}\n')
+    print_report(results)
+
+    report = {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'mode': args.mode,
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+        },
+        'results': results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\nResults written to {path}')
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        failed = bool(regressions and args.fail_on_regression)
+    if args.check_budgets:
+        print()
+        if check_budgets(results, QUERY_BUDGETS):
+            failed = True
+        else:
+            print('All endpoints within their query budgets.')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Drive scenarios with concurrent clients and collect per-request timings."""
+import asyncio
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+
+from django.db import close_old_connections, connection
+from django.test import AsyncClient, Client
+
+USER_AGENT = 'Mozilla/5.0 (blog-api-benchmark)'
+
+# Header with the number of SQL queries a request ran (blog_project/instrumentation.py).
+# Every mode reads it, so in-process and served runs count the same queries;
+# benchmarks/settings.py turns it on, a served run needs QUERY_INSTRUMENTATION HEADERS.
+QUERY_COUNT_HEADER = 'X-Query-Count'
+
+
+@dataclass
+class Sample:
+    status: int
+    seconds: float
+    queries: int = None
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    samples: list = field(default_factory=list)
+    wall_seconds: float = 0.0
+    errors: int = 0
+
+
+def query_count(headers):
+    """Queries reported by the server for a response, or None without the header."""
+    value = headers.get(QUERY_COUNT_HEADER)
+    return int(value) if value is not None else None
+
+
+def encode(data):
+    return json.dumps(data).encode('utf-8') if data is not None else None
+
+
+class WSGITransport:
+    """In-process requests through the Django WSGI handler (django.test.Client)."""
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def client(self):
+        if not hasattr(self.local, 'client'):
+            self.local.client = Client(raise_request_exception=False, HTTP_USER_AGENT=USER_AGENT)
+        return self.local.client
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        # The test client skips the request_started/finished connection handling
+        # of a real server; do it here so CONN_MAX_AGE applies as in production.
+        close_old_connections()
+        response = self.client().generic(
+            method, path, encode(data) or '', content_type='application/json', **headers
+        )
+        close_old_connections()
+        return response.status_code, query_count(response.headers), response
+
+    def close(self):
+        connection.close()
+
+
+class HTTPTransport:
+    """Requests against a running server."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'User-Agent': USER_AGENT, 'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        request = urllib.request.Request(self.base_url + path, data=encode(data), headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                body, status, response_headers = response.read(), response.status, response.headers
+        except urllib.error.HTTPError as error:
+            body, status, response_headers = error.read(), error.code, error.headers
+        return status, query_count(response_headers), body
+
+    def close(self):
+        pass
+
+
+def run_threaded(transport, scenario, fixtures, total, concurrency, start=0):
+    """Issue requests start..start+total-1 from `concurrency` threads."""
+    result = ScenarioResult(scenario.name)
+    lock = threading.Lock()
+    next_index = iter(range(start, start + total))
+
+    def worker():
+        try:
+            while True:
+                with lock:
+                    i = next(next_index, None)
+                if i is None:
+                    return
+                sample = timed_request(transport, scenario, fixtures, i)
+                with lock:
+                    result.samples.append(sample)
+        finally:
+            transport.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.wall_seconds = time.perf_counter() - started
+    result.errors = sum(1 for sample in result.samples if sample.status not in scenario.ok)
+    return result
+
+
+def timed_request(transport, scenario, fixtures, i):
+    path = scenario.path(fixtures, i)
+    data = scenario.data(fixtures, i) if scenario.data else None
+    token = fixtures.tokens.get('access') if scenario.auth else None
+    started = time.perf_counter()
+    try:
+        status, queries, _ = transport.request(scenario.method, path, data, token)
+    except Exception:
+        status, queries = 0, None
+    return Sample(status, time.perf_counter() - started, queries)
+
+
+def run_asgi(scenario, fixtures, total, concurrency, start=0):
+    """Issue requests start..start+total-1 through the ASGI handler with `concurrency` tasks."""
+    result = ScenarioResult(scenario.name)
+
+    async def main():
+        client = AsyncClient(raise_request_exception=False, headers={'User-Agent': USER_AGENT})
+        indexes = iter(range(start, start + total))
+
+        async def worker():
+            for i in indexes:
+                path = scenario.path(fixtures, i)
+                data = scenario.data(fixtures, i) if scenario.data else None
+                headers = {}
+                if scenario.auth:
+                    headers['Authorization'] = f"Bearer {fixtures.tokens['access']}"
+                started = time.perf_counter()
+                try:
+                    response = await client.generic(
+                        scenario.method, path, encode(data) or '', content_type='application/json', headers=headers
+                    )
+                    status, queries = response.status_code, query_count(response.headers)
+                except Exception:
+                    status, queries = 0, None
+                result.samples.append(Sample(status, time.perf_counter() - started, queries))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    result.wall_seconds = time.perf_counter() - started
+    result.errors = sum(1 for sample in result.samples if sample.status not in scenario.ok)
+    return result
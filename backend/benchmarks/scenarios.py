@@ -0,0 +1,268 @@
+"""
+One scenario per route in blogs/urls.py, blogs/async_urls.py, users/urls.py
+and the sitemaps (blogs/tests.py fails on a route without one).
+
+Each scenario builds the i-th request of a run from the benchmark fixtures.
+Mutating scenarios only touch rows owned by the benchmark user or rows
+created for the run, so repeated runs see the same dataset.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from django.contrib.auth import get_user_model
+
+from blogs.models import Blog, Category, Comment, Tag
+from users.tokens import RefreshToken
+
+from .dataset import BENCH_EMAIL, BENCH_PASSWORD
+
+User = get_user_model()
+
+API = '/api'
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable
+    data: Optional[Callable] = None
+    auth: bool = False
+    ok: tuple = (200,)
+    # Name of the pool of throwaway objects (blogs, comments, refresh tokens)
+    # the scenario consumes, one per request
+    pool: Optional[str] = None
+
+
+@dataclass
+class Fixtures:
+    """Rows the scenarios address, loaded from the benchmark database."""
+
+    run_id: str
+    user: object
+    slugs: list
+    own_slug: str
+    own_comment_id: int
+    category_id: int
+    category_slug: str
+    tag_slug: str
+    tokens: dict = field(default_factory=dict)
+    blog_pool: list = field(default_factory=list)
+    comment_pool: list = field(default_factory=list)
+    refresh_pool: list = field(default_factory=list)
+    logout_pool: list = field(default_factory=list)
+
+    @classmethod
+    def load(cls, run_id):
+        user = User.objects.get(email=BENCH_EMAIL)
+        slugs = list(
+            Blog.objects.filter(status='published').order_by('-views').values_list('slug', flat=True)[:50]
+        )
+        own = Blog.objects.filter(author=user, status='published').order_by('pk').first()
+        if own is None:
+            own = Blog.objects.create(
+                title=f'Benchmark own post {run_id}', content='Owned by the benchmark user.',
+                author=user, status='published'
+            )
+        comment = Comment.objects.filter(author=user, blog=own).first()
+        if comment is None:
+            comment = Comment.objects.create(blog=own, author=user, content='Benchmark comment')
+        if not user.is_staff:
+            # Datasets seeded before hashing-stats had a scenario.
+            User.objects.filter(pk=user.pk).update(is_staff=True)
+            user.is_staff = True
+        category = Category.objects.order_by('-blog_count').first()
+        return cls(
+            run_id=run_id,
+            user=user,
+            slugs=slugs,
+            own_slug=own.slug,
+            own_comment_id=comment.pk,
+            category_id=category.pk,
+            category_slug=category.slug,
+            tag_slug=Tag.objects.order_by('-blog_count').values_list('slug', flat=True).first(),
+        )
+
+    def slug(self, i):
+        return self.slugs[i % len(self.slugs)]
+
+    def fill_pools(self, blogs=0, comments=0, refresh=0, logout=0):
+        """Create throwaway rows for the delete scenarios and refresh tokens for rotation/logout."""
+        if blogs:
+            created = [
+                Blog(
+                    title=f'Throwaway {self.run_id} {i}', slug=f'throwaway-{self.run_id}-{i}',
+                    content='To be deleted.', author=self.user, status='draft'
+                )
+                for i in range(blogs)
+            ]
+            Blog.objects.bulk_create(created)
+            self.blog_pool = [blog.slug for blog in created]
+        if comments:
+            own = Blog.objects.get(slug=self.own_slug)
+            created = Comment.objects.bulk_create([
+                Comment(blog=own, author=self.user, content='To be deleted.') for _ in range(comments)
+            ])
+            self.comment_pool = [comment.pk for comment in created]
+        # Refresh tokens are single-use: rotation and logout blacklist them.
+        self.refresh_pool = [str(RefreshToken.for_user(self.user)) for _ in range(refresh)]
+        self.logout_pool = [str(RefreshToken.for_user(self.user)) for _ in range(logout)]
+
+
+SCENARIOS = [
+    # Public reads
+    Scenario('blog-list', 'GET', lambda fx, i: f'{API}/blogs/'),
+    Scenario('blog-list-page', 'GET', lambda fx, i: f'{API}/blogs/?page={i % 5 + 1}'),
+    Scenario('blog-list-cursor', 'GET', lambda fx, i: f'{API}/blogs/?pagination=cursor'),
+    Scenario('blog-list-filtered', 'GET', lambda fx, i: f'{API}/blogs/?category={fx.category_id}&ordering=-views'),
+    Scenario('blog-search', 'GET', lambda fx, i: f'{API}/blogs/?search=' + ('query', 'cache index', 'token')[i % 3]),
+    Scenario('blog-detail', 'GET', lambda fx, i: f'{API}/blogs/{fx.slug(i)}/'),
+    Scenario('comment-list', 'GET', lambda fx, i: f'{API}/blogs/{fx.slug(i)}/comments/'),
+    Scenario('category-list', 'GET', lambda fx, i: f'{API}/blogs/categories/'),
+    Scenario('tag-list', 'GET', lambda fx, i: f'{API}/blogs/tags/'),
+    Scenario('featured', 'GET', lambda fx, i: f'{API}/blogs/featured/'),
+    Scenario('popular', 'GET', lambda fx, i: f'{API}/blogs/popular/'),
+    Scenario('user-blogs', 'GET', lambda fx, i: f'{API}/blogs/user/{fx.user.pk}/'),
+    Scenario('feed', 'GET', lambda fx, i: f"{API}/blogs/feeds/{('rss', 'atom')[i % 2]}/"),
+    Scenario('category-feed', 'GET', lambda fx, i: f'{API}/blogs/feeds/category/{fx.category_slug}/rss/'),
+    Scenario('tag-feed', 'GET', lambda fx, i: f'{API}/blogs/feeds/tag/{fx.tag_slug}/atom/'),
+    Scenario('author-feed', 'GET', lambda fx, i: f'{API}/blogs/feeds/author/{fx.user.pk}/atom/'),
+    Scenario('sitemap-index', 'GET', lambda fx, i: '/sitemap.xml'),
+    Scenario('sitemap-chunk', 'GET', lambda fx, i: '/sitemap-1.xml'),
+
+    # Async variants of the public reads (blogs/async_urls.py); compare with --mode asgi
+    Scenario('async-blog-list', 'GET', lambda fx, i: f'{API}/async/blogs/'),
+    Scenario('async-blog-list-cursor', 'GET', lambda fx, i: f'{API}/async/blogs/?pagination=cursor'),
+    Scenario(
+        'async-blog-search', 'GET',
+        lambda fx, i: f'{API}/async/blogs/?search=' + ('query', 'cache index', 'token')[i % 3],
+    ),
+    Scenario('async-blog-detail', 'GET', lambda fx, i: f'{API}/async/blogs/{fx.slug(i)}/'),
+    Scenario('async-comment-list', 'GET', lambda fx, i: f'{API}/async/blogs/{fx.slug(i)}/comments/'),
+    Scenario('async-category-list', 'GET', lambda fx, i: f'{API}/async/blogs/categories/'),
+    Scenario('async-tag-list', 'GET', lambda fx, i: f'{API}/async/blogs/tags/'),
+    Scenario('async-featured', 'GET', lambda fx, i: f'{API}/async/blogs/featured/'),
+    Scenario('async-popular', 'GET', lambda fx, i: f'{API}/async/blogs/popular/'),
+
+    # Authenticated reads
+    Scenario('my-blogs', 'GET', lambda fx, i: f'{API}/blogs/my-blogs/', auth=True),
+    Scenario('liked', 'GET', lambda fx, i: f'{API}/blogs/liked/?ids=1,2,3,4,5', auth=True),
+    Scenario('profile', 'GET', lambda fx, i: f'{API}/auth/profile/', auth=True),
+    Scenario('me', 'GET', lambda fx, i: f'{API}/auth/me/', auth=True),
+    Scenario('hashing-stats', 'GET', lambda fx, i: f'{API}/auth/hashing-stats/', auth=True),
+
+    # Writes
+    Scenario(
+        'blog-create', 'POST', lambda fx, i: f'{API}/blogs/create/',
+        data=lambda fx, i: {'title': f'Bench create {fx.run_id} {i}', 'content': 'Body ' * 200, 'status': 'draft'},
+        auth=True, ok=(201,),
+    ),
+    Scenario(
+        'blog-update', 'PATCH', lambda fx, i: f'{API}/blogs/{fx.own_slug}/update/',
+        data=lambda fx, i: {'excerpt': f'Updated excerpt {i}'}, auth=True,
+    ),
+    Scenario(
+        'blog-delete', 'DELETE', lambda fx, i: f'{API}/blogs/{fx.blog_pool[i]}/delete/',
+        auth=True, ok=(204,), pool='blogs',
+    ),
+    Scenario('like', 'POST', lambda fx, i: f'{API}/blogs/{fx.slug(i)}/like/', auth=True),
+    Scenario('unlike', 'DELETE', lambda fx, i: f'{API}/blogs/{fx.slug(i)}/unlike/', auth=True),
+    Scenario(
+        'comment-create', 'POST', lambda fx, i: f'{API}/blogs/{fx.own_slug}/comments/create/',
+        data=lambda fx, i: {'content': f'Benchmark comment {i}'}, auth=True, ok=(201,),
+    ),
+    Scenario(
+        'comment-update', 'PATCH', lambda fx, i: f'{API}/blogs/comments/{fx.own_comment_id}/update/',
+        data=lambda fx, i: {'content': f'Edited comment {i}'}, auth=True,
+    ),
+    Scenario(
+        'comment-delete', 'DELETE', lambda fx, i: f'{API}/blogs/comments/{fx.comment_pool[i]}/delete/',
+        auth=True, ok=(204,), pool='comments',
+    ),
+
+    # Accounts
+    Scenario(
+        'register', 'POST', lambda fx, i: f'{API}/auth/register/',
+        data=lambda fx, i: {
+            'email': f'bench-{fx.run_id}-{i}@example.com', 'name': 'Bench Registrant',
+            'password': BENCH_PASSWORD, 'password2': BENCH_PASSWORD,
+        },
+        ok=(201,),
+    ),
+    Scenario(
+        'login', 'POST', lambda fx, i: f'{API}/auth/login/',
+        data=lambda fx, i: {'email': BENCH_EMAIL, 'password': BENCH_PASSWORD},
+    ),
+    Scenario(
+        'token-refresh', 'POST', lambda fx, i: f'{API}/auth/token/refresh/',
+        data=lambda fx, i: {'refresh': fx.refresh_pool[i]}, pool='refresh',
+    ),
+    Scenario(
+        'profile-update', 'PATCH', lambda fx, i: f'{API}/auth/profile/update/',
+        data=lambda fx, i: {'bio': f'Benchmark bio {i}'}, auth=True,
+    ),
+    Scenario(
+        'change-password', 'PUT', lambda fx, i: f'{API}/auth/profile/change-password/',
+        data=lambda fx, i: {
+            'old_password': BENCH_PASSWORD, 'new_password': BENCH_PASSWORD, 'new_password2': BENCH_PASSWORD,
+        },
+        auth=True,
+    ),
+    Scenario(
+        'logout', 'POST', lambda fx, i: f'{API}/auth/logout/',
+        data=lambda fx, i: {'refresh_token': fx.logout_pool[i]}, auth=True, pool='logout',
+    ),
+]
+
+# Maximum SQL queries per request. `python -m benchmarks.run --check-budgets`
+# fails when an endpoint exceeds its budget, so N+1 regressions break the build.
+QUERY_BUDGETS = {
+    'blog-list': 3,
+    'blog-list-page': 3,
+    'blog-list-cursor': 2,
+    'blog-list-filtered': 3,
+    'blog-search': 4,
+    'blog-detail': 6,
+    'comment-list': 5,
+    'category-list': 3,
+    'tag-list': 3,
+    'featured': 3,
+    'popular': 3,
+    'user-blogs': 3,
+    'feed': 2,
+    'category-feed': 3,
+    'tag-feed': 3,
+    'author-feed': 3,
+    'sitemap-index': 1,
+    'sitemap-chunk': 2,
+    'async-blog-list': 3,
+    'async-blog-list-cursor': 2,
+    'async-blog-search': 4,
+    'async-blog-detail': 6,
+    'async-comment-list': 5,
+    'async-category-list': 3,
+    'async-tag-list': 3,
+    'async-featured': 3,
+    'async-popular': 3,
+    'my-blogs': 4,
+    'liked': 1,
+    'profile': 1,
+    'me': 1,
+    'hashing-stats': 1,
+    'blog-create': 5,
+    'blog-update': 8,
+    'blog-delete': 10,
+    'like': 5,
+    'unlike': 4,
+    'comment-create': 3,
+    'comment-update': 5,
+    'comment-delete': 6,
+    'register': 3,
+    'login': 2,
+    # One blacklist lookup each: the default local-memory cache bypasses the
+    # Bloom filter (users/tokens.py); with a shared cache these run 3.
+    'token-refresh': 4,
+    'profile-update': 3,
+    'change-password': 3,
+    'logout': 4,
+}
@@ -0,0 +1,31 @@
+"""Settings for benchmark runs: the project settings on a dedicated database."""
+import os
+
+from blog_project.database import database_from_env
+from blog_project.settings import *  # noqa: F401,F403
+from blog_project.settings import BASE_DIR, LOGGING, QUERY_INSTRUMENTATION, SQLITE_OPTIONS, config
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['*']
+
+# Never the application's DATABASE_URL: BENCH_DATABASE_URL (e.g. a scratch
+# PostgreSQL database) or a SQLite file of its own. DB_CONN_MAX_AGE etc. still apply.
+BENCH_DATABASE = config('BENCH_DATABASE', default=str(BASE_DIR / 'benchmarks' / 'bench.sqlite3'))
+
+DATABASES = {
+    'default': database_from_env(
+        BENCH_DATABASE, SQLITE_OPTIONS,
+        environ={**os.environ, 'DATABASE_URL': config('BENCH_DATABASE_URL', default=f'sqlite:///{BENCH_DATABASE}')},
+    ),
+}
+
+# The harness reads each request's query count from the X-Query-Count header
+# (benchmarks/runner.py) and prints its own report, so the per-request JSON
+# records of blog_project.queries stay out of its output.
+QUERY_INSTRUMENTATION = {**QUERY_INSTRUMENTATION, 'ENABLED': True, 'HEADERS': True, 'FINGERPRINTS': True}
+
+LOGGING = {
+    **LOGGING,
+    'loggers': {**LOGGING['loggers'], 'blog_project.queries': {'handlers': [], 'level': 'CRITICAL', 'propagate': False}},
+}
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog_project.settings')
+# Sync code runs in a new thread per request under ASGI, so persistent
+# connections would pile up; pool with PgBouncer instead (blog_project/database.py).
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application() 
\ No newline at end of file
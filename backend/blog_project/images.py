@@ -0,0 +1,244 @@
+"""
+Resized derivatives of uploaded images.
+
+Blog.featured_image and User.avatar keep the uploaded original; list
+responses and the admin should not ship it into 30-160px slots. After an
+image field changes (and the transaction commits), the original is resized
+on a small background thread pool into the named variants configured in
+IMAGE_DERIVATIVES['VARIANTS'] for that field, each written as WebP and
+JPEG next to the original:
+
+    blog_images/variants/<stem>-<content hash>/thumb-160x160c-q80.webp
+
+Variant files are named after the content and the variant settings, so
+re-saving the same image reuses them instead of re-encoding. The storage
+names end up in the model's ``<field>_variants`` JSONField:
+
+    {'source': 'blog_images/a.png',
+     'thumb': {'width': 160, 'height': 160, 'webp': '...', 'jpeg': '...'}, ...}
+
+Until they are generated, serializers report the variants as null and
+clients should fall back to the original. `manage.py generate_image_variants` backfills
+existing rows.
+"""
+import hashlib
+import io
+import logging
+import os
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Per image field name: variant name -> (max width, max height, crop)
+    'VARIANTS': {
+        'featured_image': {
+            'thumb': (160, 160, True),
+            'card': (800, 450, True),
+            'full': (1600, 1600, False),
+        },
+        'avatar': {
+            'thumb': (64, 64, True),
+            'card': (256, 256, True),
+        },
+    },
+    'FORMATS': ('webp', 'jpeg'),
+    'QUALITY': 80,
+    'MAX_WORKERS': 2,
+    # Generate on the background pool; False generates inline (commands, tests)
+    'ASYNC': True,
+}
+
+EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+# Sent (sender=model class, pk=...) once new variants are stored.
+variants_generated = Signal()
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def derivatives_setting(name):
+    """Read an IMAGE_DERIVATIVES setting, falling back to the module defaults."""
+    return getattr(settings, 'IMAGE_DERIVATIVES', {}).get(name, DEFAULTS[name])
+
+
+def variants_field(field_name):
+    return f'{field_name}_variants'
+
+
+def get_executor():
+    """The background pool, created once per process (forked workers included)."""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor_pid != pid:
+        with _executor_lock:
+            if _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=derivatives_setting('MAX_WORKERS'), thread_name_prefix='image-variants'
+                )
+                _executor_pid = pid
+    return _executor
+
+
+def render_variant(image, width, height, crop):
+    """Resize without upscaling; crop to exactly width x height when asked."""
+    if crop:
+        if image.width <= width and image.height <= height:
+            return image.copy()
+        width, height = min(width, image.width), min(height, image.height)
+        return ImageOps.fit(image, (width, height), Image.LANCZOS)
+    resized = image.copy()
+    resized.thumbnail((width, height), Image.LANCZOS)
+    return resized
+
+
+def encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == 'jpeg':
+        if image.mode != 'RGB':
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+            image = background
+        image.save(buffer, 'JPEG', quality=derivatives_setting('QUALITY'), optimize=True, progressive=True)
+    else:
+        image.save(buffer, fmt.upper(), quality=derivatives_setting('QUALITY'), method=4)
+    return buffer.getvalue()
+
+
+def build_variants(field_file, specs):
+    """Write every variant of field_file and return the JSON to store."""
+    storage = field_file.storage
+    with field_file.open('rb') as source:
+        data = source.read()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    directory, filename = posixpath.split(field_file.name)
+    base = posixpath.join(directory, 'variants', f'{posixpath.splitext(filename)[0]}-{digest}')
+
+    image = Image.open(io.BytesIO(data))
+    # Let JPEG decode at a reduced scale when even the largest variant is much smaller.
+    image.draft('RGB', (max(spec[0] for spec in specs.values()), max(spec[1] for spec in specs.values())))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    quality = derivatives_setting('QUALITY')
+    variants = {'source': field_file.name}
+    for name, (width, height, crop) in specs.items():
+        resized = render_variant(image, width, height, crop)
+        entry = {'width': resized.width, 'height': resized.height}
+        for fmt in derivatives_setting('FORMATS'):
+            path = posixpath.join(base, f"{name}-{width}x{height}{'c' if crop else ''}-q{quality}.{EXTENSIONS[fmt]}")
+            if not storage.exists(path):
+                path = storage.save(path, ContentFile(encode(resized, fmt)))
+            entry[fmt] = path
+        variants[name] = entry
+    return variants
+
+
+def generate(model, pk, field_name):
+    """Build and store the variants of one row's image, if it still has that image."""
+    instance = model._default_manager.filter(pk=pk).only('pk', field_name).first()
+    if instance is None:
+        return None
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return None
+    specs = derivatives_setting('VARIANTS')[field_name]
+    try:
+        variants = build_variants(field_file, specs)
+    except Exception:
+        # Unreadable or not an image: remember the attempt so it is not retried on every save.
+        logger.exception('Could not build %s variants for %s %s', field_name, model.__name__, pk)
+        variants = {'source': field_file.name}
+    values = {variants_field(field_name): variants}
+    # Touch auto_now fields as save() would: conditional-GET validators are built from them.
+    values.update(
+        (field.attname, timezone.now()) for field in model._meta.concrete_fields if getattr(field, 'auto_now', False)
+    )
+    # Only store them if the image was not replaced in the meantime.
+    updated = model._default_manager.filter(pk=pk, **{field_name: field_file.name}).update(**values)
+    if updated:
+        variants_generated.send(sender=model, pk=pk, field_name=field_name)
+    return variants
+
+
+def _generate_in_background(model, pk, field_name):
+    try:
+        generate(model, pk, field_name)
+    except Exception:
+        logger.exception('Image variant job failed for %s %s', model.__name__, pk)
+    finally:
+        # Worker threads own their connections; do not leave them open.
+        connections.close_all()
+
+
+def clear_stale_variants(instance, field_name, update_fields=None):
+    """pre_save helper: forget the variants of a replaced or cleared image."""
+    name = variants_field(field_name)
+    if update_fields is not None and name not in update_fields:
+        # The stale variants are replaced once the new ones are generated.
+        return
+    field_file = getattr(instance, field_name)
+    variants = getattr(instance, name) or {}
+    if variants and (not field_file or variants.get('source') != field_file.name):
+        setattr(instance, name, {})
+
+
+def schedule(instance, field_name, update_fields=None, using='default'):
+    """post_save helper: generate variants after the transaction commits."""
+    if update_fields is not None and field_name not in update_fields:
+        return
+    field_file = getattr(instance, field_name)
+    if not field_file or (getattr(instance, variants_field(field_name)) or {}).get('source') == field_file.name:
+        return
+    model, pk = type(instance), instance.pk
+
+    def submit():
+        if derivatives_setting('ASYNC'):
+            get_executor().submit(_generate_in_background, model, pk, field_name)
+        else:
+            generate(model, pk, field_name)
+
+    transaction.on_commit(submit, using=using)
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Variant URLs for a ``<image field>_variants`` field, or None until they exist."""
+
+    def to_representation(self, value):
+        variants = {name: entry for name, entry in (value or {}).items() if name != 'source'}
+        if not variants:
+            return None
+        image_field_name = self.source.removesuffix('_variants')
+        storage = self.parent.Meta.model._meta.get_field(image_field_name).storage
+        request = self.context.get('request')
+        formats = derivatives_setting('FORMATS')
+        result = {}
+        for name, entry in variants.items():
+            result[name] = dict(entry)
+            for fmt in formats:
+                if fmt in entry:
+                    url = storage.url(entry[fmt])
+                    result[name][fmt] = request.build_absolute_uri(url) if request is not None else url
+        return result
+
+
+def variant_url(instance, field_name, variant, fmt='jpeg'):
+    """URL of one variant, falling back to the original image (for the admin)."""
+    entry = (getattr(instance, variants_field(field_name)) or {}).get(variant)
+    field_file = getattr(instance, field_name)
+    if entry and fmt in entry:
+        return field_file.storage.url(entry[fmt])
+    return field_file.url
@@ -0,0 +1,198 @@
+"""
+Per-request SQL instrumentation.
+
+QueryInstrumentationMiddleware records every query a request runs (on all
+configured databases): how many, how long they took in total, and which
+statements repeat with only their parameters changing. Repeats are the
+signature of N+1 access patterns. Finding them normalizes every statement
+with regular expressions, so it is on by default only in DEBUG (and in the
+benchmark settings); elsewhere only count and time are recorded.
+
+The numbers are logged as one JSON record per request on the
+``blog_project.queries`` logger (WARNING once a request exceeds the
+configured limits, DEBUG otherwise) and, when enabled (by default in
+DEBUG), sent as X-Query-* response headers.
+
+Under ASGI, concurrent requests can share the thread (and connection) the
+async ORM runs on, so there the connections get one permanent wrapper that
+forwards each query to the recorder of the request it runs for, found in a
+context variable that sync_to_async carries over to that thread.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('blog_project.queries')
+
+DEFAULTS = {
+    'ENABLED': True,
+    'HEADERS': None,  # None: follow DEBUG
+    'FINGERPRINTS': None,  # None: follow DEBUG
+    'WARN_QUERIES': 30,
+    'WARN_DUPLICATES': 5,
+    'WARN_TIME_MS': 500,
+}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:[^()]*)\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+_current_recorder = ContextVar('query_recorder', default=None)
+
+
+def instrumentation_setting(name):
+    """Read a QUERY_INSTRUMENTATION setting, falling back to the module defaults."""
+    return getattr(settings, 'QUERY_INSTRUMENTATION', {}).get(name, DEFAULTS[name])
+
+
+def fingerprint(sql):
+    """Normalize a statement so executions that differ only in values compare equal."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """Database execute wrapper collecting count, time and (optionally) fingerprints."""
+
+    def __init__(self, fingerprints=True):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter() if fingerprints else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            if self.fingerprints is not None:
+                self.fingerprints[fingerprint(sql)] += 1
+
+    def record(self, *aliases):
+        """Context manager installing the recorder on the given (default: all) databases."""
+        stack = ExitStack()
+        for alias in aliases or connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return stack
+
+    @staticmethod
+    def dispatch(execute, sql, params, many, context):
+        """Execute wrapper recording into the current context's recorder, if any."""
+        recorder = _current_recorder.get()
+        if recorder is None:
+            return execute(sql, params, many, context)
+        return recorder(execute, sql, params, many, context)
+
+    @classmethod
+    def install_dispatch(cls):
+        """Add dispatch() to this thread's connections, once."""
+        for alias in connections:
+            wrappers = connections[alias].execute_wrappers
+            if cls.dispatch not in wrappers:
+                wrappers.append(cls.dispatch)
+
+    @property
+    def duplicates(self):
+        """Fingerprints executed more than once, most repeated first."""
+        if self.fingerprints is None:
+            return []
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+    @property
+    def duplicate_count(self):
+        """Executions beyond the first of each fingerprint."""
+        return sum(count - 1 for _, count in self.duplicates)
+
+    def summary(self):
+        summary = {'queries': self.count, 'db_time_ms': round(self.seconds * 1000, 2)}
+        if self.fingerprints is not None:
+            summary['duplicate_queries'] = self.duplicate_count
+            summary['duplicates'] = [{'sql': sql, 'count': count} for sql, count in self.duplicates[:10]]
+        return summary
+
+
+class QueryInstrumentationMiddleware:
+    """Record the SQL each request runs; log it and optionally expose it as headers."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def recorder(self):
+        fingerprints = instrumentation_setting('FINGERPRINTS')
+        return QueryRecorder(fingerprints=settings.DEBUG if fingerprints is None else fingerprints)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not instrumentation_setting('ENABLED'):
+            return self.get_response(request)
+
+        recorder = self.recorder()
+        started = time.perf_counter()
+        with recorder.record():
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        if not instrumentation_setting('ENABLED'):
+            return await self.get_response(request)
+
+        recorder = self.recorder()
+        started = time.perf_counter()
+        # Connections are per thread: make sure the thread the async ORM uses
+        # for this request (thread_sensitive sync_to_async) dispatches to us.
+        await sync_to_async(QueryRecorder.install_dispatch)()
+        token = _current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    def finish(self, request, response, recorder, started):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.log(request, response, recorder, elapsed_ms)
+        headers = instrumentation_setting('HEADERS')
+        if settings.DEBUG if headers is None else headers:
+            response['X-Query-Count'] = str(recorder.count)
+            response['X-Query-Time-Ms'] = f'{recorder.seconds * 1000:.2f}'
+            if recorder.fingerprints is not None:
+                response['X-Query-Duplicates'] = str(recorder.duplicate_count)
+        return response
+
+    def log(self, request, response, recorder, elapsed_ms):
+        over_budget = (
+            recorder.count > instrumentation_setting('WARN_QUERIES') or
+            recorder.duplicate_count > instrumentation_setting('WARN_DUPLICATES') or
+            recorder.seconds * 1000 > instrumentation_setting('WARN_TIME_MS')
+        )
+        level = logging.WARNING if over_budget else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round(elapsed_ms, 2),
+            **recorder.summary(),
+        }
+        logger.log(level, json.dumps(record))
@@ -0,0 +1,167 @@
+"""
+Read replicas for safe-method requests.
+
+ReplicaRouter sends ORM reads made while serving a GET/HEAD/OPTIONS request
+to one of the configured replica aliases (REPLICA_ROUTING['ALIASES'],
+filled from DATABASE_REPLICA_URLS by blog_project/database.py). Everything
+else uses the primary ('default'):
+
+- every write, including view counting during a GET;
+- cache rebuilds (blogs/cache.py), so an entry rebuilt right after an
+  invalidation never stores what a lagging replica still returns;
+- reads inside POST/PUT/PATCH/DELETE requests and inside transactions;
+- reads outside a request (management commands, background threads);
+- reads in code wrapped in ``with use_primary():``.
+
+Replicas lag behind the primary, so a user who has just written is pinned
+to the primary for REPLICA_ROUTING['STICKY_SECONDS']. The pin is a cache
+key per user id. It is set after a successful write request, or when a user
+is created. On later reads the user id is taken from the bearer token's
+claims without verifying the signature: authentication still happens as
+usual, and a forged claim can only make its own request read from the
+primary. With several workers, the cache must be shared (Redis/Memcached)
+for pins to be seen by every worker.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import jwt
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.settings import api_settings
+
+DEFAULTS = {
+    'ALIASES': (),
+    'STICKY_SECONDS': 10,
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'replica-pin',
+}
+
+_routing = ContextVar('replica_routing', default=None)
+
+
+def replica_setting(name):
+    """Read a REPLICA_ROUTING setting, falling back to the module defaults."""
+    return getattr(settings, 'REPLICA_ROUTING', {}).get(name, DEFAULTS[name])
+
+
+def pin_key(user_id):
+    return f"{replica_setting('KEY_PREFIX')}:{user_id}"
+
+
+def pin_user(user_id):
+    """Send this user's reads to the primary for the next STICKY_SECONDS."""
+    if replica_setting('ALIASES'):
+        caches[replica_setting('CACHE_ALIAS')].set(pin_key(user_id), 1, replica_setting('STICKY_SECONDS'))
+
+
+def token_user_id(request):
+    """The user id claim of the request's bearer token, unverified (only used for routing)."""
+    header = request.META.get(api_settings.AUTH_HEADER_NAME, '').split()
+    if len(header) != 2 or header[0] not in api_settings.AUTH_HEADER_TYPES:
+        return None
+    try:
+        return jwt.decode(header[1], options={'verify_signature': False}).get(api_settings.USER_ID_CLAIM)
+    except jwt.InvalidTokenError:
+        return None
+
+
+class Routing:
+    """Per-request routing decision, made on the first read that needs it."""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.replicas = request is not None and request.method in SAFE_METHODS
+        self.checked_pin = False
+
+    def use_replicas(self):
+        if self.replicas and not self.checked_pin:
+            self.checked_pin = True
+            user_id = token_user_id(self.request)
+            if user_id is not None and caches[replica_setting('CACHE_ALIAS')].get(pin_key(user_id)):
+                self.replicas = False
+        return self.replicas
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside this block, e.g. right after writing in a GET."""
+    token = _routing.set(Routing())
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+class ReplicaRouter:
+    """Reads of safe-method requests go to a random replica, everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        aliases = replica_setting('ALIASES')
+        routing = _routing.get()
+        if not aliases or routing is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(aliases) if routing.use_replicas() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Also for instances loaded from a replica, which Django would save back there.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_setting('ALIASES')}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema from the primary.
+        return False if db in replica_setting('ALIASES') else None
+
+
+class ReplicaRoutingMiddleware:
+    """Scope replica routing to the request and pin users to the primary after they write."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _routing.set(Routing(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        user_id = self.writer_id(request, response)
+        if user_id is not None:
+            pin_user(user_id)
+        return response
+
+    async def __acall__(self, request):
+        token = _routing.set(Routing(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        user_id = self.writer_id(request, response)
+        if user_id is not None:
+            await caches[replica_setting('CACHE_ALIAS')].aset(
+                pin_key(user_id), 1, replica_setting('STICKY_SECONDS')
+            )
+        return response
+
+    def writer_id(self, request, response):
+        """The user who just wrote successfully, if any (DRF sets request.user on authentication)."""
+        if request.method in SAFE_METHODS or response.status_code >= 400 or not replica_setting('ALIASES'):
+            return None
+        user = getattr(request, 'user', None)
+        return user.pk if user is not None and user.is_authenticated else None
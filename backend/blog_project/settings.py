@@ -7,6 +7,8 @@ from pathlib import Path
 import os
 from dotenv import load_dotenv
 
+from blog_project.database import database_from_env, replicas_from_env
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -38,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'django_filters',
     'blogs',
@@ -45,9 +48,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog_project.instrumentation.QueryInstrumentationMiddleware',
+    'blog_project.replicas.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'blog_project.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -76,14 +81,99 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'blog_project.wsgi.application'
 
-# Database
+# Database: DATABASE_URL, DB_NAME/DB_USER/... for PostgreSQL, or the bundled
+# SQLite file, with persistent connections (see blog_project/database.py).
+# SQLite runs in WAL mode with tuned pragmas and BEGIN IMMEDIATE transactions,
+# so several workers can write concurrently (see blog_project/sqlite/base.py)
+SQLITE_OPTIONS = {
+    'pragmas': {
+        'journal_mode': config('SQLITE_JOURNAL_MODE', default='wal'),
+        'synchronous': config('SQLITE_SYNCHRONOUS', default='normal'),
+        'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+        'cache_size': -config('SQLITE_CACHE_SIZE_KB', default=20000, cast=int),
+        'mmap_size': config('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int),
+    },
+    'busy_retries': config('SQLITE_BUSY_RETRIES', default=3, cast=int),
+    # IMMEDIATE takes the write lock for every atomic() block, read-only ones too
+    'transaction_mode': config('SQLITE_TRANSACTION_MODE', default='IMMEDIATE'),
+}
+
 DATABASES = {
+    'default': database_from_env(BASE_DIR / 'db.sqlite3', SQLITE_OPTIONS),
+    **replicas_from_env(SQLITE_OPTIONS),
+}
+
+# Reads of GET/HEAD requests go to the replicas, if any; users who just wrote
+# stay on the primary for STICKY_SECONDS (see blog_project/replicas.py)
+DATABASE_ROUTERS = ['blog_project.replicas.ReplicaRouter']
+
+REPLICA_ROUTING = {
+    'ALIASES': [alias for alias in DATABASES if alias != 'default'],
+    'STICKY_SECONDS': config('DB_REPLICA_STICKY_SECONDS', default=10, cast=int),
+}
+
+# Cache (local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a
+# shared backend such as Redis or Memcached when running several workers)
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='blog-cache'),
     }
 }
 
+# Response caching for featured/popular listings (see blogs/cache.py)
+BLOG_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': config('BLOG_CACHE_TIMEOUT', default=300, cast=int),
+}
+
+# Where the frontend serves posts (/blog/<slug>); feeds and sitemaps link there
+FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
+
+# RSS/Atom feeds, cached until a post in them changes (see blogs/feeds.py)
+FEEDS = {
+    'TITLE': config('FEED_TITLE', default='Blog'),
+    'SITE_URL': FRONTEND_URL,
+    'ITEMS': config('FEED_ITEMS', default=20, cast=int),
+    'MAX_AGE': config('FEED_MAX_AGE', default=300, cast=int),
+}
+
+# Sitemap index and per-chunk sitemaps, cached per chunk (see blogs/sitemaps.py)
+SITEMAP = {
+    'SITE_URL': FRONTEND_URL,
+    'CHUNK_SIZE': config('SITEMAP_CHUNK_SIZE', default=50000, cast=int),
+    'MAX_AGE': config('SITEMAP_MAX_AGE', default=3600, cast=int),
+}
+
+# Resized featured images and avatars (see blog_project/images.py)
+IMAGE_DERIVATIVES = {
+    'QUALITY': config('IMAGE_VARIANT_QUALITY', default=80, cast=int),
+    'MAX_WORKERS': config('IMAGE_VARIANT_WORKERS', default=2, cast=int),
+}
+
+# Thread pool for serialization and Markdown rendering in async views (see blogs/async_views.py)
+ASYNC_VIEWS = {
+    'RENDER_WORKERS': config('ASYNC_RENDER_WORKERS', default=4, cast=int),
+}
+
+# Password hashing runs on a bounded pool (see users/hashing.py)
+PASSWORD_HASHERS = [
+    'users.hashing.PooledPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+PASSWORD_HASHING = {
+    'MAX_WORKERS': config('PASSWORD_HASH_WORKERS', default=2, cast=int),
+    'MAX_QUEUE': config('PASSWORD_HASH_QUEUE', default=16, cast=int),
+    'QUEUE_TIMEOUT': config('PASSWORD_HASH_TIMEOUT', default=5.0, cast=float),
+    'ITERATIONS': config('PASSWORD_HASH_ITERATIONS', default=600000, cast=int),
+    # Hashes at once across all workers; needs a shared CACHE_BACKEND (0 = off)
+    'GLOBAL_LIMIT': config('PASSWORD_HASH_GLOBAL_LIMIT', default=4, cast=int),
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -126,7 +216,7 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -143,6 +233,72 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Cache of users resolved from JWTs (see users/authentication.py)
+USER_AUTH_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': config('USER_AUTH_CACHE_TIMEOUT', default=60, cast=int),
+    # Cap for a per-process (local memory) cache, which other workers' saves cannot clear
+    'LOCAL_TIMEOUT': config('USER_AUTH_CACHE_LOCAL_TIMEOUT', default=5, cast=int),
+}
+
+# In-memory filter in front of the refresh token blacklist (see users/tokens.py)
+TOKEN_BLACKLIST = {
+    'ALIAS': 'default',
+    'MAX_STALENESS': config('TOKEN_BLACKLIST_MAX_STALENESS', default=5, cast=int),
+    'ID_LOOKBACK': config('TOKEN_BLACKLIST_ID_LOOKBACK', default=20, cast=int),
+}
+
+# Per-request SQL instrumentation (see blog_project/instrumentation.py)
+QUERY_INSTRUMENTATION = {
+    'ENABLED': config('QUERY_INSTRUMENTATION', default='true').lower() == 'true',
+    'HEADERS': DEBUG,
+    # Normalizes every statement to find repeats (N+1); costly, so DEBUG only by default
+    'FINGERPRINTS': config('QUERY_FINGERPRINTS', default=str(DEBUG)).lower() == 'true',
+    'WARN_QUERIES': config('QUERY_WARN_COUNT', default=30, cast=int),
+    'WARN_DUPLICATES': config('QUERY_WARN_DUPLICATES', default=5, cast=int),
+    'WARN_TIME_MS': config('QUERY_WARN_TIME_MS', default=500, cast=int),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'blog_project.queries': {
+            'handlers': ['console'],
+            'level': config('QUERY_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Write-behind analytics counters (see blogs/analytics.py). Each process buffers
+# views and likes for up to FLUSH_INTERVAL seconds; a worker that is killed
+# (SIGKILL, OOM) loses at most that much. 0 writes every delta immediately.
+BLOG_COUNTERS = {
+    'FLUSH_INTERVAL': config('BLOG_COUNTER_FLUSH_INTERVAL', default=10, cast=int),
+    'SUPPRESS_BOTS': True,
+    'REPEAT_VIEW_WINDOW': config('BLOG_REPEAT_VIEW_WINDOW', default=0, cast=int),
+}
+
+# Trending scores for /blogs/popular/?window= (see blogs/trending.py); refresh
+# them periodically with `python manage.py update_trending`
+BLOG_TRENDING = {
+    'HALF_LIVES': {
+        'day': config('BLOG_TRENDING_DAY_HALF_LIFE', default=4 * 3600, cast=int),
+        'week': config('BLOG_TRENDING_WEEK_HALF_LIFE', default=28 * 3600, cast=int),
+    },
+}
+
+# Full-text search (see blogs/search.py); the backend follows the database vendor
+BLOG_SEARCH = {
+    'POSTGRES_CONFIG': config('BLOG_SEARCH_POSTGRES_CONFIG', default='english'),
+}
+
 # JWT settings
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -170,6 +326,7 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.TokenRefreshSerializer',
 }
 
 # CORS settings
@@ -0,0 +1,134 @@
+"""
+SQLite backend tuned for several concurrent workers.
+
+Django's stock SQLite backend opens connections in rollback-journal mode,
+where a writer blocks every reader and a reader that later writes can fail
+straight away with "database is locked". This backend (ENGINE
+'blog_project.sqlite') builds on it with three changes:
+
+- PRAGMAs from OPTIONS['pragmas'] run on every new connection. The
+  defaults use WAL (readers never block the writer or each other),
+  synchronous=NORMAL (durable at checkpoints, safe with WAL), a busy
+  timeout, a bigger page cache and memory-mapped reads.
+- atomic() starts transactions with BEGIN IMMEDIATE
+  (OPTIONS['transaction_mode']), so a transaction takes the write lock up
+  front and waits for it under the busy timeout. With a deferred BEGIN, a
+  read-then-write transaction that loses the race fails without waiting.
+  The cost is that every atomic() block holds the write lock, including
+  ones that only read (the admin wraps its change forms in one, GETs
+  included): they queue behind writers and writers behind them. Reads
+  outside atomic() are unaffected. Set transaction_mode to 'DEFERRED' if
+  read-only transactions matter more than writes queueing cleanly.
+- Statements run outside a transaction are retried with backoff when
+  SQLite still reports the database busy or locked after the busy timeout
+  (OPTIONS['busy_retries']). Statements inside a transaction are not
+  retried, because a single statement cannot be replayed safely there.
+
+    DATABASES = {'default': {
+        'ENGINE': 'blog_project.sqlite',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {'pragmas': {'mmap_size': 0}, 'busy_retries': 5},
+    }}
+
+Unknown OPTIONS are passed to sqlite3.connect() as usual.
+`manage.py sqlite_maintenance` takes care of statistics, vacuuming and
+backups.
+"""
+import logging
+import random
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+Database = base.Database
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Applied in this order; auto_vacuum has to come before journal_mode
+    # so that it takes effect when a new database is created.
+    'pragmas': {
+        'busy_timeout': 5000,
+        'auto_vacuum': 'incremental',
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'cache_size': -20000,  # KiB when negative
+        'mmap_size': 128 * 1024 * 1024,
+        'temp_store': 'memory',
+    },
+    'transaction_mode': 'IMMEDIATE',
+    'busy_retries': 3,
+    'busy_retry_delay': 0.05,  # seconds, doubled on each retry
+}
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def is_busy(exc):
+    """Whether an sqlite3 error means another connection holds the lock."""
+    code = getattr(exc, 'sqlite_errorcode', None)
+    if code is not None:
+        # Extended codes (e.g. SQLITE_BUSY_SNAPSHOT) keep the primary code in the low byte.
+        return code & 0xff in (Database.SQLITE_BUSY, Database.SQLITE_LOCKED)
+    return 'locked' in str(exc) or 'busy' in str(exc)
+
+
+class RetryingCursorWrapper(base.SQLiteCursorWrapper):
+    """Cursor that retries busy statements run outside a transaction."""
+
+    busy_retries = 0
+    busy_retry_delay = 0
+
+    def execute(self, query, params=None):
+        return self._retry(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        # A generator of parameters could not be replayed.
+        return self._retry(super().executemany, query, list(param_list))
+
+    def _retry(self, method, *args):
+        attempt = 0
+        while True:
+            try:
+                return method(*args)
+            except Database.OperationalError as exc:
+                if attempt >= self.busy_retries or self.connection.in_transaction or not is_busy(exc):
+                    raise
+                attempt += 1
+                delay = self.busy_retry_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                logger.info('SQLite busy, retrying in %.3fs (attempt %d): %s', delay, attempt, args[0][:80])
+                time.sleep(delay)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        options = {name: kwargs.pop(name, DEFAULTS[name]) for name in DEFAULTS}
+        # Per-pragma overrides: a value of None leaves SQLite's own default.
+        pragmas = {**DEFAULTS['pragmas'], **options['pragmas']}
+        self.pragmas = {name: value for name, value in pragmas.items() if value is not None}
+        self.transaction_mode = str(options['transaction_mode']).upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"OPTIONS['transaction_mode'] must be one of {', '.join(TRANSACTION_MODES)}."
+            )
+        self.busy_retries = options['busy_retries']
+        self.busy_retry_delay = options['busy_retry_delay']
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            # Pragmas take no bound parameters; names and values come from settings.
+            conn.execute(f'PRAGMA {name} = {value}').fetchall()
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=RetryingCursorWrapper)
+        cursor.busy_retries = self.busy_retries
+        cursor.busy_retry_delay = self.busy_retry_delay
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
@@ -0,0 +1,41 @@
+"""
+Query budget assertions for tests and scripts.
+
+    from blog_project.testing import assert_max_queries
+
+    with assert_max_queries(3):
+        client.get('/api/blogs/')
+
+The assertion fails when the block runs more queries than budgeted, or
+repeats the same statement more often than allowed, and lists the
+offending statements.
+"""
+from contextlib import contextmanager
+
+from .instrumentation import QueryRecorder
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def describe(recorder):
+    lines = [f'{recorder.count} queries, {recorder.seconds * 1000:.1f} ms']
+    for sql, count in recorder.fingerprints.most_common():
+        lines.append(f'  {count} x {sql}')
+    return '\n'.join(lines)
+
+
+@contextmanager
+def assert_max_queries(budget, max_duplicates=None, using=None):
+    """Fail if the block runs more than `budget` queries (or too many repeats)."""
+    recorder = QueryRecorder()
+    aliases = (using,) if using else ()
+    with recorder.record(*aliases):
+        yield recorder
+    if recorder.count > budget:
+        raise QueryBudgetExceeded(f'Query budget of {budget} exceeded:\n{describe(recorder)}')
+    if max_duplicates is not None and recorder.duplicate_count > max_duplicates:
+        raise QueryBudgetExceeded(
+            f'{recorder.duplicate_count} repeated queries (allowed {max_duplicates}):\n{describe(recorder)}'
+        )
@@ -6,10 +6,15 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from blogs.sitemaps import sitemap_chunk, sitemap_index
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('users.urls')),
     path('api/blogs/', include('blogs.urls')),
+    path('api/async/blogs/', include('blogs.async_urls')),
+    path('sitemap.xml', sitemap_index, name='sitemap-index'),
+    path('sitemap-<int:number>.xml', sitemap_chunk, name='sitemap-chunk'),
 ]
 
 # Serve media files in development
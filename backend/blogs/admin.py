@@ -1,7 +1,9 @@
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from .models import Blog, Category, Tag, Comment
+from blog_project.images import variant_url
+from .models import Blog, BlogLike, Category, Tag, Comment
 
 
 @admin.register(Category)
@@ -12,12 +14,7 @@ class CategoryAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['name', 'description']
     prepopulated_fields = {'slug': ('name',)}
-    readonly_fields = ['created_at', 'updated_at']
-    
-    def blog_count(self, obj):
-        """Display the number of blogs in this category."""
-        return obj.blogs.count()
-    blog_count.short_description = 'Blog Count'
+    readonly_fields = ['blog_count', 'created_at', 'updated_at']
 
 
 @admin.register(Tag)
@@ -28,12 +25,7 @@ class TagAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     search_fields = ['name']
     prepopulated_fields = {'slug': ('name',)}
-    readonly_fields = ['created_at']
-    
-    def blog_count(self, obj):
-        """Display the number of blogs with this tag."""
-        return obj.blogs.count()
-    blog_count.short_description = 'Blog Count'
+    readonly_fields = ['blog_count', 'created_at']
 
 
 class CommentInline(admin.TabularInline):
@@ -94,12 +86,20 @@ class BlogAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        """Skip the post bodies on the change list."""
+        queryset = super().get_queryset(request).select_related('author', 'category')
+        match = request.resolver_match
+        if match is not None and match.url_name == 'blogs_blog_changelist':
+            queryset = queryset.for_listing()
+        return queryset
+    
     def featured_image_display(self, obj):
         """Display featured image in admin list."""
         if obj.featured_image:
             return format_html(
                 '<img src="{}" width="50" height="50" style="object-fit: cover;" />',
-                obj.featured_image.url
+                variant_url(obj, 'featured_image', 'thumb')
             )
         return 'No image'
     featured_image_display.short_description = 'Featured Image'
@@ -155,14 +155,34 @@ class CommentAdmin(admin.ModelAdmin):
     is_reply.boolean = True
     is_reply.short_description = 'Is Reply'
     
+    def set_approved(self, queryset, approved):
+        """Bulk-(dis)approve, touching updated_at as save() would.
+        
+        update() skips auto_now and the save signals, but the post and comment
+        ETags, the static export keys and the trending run all find changed
+        threads by their comments' count and latest updated_at.
+        """
+        return queryset.update(is_approved=approved, updated_at=timezone.now())
+    
     def approve_comments(self, request, queryset):
         """Approve selected comments."""
-        updated = queryset.update(is_approved=True)
+        updated = self.set_approved(queryset, True)
         self.message_user(request, f'{updated} comments were approved.')
     approve_comments.short_description = 'Approve selected comments'
     
     def disapprove_comments(self, request, queryset):
         """Disapprove selected comments."""
-        updated = queryset.update(is_approved=False)
+        updated = self.set_approved(queryset, False)
         self.message_user(request, f'{updated} comments were disapproved.')
-    disapprove_comments.short_description = 'Disapprove selected comments' 
\ No newline at end of file
+    disapprove_comments.short_description = 'Disapprove selected comments'
+
+
+@admin.register(BlogLike)
+class BlogLikeAdmin(admin.ModelAdmin):
+    """Admin interface for the blog like ledger."""
+    
+    list_display = ['user', 'blog', 'created_at']
+    list_filter = ['created_at']
+    search_fields = ['user__email', 'blog__title']
+    raw_id_fields = ['user', 'blog']
+    readonly_fields = ['created_at']
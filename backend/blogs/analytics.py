@@ -0,0 +1,206 @@
+"""
+Write-behind counters for blog analytics.
+
+Increments are accumulated in process and flushed periodically as batched
+``UPDATE ... SET field = field + n`` statements, so hot read endpoints never
+do a read-modify-write on the blog row. Because every flush is additive,
+several worker processes can buffer independently and totals stay exact.
+
+Buffered deltas are flushed by a background thread, at interpreter exit and
+in the parent right before it forks a worker, so children start with an
+empty buffer. A process that is killed (SIGKILL, OOM killer) loses what it
+buffered since its last flush: at most FLUSH_INTERVAL seconds of views and
+likes. Set FLUSH_INTERVAL to 0 to write every delta immediately.
+"""
+import atexit
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'FLUSH_INTERVAL': 10,
+    'SUPPRESS_BOTS': True,
+    'BOT_USER_AGENT_PATTERN': (
+        r'bot|crawl|spider|slurp|archiver|preview|facebookexternalhit|'
+        r'headless|curl|wget|python-requests|httpclient'
+    ),
+    'REPEAT_VIEW_WINDOW': 0,
+}
+
+
+def counter_setting(name):
+    """Read a BLOG_COUNTERS setting, falling back to the module defaults."""
+    return getattr(settings, 'BLOG_COUNTERS', {}).get(name, DEFAULTS[name])
+
+
+class CounterBuffer:
+    """Accumulate per-blog deltas for one counter field and flush them in batches."""
+
+    def __init__(self, field):
+        self.field = field
+        self._pending = defaultdict(int)
+        # Deltas taken out of _pending by a flush that has not written them yet.
+        self._in_flight = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._pid = None
+        self._flusher = None
+
+    @property
+    def flush_interval(self):
+        return counter_setting('FLUSH_INTERVAL')
+
+    def add(self, blog_id, amount=1):
+        """
+        Buffer a delta for a blog, flushing if the interval has elapsed.
+
+        Returns True if this delta has already been written to the database,
+        False while it is buffered (or if a concurrent flush wrote it).
+        """
+        if not self.flush_interval:
+            self._write({blog_id: amount})
+            return True
+        self._ensure_started()
+        with self._lock:
+            self._pending[blog_id] += amount
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            return blog_id in self._flush()
+        return False
+
+    def pending(self, blog_id):
+        """Return the delta for a blog that is not in the database yet (buffered or being written)."""
+        with self._lock:
+            return self._pending.get(blog_id, 0) + sum(deltas.get(blog_id, 0) for deltas in self._in_flight)
+
+    def flush(self):
+        """Write all buffered deltas to the database. Returns the number of blogs written."""
+        return len(self._flush())
+
+    def _flush(self):
+        """Write all buffered deltas; returns the deltas written, empty if none were or the write failed."""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            self._last_flush = time.monotonic()
+            if not pending:
+                return {}
+            self._in_flight.append(pending)
+        try:
+            self._write(pending)
+        except Exception:
+            # Put the deltas back so the next flush retries them.
+            with self._lock:
+                self._in_flight.remove(pending)
+                for blog_id, amount in pending.items():
+                    self._pending[blog_id] += amount
+            logger.exception('Failed to flush %s counters', self.field)
+            return {}
+        with self._lock:
+            self._in_flight.remove(pending)
+        return pending
+
+    def _write(self, deltas):
+        """Apply deltas with one UPDATE per distinct delta value."""
+        from .models import Blog
+
+        by_amount = defaultdict(list)
+        for blog_id, amount in deltas.items():
+            if amount:
+                by_amount[amount].append(blog_id)
+        for amount, blog_ids in by_amount.items():
+            value = F(self.field) + amount
+            if amount < 0:
+                # Counters are unsigned; never let a decrement underflow.
+                value = Greatest(value, 0)
+            Blog.objects.filter(pk__in=blog_ids).update(**{self.field: value})
+
+    def _ensure_started(self):
+        """Start the background flusher once per process (forked workers included)."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self._flusher = threading.Thread(
+                target=self._run_flusher,
+                name=f'{self.field}-counter-flusher',
+                daemon=True,
+            )
+            self._flusher.start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(max(self.flush_interval, 1))
+            close_old_connections()
+            self.flush()
+
+    def before_fork(self):
+        """Write the buffer in the parent so the child does not start with deltas it cannot own."""
+        if not self.flush():
+            return
+        # Do not hand the connection the flush may have opened to the child.
+        for connection in connections.all(initialized_only=True):
+            if not connection.in_atomic_block:
+                connection.close()
+
+    def after_fork_in_child(self):
+        """Start from an empty buffer; anything left over is retried by the parent."""
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._in_flight = []
+        self._pid = None
+        self._flusher = None
+
+
+view_counter = CounterBuffer('views')
+like_counter = CounterBuffer('likes')
+
+for counter in (view_counter, like_counter):
+    atexit.register(counter.flush)
+    os.register_at_fork(before=counter.before_fork, after_in_child=counter.after_fork_in_child)
+
+
+def is_bot(request):
+    """Check whether the request comes from a crawler or scripted client."""
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    if not user_agent:
+        return True
+    return re.search(counter_setting('BOT_USER_AGENT_PATTERN'), user_agent, re.IGNORECASE) is not None
+
+
+def viewer_key(request):
+    """Identify the viewer by user id, or by a hash of address and user agent."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'u{user.pk}'
+    raw = f"{request.META.get('REMOTE_ADDR', '')}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return 'a' + hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def record_view(request, blog):
+    """Count a view of a blog unless it is suppressed. Returns True if counted."""
+    if counter_setting('SUPPRESS_BOTS') and is_bot(request):
+        return False
+
+    window = counter_setting('REPEAT_VIEW_WINDOW')
+    if window:
+        key = f'blog-view:{blog.pk}:{viewer_key(request)}'
+        if not cache.add(key, 1, timeout=window):
+            return False
+
+    blog.increment_views()
+    return True
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class BlogsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'blogs' 
\ No newline at end of file
+    name = 'blogs'
+    
+    def ready(self):
+        """Connect model signal handlers."""
+        from . import signals  # noqa: F401
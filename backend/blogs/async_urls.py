@@ -0,0 +1,21 @@
+from django.urls import path
+from .async_views import (
+    blog_list,
+    blog_detail,
+    category_list,
+    tag_list,
+    comment_list,
+    featured_blogs,
+    popular_blogs
+)
+
+# Async variants of the read endpoints in blogs/urls.py (see blogs/async_views.py)
+urlpatterns = [
+    path('', blog_list, name='async-blog-list'),
+    path('categories/', category_list, name='async-category-list'),
+    path('tags/', tag_list, name='async-tag-list'),
+    path('featured/', featured_blogs, name='async-featured-blogs'),
+    path('popular/', popular_blogs, name='async-popular-blogs'),
+    path('<slug:slug>/', blog_detail, name='async-blog-detail'),
+    path('<slug:blog_slug>/comments/', comment_list, name='async-comment-list'),
+]
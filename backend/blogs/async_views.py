@@ -0,0 +1,260 @@
+"""
+Async variants of the blog read endpoints, served under /api/async/blogs/.
+
+They return the same responses as the DRF views in blogs/views.py (reusing
+their querysets, filters, pagination, serializers and validators), but
+run as native coroutines: queries go through Django's async ORM and
+CPU-bound work - serialization, Markdown rendering of stale posts and JSON
+encoding - runs on a small thread pool (ASYNC_VIEWS['RENDER_WORKERS']).
+While a request waits on the database or on a slow client, the event loop
+serves others instead of holding a worker thread. That only pays off under
+an ASGI server (blog_project.asgi); under WSGI they still work.
+
+Only GET/HEAD are served. DRF 3.14 has no async view support, so errors are
+rendered with DRF's exception handler by hand.
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.views import exception_handler
+
+from users.authentication import StatelessReadJWTAuthentication
+
+from .analytics import record_view
+from .cache import acached
+from .comments import approved_comments, build_comment_tree
+from .conditional import copy_validators, evaluate
+from .models import Blog, BlogLike, Category, Comment, Tag
+from .pagination import apaginate_page_number
+from .search import get_search_backend
+from .serializers import BlogListSerializer
+from .trending import WINDOW_FIELDS
+from .views import (
+    BlogDetailView,
+    BlogListView,
+    CategoryListView,
+    CommentListView,
+    TagListView,
+    blog_meta_queryset,
+    blog_tags_queryset,
+    blog_validators,
+    comment_list_validators,
+    comment_stats,
+    featured_queryset,
+    popular_queryset,
+    taxonomy_stats,
+    taxonomy_validators,
+)
+
+DEFAULTS = {
+    'RENDER_WORKERS': 4,
+}
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def async_setting(name):
+    """Read an ASYNC_VIEWS setting, falling back to the module defaults."""
+    return getattr(settings, 'ASYNC_VIEWS', {}).get(name, DEFAULTS[name])
+
+
+def get_executor():
+    """The render pool, created once per process (forked workers included)."""
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor_pid != pid:
+        with _executor_lock:
+            if _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=async_setting('RENDER_WORKERS'), thread_name_prefix='async-render'
+                )
+                _executor_pid = pid
+    return _executor
+
+
+async def run_blocking(fn, *args):
+    """Run CPU-bound fn(*args) on the render pool. fn must not touch the database."""
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), functools.partial(fn, *args))
+
+
+def json_response(data, status=200, headers=None):
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json', headers=headers)
+
+
+def async_api_view(view):
+    """Limit an async view to GET/HEAD and render API errors like DRF does."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return json_response(
+                {'detail': f'Method "{request.method}" not allowed.'}, status=405, headers={'Allow': 'GET, HEAD'}
+            )
+        try:
+            return await view(request, *args, **kwargs)
+        except (APIException, Http404) as exc:
+            response = exception_handler(exc, {})
+            headers = {name: value for name, value in response.items() if name.lower() != 'content-type'}
+            if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+                headers['WWW-Authenticate'] = StatelessReadJWTAuthentication().authenticate_header(request)
+            return json_response(response.data, status=response.status_code, headers=headers)
+    return wrapper
+
+
+def drf_view(view_class, request, **kwargs):
+    """Set up a DRF view instance to borrow its queryset, filters, paginator and serializer."""
+    view = view_class()
+    view.setup(request, **kwargs)
+    view.format_kwarg = None
+    view.request = Request(request, authenticators=view.get_authenticators())
+    return view
+
+
+async def get_or_404(queryset, **lookup):
+    try:
+        return await queryset.aget(**lookup)
+    except queryset.model.DoesNotExist:
+        raise Http404
+
+
+async def paginate(view, queryset):
+    """One page of the queryset, fetched with the async ORM using the view's paginator."""
+    paginator = view.paginator
+    if hasattr(paginator, 'apaginate_queryset'):
+        return await paginator.apaginate_queryset(queryset, view.request, view=view)
+    return await apaginate_page_number(paginator, queryset, view.request)
+
+
+def serialize_page(view, page, context):
+    """Serialize and encode one page of a list view (runs on the render pool)."""
+    serializer = view.get_serializer_class()(page, many=True, context=context)
+    return JSONRenderer().render(view.get_paginated_response(serializer.data).data)
+
+
+async def page_response(view, page, context=None):
+    content = await run_blocking(serialize_page, view, page, context or view.get_serializer_context())
+    return HttpResponse(content, content_type='application/json')
+
+
+@async_api_view
+async def blog_list(request):
+    """Async BlogListView."""
+    view = drf_view(BlogListView, request)
+    # Token claims only (StatelessReadJWTAuthentication): no query on GET.
+    user = view.request.user
+    # django-filter validates choice filters against the database, so build the queryset in a thread.
+    queryset = await sync_to_async(lambda: view.filter_queryset(view.get_queryset()))()
+    page = await paginate(view, queryset)
+
+    blog_ids = [blog.pk for blog in page]
+    context = view.get_serializer_context()
+    if user.is_authenticated:
+        context['liked_blog_ids'] = await BlogLike.objects.aliked_blog_ids(user, blog_ids)
+    search_query = getattr(view.request, 'search_query', None)
+    if search_query and blog_ids:
+        context['search_snippets'] = await sync_to_async(get_search_backend(queryset.db).snippets)(
+            search_query, blog_ids
+        )
+    return await page_response(view, page, context)
+
+
+@async_api_view
+async def blog_detail(request, slug):
+    """Async BlogDetailView, including its conditional GET handling."""
+    view = drf_view(BlogDetailView, request, slug=slug)
+    blog_meta = await get_or_404(blog_meta_queryset(), slug=slug)
+    comments = await Comment.objects.filter(blog=blog_meta, is_approved=True).aaggregate(**comment_stats())
+    tags = [tag async for tag in blog_tags_queryset(blog_meta)]
+    headers, not_modified = evaluate(request, *blog_validators(blog_meta, comments, tags))
+    if not_modified is not None:
+        await sync_to_async(record_view)(request, blog_meta)
+        return not_modified
+
+    instance = await get_or_404(view.get_queryset(), slug=slug)
+    # Counting may flush buffered views to the database.
+    await sync_to_async(record_view)(request, instance)
+
+    def render(instance):
+        return JSONRenderer().render(view.get_serializer(instance).data)
+
+    response = HttpResponse(await run_blocking(render, instance), content_type='application/json')
+    return copy_validators(headers, response)
+
+
+async def taxonomy_list(request, view_class, model):
+    view = drf_view(view_class, request)
+    stats = await model.objects.aaggregate(**taxonomy_stats())
+    headers, not_modified = evaluate(request, *taxonomy_validators(model, stats, request))
+    if not_modified is not None:
+        return not_modified
+
+    page = await paginate(view, view.get_queryset())
+    return copy_validators(headers, await page_response(view, page))
+
+
+@async_api_view
+async def category_list(request):
+    """Async CategoryListView."""
+    return await taxonomy_list(request, CategoryListView, Category)
+
+
+@async_api_view
+async def tag_list(request):
+    """Async TagListView."""
+    return await taxonomy_list(request, TagListView, Tag)
+
+
+@async_api_view
+async def comment_list(request, blog_slug):
+    """Async CommentListView: one page of threads with all their replies."""
+    view = drf_view(CommentListView, request, blog_slug=blog_slug)
+    view.blog = await get_or_404(Blog.objects.only('pk'), slug=blog_slug, status='published')
+    comments = await Comment.objects.filter(blog=view.blog, is_approved=True).aaggregate(**comment_stats())
+    headers, not_modified = evaluate(request, *comment_list_validators(view.blog, comments, request))
+    if not_modified is not None:
+        return not_modified
+
+    page = await paginate(view, view.get_queryset())
+    if page:
+        by_id = {comment.pk: comment for comment in page}
+        replies = [reply async for reply in approved_comments().filter(root_id__in=by_id)]
+        build_comment_tree(list(page) + replies)
+    return copy_validators(headers, await page_response(view, page))
+
+
+def serialize_blogs(blogs):
+    return BlogListSerializer(blogs, many=True).data
+
+
+@async_api_view
+async def featured_blogs(request):
+    """Async featured_blogs, sharing its cache entries."""
+    async def build():
+        return await run_blocking(serialize_blogs, [blog async for blog in featured_queryset()])
+
+    return json_response(await acached('featured', 'list', build))
+
+
+@async_api_view
+async def popular_blogs(request):
+    """Async popular_blogs, sharing its cache entries."""
+    window = request.GET.get('window', 'all')
+    if window != 'all' and window not in WINDOW_FIELDS:
+        return json_response({
+            'error': 'window must be one of: day, week, all'
+        }, status=400)
+
+    async def build():
+        return await run_blocking(serialize_blogs, [blog async for blog in popular_queryset(window)])
+
+    return json_response(await acached('popular', f'list:{window}', build))
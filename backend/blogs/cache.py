@@ -0,0 +1,102 @@
+"""
+Versioned response caching for blog listing endpoints.
+
+Cached payloads live under keys that embed a per-group version number.
+Invalidating a group just bumps its version (see blogs/signals.py), which
+works on every cache backend without pattern deletes; stale entries simply
+expire. Signal handlers bump again once the transaction commits, since a
+request can rebuild an entry from the old rows in between.
+
+Entries are built from the primary database even during a GET. The final
+bump runs when a write commits on the primary, and a replica that has not
+caught up yet would otherwise store the old rows for the whole timeout
+(blog_project/replicas.py).
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from blog_project.replicas import use_primary
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+    'KEY_PREFIX': 'blogs',
+}
+
+
+def cache_setting(name):
+    """Read a BLOG_CACHE setting, falling back to the module defaults."""
+    return getattr(settings, 'BLOG_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def get_cache():
+    return caches[cache_setting('ALIAS')]
+
+
+def version_key(group):
+    return f"{cache_setting('KEY_PREFIX')}:version:{group}"
+
+
+def group_version(group):
+    """Current version number of a cache group."""
+    cache = get_cache()
+    version = cache.get(version_key(group))
+    if version is None:
+        cache.add(version_key(group), 1, timeout=None)
+        version = cache.get(version_key(group), 1)
+    return version
+
+
+async def agroup_version(group):
+    """group_version for async views."""
+    cache = get_cache()
+    version = await cache.aget(version_key(group))
+    if version is None:
+        await cache.aadd(version_key(group), 1, timeout=None)
+        version = await cache.aget(version_key(group), 1)
+    return version
+
+
+def invalidate(*groups):
+    """Invalidate every cached entry in the given groups."""
+    cache = get_cache()
+    for group in groups:
+        key = version_key(group)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # No version stored yet: start above the implicit version 1.
+            cache.set(key, 2, timeout=None)
+
+
+def invalidate_on_commit(*groups, using=DEFAULT_DB_ALIAS):
+    """Invalidate the groups now and again once the current transaction commits."""
+    if not groups:
+        return
+    invalidate(*groups)
+    transaction.on_commit(lambda: invalidate(*groups), using=using)
+
+
+def cached(group, key, build, timeout=None):
+    """Return the cached value for (group, key), building and storing it on a miss."""
+    cache = get_cache()
+    full_key = f"{cache_setting('KEY_PREFIX')}:{group}:v{group_version(group)}:{key}"
+    value = cache.get(full_key)
+    if value is None:
+        with use_primary():
+            value = build()
+        cache.set(full_key, value, timeout=cache_setting('TIMEOUT') if timeout is None else timeout)
+    return value
+
+
+async def acached(group, key, build, timeout=None):
+    """cached() for async views; build is a coroutine function."""
+    cache = get_cache()
+    full_key = f"{cache_setting('KEY_PREFIX')}:{group}:v{await agroup_version(group)}:{key}"
+    value = await cache.aget(full_key)
+    if value is None:
+        with use_primary():
+            value = await build()
+        await cache.aset(full_key, value, timeout=cache_setting('TIMEOUT') if timeout is None else timeout)
+    return value
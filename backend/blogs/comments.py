@@ -0,0 +1,58 @@
+"""
+Comment tree loading.
+
+Approved comments are fetched in a single query (per blog, or per set of
+threads via Comment.root) and linked into a reply tree in memory. Each
+comment in the tree gets a ``tree_replies`` list that CommentSerializer
+renders instead of querying for replies one comment at a time.
+
+A reply whose parent is not approved is hidden together with its subtree.
+"""
+from django.db.models import Q
+
+from .models import Comment
+
+
+def approved_comments():
+    """Base queryset for comments shown to readers."""
+    return Comment.objects.filter(is_approved=True).select_related('author')
+
+
+def build_comment_tree(comments):
+    """Link comments into reply lists and return the top-level ones in order."""
+    by_id = {comment.pk: comment for comment in comments}
+    roots = []
+    for comment in comments:
+        comment.tree_replies = []
+    for comment in comments:
+        if comment.parent_id is None:
+            roots.append(comment)
+        elif comment.parent_id in by_id:
+            by_id[comment.parent_id].tree_replies.append(comment)
+    return roots
+
+
+def load_comment_tree(blog):
+    """Return the approved top-level comments of a blog with all replies attached."""
+    return build_comment_tree(list(approved_comments().filter(blog=blog)))
+
+
+def attach_threads(top_level_comments):
+    """Attach the full reply trees to already-loaded top-level comments."""
+    top_level_comments = list(top_level_comments)
+    if not top_level_comments:
+        return top_level_comments
+    by_id = {comment.pk: comment for comment in top_level_comments}
+    replies = list(approved_comments().filter(root_id__in=by_id))
+    build_comment_tree(top_level_comments + replies)
+    return top_level_comments
+
+
+def load_subtree(comment):
+    """Attach the approved replies below a single comment (one query)."""
+    root_id = comment.root_id or comment.pk
+    thread = list(
+        approved_comments().filter(Q(pk=root_id) | Q(root_id=root_id)).exclude(pk=comment.pk)
+    )
+    build_comment_tree([comment] + thread)
+    return comment.tree_replies
@@ -0,0 +1,65 @@
+"""
+Conditional GET support (ETag / Last-Modified) for blog read endpoints.
+
+Views derive cheap validators from timestamps and aggregates before doing
+any real work, and answer matching If-None-Match / If-Modified-Since
+requests with 304 without loading or serializing the representation.
+ETags are weak: view and like counts in the body may move between two
+responses that share a validator.
+"""
+import hashlib
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(version):
+    """Build a weak ETag from a version string."""
+    return 'W/"%s"' % hashlib.sha1(version.encode('utf-8')).hexdigest()
+
+
+def evaluate(request, version, last_modified):
+    """Return (validator headers, 304 response or None) for a request."""
+    headers = HttpResponse()
+    headers['ETag'] = make_etag(version)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    if timestamp is not None:
+        headers['Last-Modified'] = http_date(timestamp)
+    patch_cache_control(headers, no_cache=True)
+
+    response = get_conditional_response(
+        request,
+        etag=headers['ETag'],
+        last_modified=timestamp,
+        response=headers,
+    )
+    # Django hands the given response back when no precondition applies.
+    return headers, None if response is headers else response
+
+
+def copy_validators(headers, response):
+    """Send the validators with a successful full response."""
+    if response.status_code == 200:
+        for header in ('ETag', 'Last-Modified', 'Cache-Control'):
+            if header in headers:
+                response[header] = headers[header]
+    return response
+
+
+class ConditionalGetMixin:
+    """Answer conditional GETs with 304 before the view runs its queries."""
+
+    def get_validators(self, request, *args, **kwargs):
+        """Return (version string, last modified datetime or None) for this request."""
+        raise NotImplementedError
+
+    def on_not_modified(self, request):
+        """Hook called when a 304 is returned instead of running the view."""
+
+    def get(self, request, *args, **kwargs):
+        headers, not_modified = evaluate(request, *self.get_validators(request, *args, **kwargs))
+        if not_modified is not None:
+            self.on_not_modified(request)
+            return not_modified
+        return copy_validators(headers, super().get(request, *args, **kwargs))
@@ -0,0 +1,263 @@
+"""
+Static export of published posts for serving from a CDN.
+
+`manage.py export_static <dir>` writes what anonymous readers fetch most:
+
+* every post as BlogDetailSerializer JSON (``/api/blogs/<slug>/``);
+* every page of the default blog list as BlogListSerializer JSON
+  (``/api/blogs/``, ``/api/blogs/?page=2``, ...);
+* every post as a standalone HTML page with its rendered Markdown
+  (``/blog/<slug>``, the frontend's route).
+
+Files are content-addressed: ``objects/<2 hex>/<sha256>.<ext>`` never
+changes once written, so the CDN can cache it forever. ``manifest.json``
+maps each route to its object and is the only file that must be
+revalidated:
+
+    {"version": 1, "generated_at": "...", "base_url": "https://api.example.com",
+     "routes": {"/api/blogs/": "objects/3f/3fa9....json", ...},
+     "posts": {"12": {"key": "...", "routes": {...}}},
+     "pages": {"/api/blogs/": {"key": "...", "object": "objects/3f/3fa9....json"}}}
+
+Exports are incremental. A post is only rendered again when its updated_at,
+its author, category or tags, its approved comments (or their authors) or
+the Markdown renderer changed since the manifest was written. List pages
+are walked with a keyset rather than OFFSET, and one is only serialized
+again when the posts on it, their change keys or their view and like
+counts differ. Snapshots carry the view and like counts from export time, and is_liked is always null, as for anonymous API reads.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from urllib.parse import urlsplit
+
+from django.db.models import Count, Max, Prefetch, Q
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .comments import approved_comments
+from .models import Blog
+from .rendering import renderer_signature
+from .serializers import BlogDetailSerializer
+from .views import BlogListView
+
+MANIFEST = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def detail_route(slug):
+    return f'/api/blogs/{slug}/'
+
+
+def html_route(slug):
+    return f'/blog/{slug}'
+
+
+def list_route(page):
+    return '/api/blogs/' if page == 1 else f'/api/blogs/?page={page}'
+
+
+class StaticExporter:
+    """Writes content-addressed objects under `root` and tracks them in its manifest."""
+
+    def __init__(self, root, base_url):
+        self.root = root
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip('/')
+        self.factory = RequestFactory(HTTP_HOST=parts.netloc)
+        self.secure = parts.scheme == 'https'
+        self.written = 0
+        self.reused = 0
+
+    def load_manifest(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST), encoding='utf-8') as manifest:
+                data = json.load(manifest)
+        except (FileNotFoundError, ValueError):
+            return {}
+        # Snapshots for another host or format cannot be reused.
+        if data.get('version') != MANIFEST_VERSION or data.get('base_url') != self.base_url:
+            return {}
+        return data
+
+    def save_manifest(self, manifest):
+        self.write_atomic(os.path.join(self.root, MANIFEST), json.dumps(manifest, indent=1, sort_keys=True).encode())
+
+    def write_atomic(self, path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.partial-')
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(content)
+        os.chmod(partial, 0o644)
+        os.replace(partial, path)
+
+    def store(self, content, extension):
+        """Write content under its hash (unless already there) and return its relative path."""
+        digest = hashlib.sha256(content).hexdigest()
+        relative = f'objects/{digest[:2]}/{digest}.{extension}'
+        path = os.path.join(self.root, relative)
+        if os.path.exists(path):
+            self.reused += 1
+        else:
+            self.write_atomic(path, content)
+            self.written += 1
+        return relative
+
+    def exists(self, relative):
+        return os.path.exists(os.path.join(self.root, relative))
+
+    def request(self, path, data=None):
+        """An anonymous GET for path, as the API would see it on base_url."""
+        return Request(self.factory.get(path, data, secure=self.secure))
+
+    def store_json(self, data):
+        return self.store(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 'json')
+
+    def post_keys(self):
+        """Change key per published post id: what its snapshot embeds, approved comments and renderer."""
+        renderer = hashlib.sha256(renderer_signature().encode()).hexdigest()[:12]
+        approved = Q(comments__is_approved=True)
+        rows = Blog.objects.filter(status='published').annotate(
+            comment_total=Count('comments', filter=approved, distinct=True),
+            comment_latest=Max('comments__updated_at', filter=approved),
+            commenters=Max('comments__author__updated_at', filter=approved),
+            tags_latest=Max('tags__updated_at'),
+        ).values_list(
+            'pk', 'updated_at', 'author__updated_at', 'category__updated_at', 'tags_latest',
+            'comment_total', 'comment_latest', 'commenters',
+        )
+        return {
+            str(pk): '|'.join(
+                value.isoformat() if hasattr(value, 'isoformat') else str(value if value is not None else '')
+                for value in (*versions, renderer)
+            )
+            for pk, *versions in rows
+        }
+
+    def export_posts(self, previous, keys, force=False, batch_size=100):
+        """Render changed posts; returns the manifest 'posts' section and the number rendered."""
+        posts = {}
+        stale = []
+        for pk, key in keys.items():
+            entry = previous.get(pk)
+            if (not force and entry and entry['key'] == key
+                    and all(self.exists(relative) for relative in entry['routes'].values())):
+                posts[pk] = entry
+            else:
+                stale.append(int(pk))
+
+        queryset = Blog.objects.filter(status='published').select_related('author', 'category').prefetch_related(
+            'tags', Prefetch('comments', queryset=approved_comments(), to_attr='approved_comments')
+        )
+        for start in range(0, len(stale), batch_size):
+            for blog in queryset.filter(pk__in=stale[start:start + batch_size]):
+                request = self.request(detail_route(blog.slug))
+                data = BlogDetailSerializer(blog, context={'request': request}).data
+                html = render_to_string('blogs/static_post.html', {'blog': blog, 'post': data})
+                posts[str(blog.pk)] = {
+                    'key': keys[str(blog.pk)],
+                    'routes': {
+                        detail_route(blog.slug): self.store_json(data),
+                        html_route(blog.slug): self.store(html.encode('utf-8'), 'html'),
+                    },
+                }
+        return posts, len(stale)
+
+    def list_view(self, page):
+        """A BlogListView set up for an anonymous GET of list page `page`."""
+        request = self.request('/api/blogs/', {'page': page} if page > 1 else {})
+        view = BlogListView()
+        view.setup(request._request)
+        view.request = request
+        view.format_kwarg = None
+        return view
+
+    def export_list_pages(self, previous, keys, force=False):
+        """Every page of the default /api/blogs/ listing; returns its routes and their page keys.
+
+        Pages are walked with KeysetPagination's ordering and cursor filter,
+        so each page costs one indexed query instead of an OFFSET scan. The
+        payload is what the API's page-number mode returns for ?page=N. A page
+        whose key (its posts' change keys, counts and position) matches the
+        previous manifest reuses its object without being serialized again.
+        """
+        view = self.list_view(1)
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+        field, descending = paginator.get_ordering(queryset)
+        page_size = paginator.get_page_size(view.request)
+        count = queryset.count()
+        num_pages = max(1, -(-count // page_size))
+        walk = queryset.prefetch_related(None).order_by(*paginator.order_expressions(field, descending))
+
+        routes, pages = {}, {}
+        cursor = None
+        for page in range(1, num_pages + 1):
+            rows = walk.filter(paginator.after(field, descending, *cursor)) if cursor else walk
+            rows = list(rows.values_list('pk', field, 'views', 'likes')[:page_size])
+            if rows:
+                cursor = rows[-1][1], rows[-1][0]
+            route = list_route(page)
+            key = hashlib.sha256(json.dumps(
+                [count, num_pages, [(pk, keys.get(str(pk)), views, likes) for pk, _, views, likes in rows]]
+            ).encode()).hexdigest()
+            entry = previous.get(route)
+            if not force and entry and entry['key'] == key and self.exists(entry['object']):
+                routes[route] = entry['object']
+            else:
+                routes[route] = self.store_json(self.render_list_page(page, count, [row[0] for row in rows]))
+            pages[route] = {'key': key, 'object': routes[route]}
+        return routes, pages
+
+    def render_list_page(self, page, count, pks):
+        """List page `page` holding the posts pks, shaped like the API's page-number response."""
+        view = self.list_view(page)
+        by_pk = view.get_queryset().in_bulk(pks)
+        objects = [by_pk[pk] for pk in pks if pk in by_pk]
+        url = view.request.build_absolute_uri()
+        param = view.paginator.page_query_param
+        previous = None
+        if page == 2:
+            previous = remove_query_param(url, param)
+        elif page > 2:
+            previous = replace_query_param(url, param, page - 1)
+        has_next = page * view.paginator.get_page_size(view.request) < count
+        return {
+            'count': count,
+            'next': replace_query_param(url, param, page + 1) if has_next else None,
+            'previous': previous,
+            'results': view.get_serializer(objects, many=True).data,
+        }
+
+    def export(self, force=False):
+        manifest = self.load_manifest()
+        keys = self.post_keys()
+        posts, rendered = self.export_posts(manifest.get('posts', {}), keys, force=force)
+        routes, pages = self.export_list_pages(manifest.get('pages', {}), keys, force=force)
+        for entry in posts.values():
+            routes.update(entry['routes'])
+        self.save_manifest({
+            'version': MANIFEST_VERSION,
+            'generated_at': timezone.now().isoformat(),
+            'base_url': self.base_url,
+            'routes': dict(sorted(routes.items())),
+            'posts': posts,
+            'pages': pages,
+        })
+        return {'posts': len(posts), 'rendered': rendered, 'routes': len(routes)}
+
+    def prune(self):
+        """Delete objects the current manifest no longer references; returns how many."""
+        referenced = set(self.load_manifest().get('routes', {}).values())
+        removed = 0
+        for directory, _, files in os.walk(os.path.join(self.root, 'objects')):
+            for name in files:
+                relative = os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, '/')
+                if relative not in referenced:
+                    os.remove(os.path.join(directory, name))
+                    removed += 1
+        return removed
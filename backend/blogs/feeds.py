@@ -0,0 +1,154 @@
+"""
+RSS and Atom feeds of published posts: site-wide and per category, tag and author.
+
+Each feed document is built once and kept in the blog cache (blogs/cache.py)
+under its own group, e.g. 'feed-category-python'. blogs/signals.py
+invalidates only the groups a change can affect: publishing, editing or
+unpublishing a post drops the site feed and the feeds of its author, its
+category and its tags (old and new). Renaming a category, tag or author
+bumps the 'feeds' group, which every document key embeds.
+
+A cached document is served with a strong ETag (a hash of its bytes) and
+Last-Modified, so a feed reader's poll costs two cache reads and usually
+ends in a 304. Rebuilding the same posts gives the same bytes and the same
+ETag. Post bodies come from the stored content_html, so a rebuild never
+renders Markdown. Documents are built through cached(), which reads from
+the primary: a replica that has not caught up with the change that
+invalidated a feed would otherwise pin the stale document for a day.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .cache import cached, group_version
+from .models import Blog, Category, Tag
+
+User = get_user_model()
+
+DEFAULTS = {
+    'TITLE': 'Blog',
+    'DESCRIPTION': 'Latest posts',
+    'SITE_URL': 'http://localhost:3000',
+    'ITEMS': 20,
+    'TIMEOUT': 86400,
+    'MAX_AGE': 300,
+}
+
+FORMATS = {
+    'rss': Rss201rev2Feed,
+    'atom': Atom1Feed,
+}
+
+# Blog fields that appear in a feed; saves touching none of them keep the feeds.
+FEED_FIELDS = {'title', 'slug', 'excerpt', 'content', 'status', 'category', 'author', 'published_at'}
+
+
+def feed_setting(name):
+    """Read a FEEDS setting, falling back to the module defaults."""
+    return getattr(settings, 'FEEDS', {}).get(name, DEFAULTS[name])
+
+
+def post_url(blog):
+    """The post's page on the frontend."""
+    return f"{feed_setting('SITE_URL').rstrip('/')}/blog/{blog.slug}"
+
+
+def feed_group(scope, value=None):
+    return 'feed-all' if scope == 'all' else f'feed-{scope}-{value}'
+
+
+def blog_feed_groups(blog, created=False, tag_ids=None):
+    """Feed groups a change to this blog can affect (tag_ids: tags it had, default its current tags)."""
+    stored = {} if created else blog.stored_state()
+    if blog.status != 'published' and stored.get('status', 'published') != 'published':
+        return []
+    category_ids = {blog.category_id, stored.get('category_id')} - {None}
+    tags = Tag.objects.filter(blogs__pk=blog.pk) if tag_ids is None else Tag.objects.filter(pk__in=tag_ids)
+    return [
+        feed_group('all'),
+        feed_group('author', blog.author_id),
+        *(feed_group('category', slug) for slug in
+          Category.objects.filter(pk__in=category_ids).values_list('slug', flat=True)),
+        *(feed_group('tag', slug) for slug in tags.values_list('slug', flat=True)),
+    ]
+
+
+def feed_meta(scope, value):
+    """(title, description, post filter) for a feed; raises Http404 for unknown objects."""
+    title, description = feed_setting('TITLE'), feed_setting('DESCRIPTION')
+    if scope == 'category':
+        category = get_object_or_404(Category, slug=value)
+        return f'{title}: {category.name}', category.description or description, {'category': category}
+    if scope == 'tag':
+        tag = get_object_or_404(Tag, slug=value)
+        return f'{title}: {tag.name}', description, {'tags': tag}
+    if scope == 'author':
+        author = get_object_or_404(User, pk=value)
+        return f'{title}: {author.name}', description, {'author': author}
+    return title, description, {}
+
+
+def build_feed(fmt, scope, value):
+    """Render a feed document; returns the cache entry served by blog_feed."""
+    title, description, filters = feed_meta(scope, value)
+    posts = list(
+        Blog.objects.filter(status='published', **filters)
+        .select_related('author', 'category')
+        .prefetch_related('tags')
+        .order_by('-created_at')[:feed_setting('ITEMS')]
+    )
+    feed = FORMATS[fmt](
+        title=title,
+        link=feed_setting('SITE_URL'),
+        description=description,
+        language=settings.LANGUAGE_CODE,
+    )
+    for blog in posts:
+        link = post_url(blog)
+        categories = [blog.category.name] if blog.category else []
+        feed.add_item(
+            title=blog.title,
+            link=link,
+            description=blog.formatted_content,
+            author_name=blog.author.name,
+            pubdate=blog.published_at or blog.created_at,
+            updateddate=blog.updated_at,
+            unique_id=link,
+            categories=categories + [tag.name for tag in blog.tags.all()],
+        )
+    body = feed.writeString('utf-8').encode('utf-8')
+    return {
+        'body': body,
+        'content_type': feed.content_type,
+        'etag': '"%s"' % hashlib.sha256(body).hexdigest()[:32],
+        # Build time rather than the newest post: unpublishing a post must not move it back.
+        'last_modified': int(time.time()),
+    }
+
+
+@require_safe
+def blog_feed(request, fmt, scope='all', value=None):
+    """Serve a cached feed document with strong validators."""
+    if fmt not in FORMATS:
+        raise Http404('Unknown feed format.')
+    entry = cached(
+        feed_group(scope, value),
+        f"{fmt}:{group_version('feeds')}",
+        lambda: build_feed(fmt, scope, value),
+        timeout=feed_setting('TIMEOUT'),
+    )
+    response = HttpResponse(entry['body'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    patch_cache_control(response, public=True, max_age=feed_setting('MAX_AGE'))
+    return get_conditional_response(
+        request, etag=entry['etag'], last_modified=entry['last_modified'], response=response
+    )
@@ -0,0 +1,34 @@
+from django.core.exceptions import DisallowedHost
+from django.core.management.base import BaseCommand, CommandError
+
+from blogs.export import StaticExporter
+
+
+class Command(BaseCommand):
+    """Pre-render published posts and list pages into a content-addressed tree for a CDN."""
+
+    help = (
+        'Export published posts (detail JSON and HTML) and blog list pages to DIRECTORY as '
+        'content-addressed files plus manifest.json (only changed posts unless --force).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Output directory (created if missing).')
+        parser.add_argument('--base-url', default='http://localhost:8000',
+                            help='Origin the API is served from; used for absolute links and media URLs.')
+        parser.add_argument('--force', action='store_true', help='Re-render every post.')
+        parser.add_argument('--prune', action='store_true',
+                            help='Delete objects the new manifest no longer references.')
+
+    def handle(self, *args, **options):
+        exporter = StaticExporter(options['directory'], options['base_url'])
+        try:
+            stats = exporter.export(force=options['force'])
+        except DisallowedHost as exc:
+            raise CommandError(f'{exc} (the --base-url host must be in ALLOWED_HOSTS)')
+        removed = exporter.prune() if options['prune'] else 0
+        self.stdout.write(
+            f"{stats['posts']} posts ({stats['rendered']} rendered), {stats['routes']} routes; "
+            f'{exporter.written} objects written, {exporter.reused} unchanged, {removed} pruned'
+        )
+        self.stdout.write(self.style.SUCCESS(f"Static export written to {options['directory']}."))
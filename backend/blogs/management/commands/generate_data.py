@@ -0,0 +1,343 @@
+import bisect
+import datetime
+import itertools
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blogs.cache import invalidate
+from blogs.models import Blog, BlogLike, Category, Comment, Tag
+from blogs.rendering import content_hash, render_markdown
+from blogs.search import get_search_backend
+from blogs.taxonomy import recount_categories, recount_tags
+
+User = get_user_model()
+
+WORDS = (
+    'django python query index cache latency model view serializer request '
+    'response database replica cursor page token thread worker markdown render '
+    'template signal queue batch stream search rank score deploy server client '
+    'async memory disk network schema migration feature release review design '
+    'product team metric trace profile benchmark scale shard pool session '
+    'browser mobile image layout component state store event api endpoint'
+).split()
+
+PARAGRAPH_POOL_SIZE = 2000
+
+
+def zipf_cum_weights(n, exponent):
+    """Cumulative Zipf weights for ranks 1..n (for bisect-based sampling)."""
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+class Command(BaseCommand):
+    """Bulk-generate a large, skewed and reproducible dataset."""
+
+    help = (
+        'Generate synthetic users, posts, tags, likes and comment threads with bulk inserts. '
+        'The same --seed always produces the same data.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Number of users.')
+        parser.add_argument('--blogs', type=int, default=10000, help='Number of blog posts.')
+        parser.add_argument('--categories', type=int, default=20, help='Number of categories.')
+        parser.add_argument('--tags', type=int, default=500, help='Number of tags.')
+        parser.add_argument('--tags-per-blog', type=float, default=3.0,
+                            help='Mean number of tags per post (tag popularity is Zipf-distributed).')
+        parser.add_argument('--comments-per-blog', type=float, default=5.0,
+                            help='Mean number of comments per post (exponentially distributed).')
+        parser.add_argument('--reply-ratio', type=float, default=0.6,
+                            help='Share of comments that reply to an earlier comment in the thread.')
+        parser.add_argument('--max-depth', type=int, default=10, help='Maximum reply nesting depth.')
+        parser.add_argument('--max-views', type=int, default=1000000, help='Views of the most-viewed post.')
+        parser.add_argument('--zipf', type=float, default=1.1,
+                            help='Zipf exponent for views, author activity and tag popularity.')
+        parser.add_argument('--like-rate', type=float, default=0.02, help='Likes per view.')
+        parser.add_argument('--max-likes-per-blog', type=int, default=500,
+                            help='Cap on generated like records per post.')
+        parser.add_argument('--paragraphs', type=int, default=6, help='Mean number of paragraphs per post.')
+        parser.add_argument('--draft-ratio', type=float, default=0.1, help='Share of posts left as drafts.')
+        parser.add_argument('--featured-ratio', type=float, default=0.005, help='Share of posts marked featured.')
+        parser.add_argument('--days', type=int, default=730, help='Spread publication dates over this many days.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed.')
+        parser.add_argument('--prefix', default='gen',
+                            help='Prefix for generated emails and slugs (must be unused in the database).')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows per bulk insert.')
+        parser.add_argument('--skip-search-index', action='store_true',
+                            help='Do not rebuild the full-text index (run rebuild_search_index later).')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.chunk_size = options['chunk_size']
+        self.started = time.monotonic()
+
+        if User.objects.filter(email=f'{self.prefix}-user-0@example.com').exists():
+            raise CommandError(
+                f'Data with prefix "{self.prefix}" already exists; pass a different --prefix '
+                f'or start from an empty database.'
+            )
+        if options['blogs'] and not options['users']:
+            raise CommandError('--blogs needs at least one user.')
+
+        # Dates are anchored to midnight so the same seed gives the same data all day.
+        self.end = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+        self.build_paragraph_pool()
+        self.user_ids = self.generate_users()
+        self.category_ids = self.generate_named(Category, options['categories'], 'category')
+        self.tag_ids = self.generate_named(Tag, options['tags'], 'tag')
+        self.generate_blogs()
+
+        self.log('Recounting categories and tags')
+        recount_categories()
+        recount_tags()
+        if not options['skip_search_index']:
+            self.log('Rebuilding the search index')
+            with transaction.atomic():
+                get_search_backend().rebuild()
+        self.reset_sequences()
+        invalidate('featured', 'popular')
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {options['users']} users, {options['blogs']} posts and "
+            f"{self.comment_total} comments in {time.monotonic() - self.started:.1f}s."
+        ))
+
+    def log(self, message):
+        if self.options['verbosity'] >= 1:
+            self.stdout.write(f'[{time.monotonic() - self.started:7.1f}s] {message}')
+
+    def next_id(self, model):
+        return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+    def sentence(self, low, high):
+        words = self.rng.choices(WORDS, k=self.rng.randint(low, high))
+        return ' '.join(words).capitalize()
+
+    def build_paragraph_pool(self):
+        """
+        Render a pool of paragraphs once; posts are assembled from it.
+
+        Markdown renders blank-line separated plain blocks independently, so the
+        HTML of a post is the HTML of its paragraphs joined by newlines.
+        """
+        self.paragraphs = []
+        for i in range(PARAGRAPH_POOL_SIZE):
+            if i % 10 == 0:
+                text = '## ' + self.sentence(2, 6)
+            else:
+                text = '. '.join(self.sentence(6, 18) for _ in range(self.rng.randint(2, 6))) + '.'
+            self.paragraphs.append((text, render_markdown(text), len(text.split())))
+
+    def generate_users(self):
+        count = self.options['users']
+        self.log(f'Creating {count} users')
+        first_id = self.next_id(User)
+        # Hashing is deliberately slow, so every generated user shares one hash.
+        password = make_password(f'{self.prefix}-password')
+        joined = self.end - datetime.timedelta(days=self.options['days'])
+        for start in range(0, count, self.chunk_size):
+            User.objects.bulk_create([
+                User(
+                    pk=first_id + i,
+                    email=f'{self.prefix}-user-{i}@example.com',
+                    name=f'{self.sentence(1, 1)} {self.sentence(1, 1)}',
+                    password=password,
+                    date_joined=joined,
+                    avatar='',
+                    avatar_variants={},
+                )
+                for i in range(start, min(start + self.chunk_size, count))
+            ])
+        return list(range(first_id, first_id + count))
+
+    def generate_named(self, model, count, kind):
+        self.log(f'Creating {count} {model._meta.verbose_name_plural.lower()}')
+        first_id = self.next_id(model)
+        model.objects.bulk_create([
+            model(pk=first_id + i, name=f'{self.prefix} {kind} {i}', slug=f'{self.prefix}-{kind}-{i}')
+            for i in range(count)
+        ], batch_size=self.chunk_size)
+        return list(range(first_id, first_id + count))
+
+    def generate_blogs(self):
+        options = self.options
+        count = options['blogs']
+        rng = self.rng
+
+        # Views follow Zipf's law over a random popularity ranking.
+        ranks = list(range(1, count + 1))
+        rng.shuffle(ranks)
+        author_weights = zipf_cum_weights(len(self.user_ids), options['zipf'])
+        tag_weights = zipf_cum_weights(len(self.tag_ids), options['zipf'])
+
+        first_blog_id = self.next_id(Blog)
+        self.next_comment_id = self.next_id(Comment)
+        self.comment_total = 0
+
+        for start in range(0, count, self.chunk_size):
+            stop = min(start + self.chunk_size, count)
+            blogs, taggings, likes, comments = [], [], [], []
+            for i in range(start, stop):
+                blog = self.make_blog(first_blog_id + i, i, ranks[i], author_weights)
+                blogs.append(blog)
+                taggings.extend(self.make_taggings(blog, tag_weights))
+                if blog['status'] == 'published':
+                    likes.extend(self.make_likes(blog))
+                    comments.extend(self.make_thread(blog))
+
+            with transaction.atomic():
+                self.insert_rows(Blog, blogs)
+                self.insert_rows(Blog.tags.through, taggings)
+                self.insert_rows(BlogLike, likes)
+                self.insert_rows(Comment, comments)
+            self.comment_total += len(comments)
+            self.log(f'Created posts {start + 1}-{stop} of {count}')
+
+    def insert_rows(self, model, rows):
+        """
+        Insert row dicts (keyed by attname) with executemany.
+
+        Skips model instantiation, which dominates bulk_create at these
+        volumes. Values (and the defaults of missing fields) still go through
+        get_db_prep_save(), so JSON, datetime etc. columns get database form.
+        """
+        if not rows:
+            return
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not (field.primary_key and field.attname not in rows[0])
+        ]
+        columns = [(field.attname, field.get_default(), field.get_db_prep_save) for field in fields]
+        quote = connection.ops.quote_name
+        sql = 'INSERT INTO %s (%s) VALUES (%s)' % (
+            quote(model._meta.db_table),
+            ', '.join(quote(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        params = [
+            tuple(prepare(row.get(attname, default), connection) for attname, default, prepare in columns)
+            for row in rows
+        ]
+        with connection.cursor() as cursor:
+            for start in range(0, len(params), self.chunk_size):
+                cursor.executemany(sql, params[start:start + self.chunk_size])
+
+    def random_time(self, after, within_days):
+        """A random moment up to within_days after `after`, never later than the anchor date."""
+        return min(after + datetime.timedelta(seconds=self.rng.randint(0, within_days * 86400)), self.end)
+
+    def make_blog(self, pk, index, rank, author_weights):
+        options = self.options
+        rng = self.rng
+
+        picked = [
+            rng.choice(self.paragraphs)
+            for _ in range(max(1, int(rng.expovariate(1 / options['paragraphs']))))
+        ]
+        content = '\n\n'.join(text for text, _, _ in picked)
+        words = sum(word_count for _, _, word_count in picked)
+
+        published = rng.random() >= options['draft_ratio']
+        created = self.end - datetime.timedelta(seconds=rng.randint(0, options['days'] * 86400))
+        return {
+            'id': pk,
+            'title': self.sentence(3, 9),
+            'slug': f'{self.prefix}-{index}',
+            'content': content,
+            'content_html': '\n'.join(html for _, html, _ in picked),
+            'content_html_hash': content_hash(content),
+            'word_count': words,
+            'reading_time': max(1, round(words / 200)),
+            'excerpt': content.lstrip('# ')[:150],
+            # No images, so no variants for generate_image_variants to build.
+            'featured_image': '',
+            'featured_image_variants': {},
+            'author_id': self.user_ids[bisect.bisect_left(author_weights, rng.random() * author_weights[-1])],
+            'category_id': rng.choice(self.category_ids) if self.category_ids else None,
+            'status': 'published' if published else 'draft',
+            'is_featured': published and rng.random() < options['featured_ratio'],
+            'views': int(options['max_views'] / rank ** options['zipf']) if published else 0,
+            'likes': 0,
+            'created_at': created,
+            'updated_at': created,
+            'published_at': created if published else None,
+        }
+
+    def make_taggings(self, blog, tag_weights):
+        if not self.tag_ids or not self.options['tags_per_blog']:
+            return []
+        wanted = int(self.rng.expovariate(1 / self.options['tags_per_blog']))
+        tag_ids = {
+            self.tag_ids[bisect.bisect_left(tag_weights, self.rng.random() * tag_weights[-1])]
+            for _ in range(min(wanted, len(self.tag_ids)))
+        }
+        return [{'blog_id': blog['id'], 'tag_id': tag_id} for tag_id in sorted(tag_ids)]
+
+    def make_likes(self, blog):
+        wanted = min(
+            int(blog['views'] * self.options['like_rate']),
+            self.options['max_likes_per_blog'],
+            len(self.user_ids),
+        )
+        blog['likes'] = wanted
+        return [
+            {
+                'user_id': user_id,
+                'blog_id': blog['id'],
+                'created_at': self.random_time(blog['created_at'], 30),
+            }
+            for user_id in self.rng.sample(self.user_ids, wanted)
+        ]
+
+    def make_thread(self, blog):
+        """Comments for one post; replies favour recent comments, which makes threads deep."""
+        options = self.options
+        rng = self.rng
+        mean = options['comments_per_blog']
+        count = int(rng.expovariate(1 / mean)) if mean else 0
+
+        thread = []
+        for _ in range(count):
+            comment = {
+                'id': self.next_comment_id,
+                'blog_id': blog['id'],
+                'author_id': rng.choice(self.user_ids),
+                'content': self.sentence(4, 30) + '.',
+                'is_approved': rng.random() >= 0.03,
+                'parent_id': None,
+                'root_id': None,
+                'depth': 0,
+                'created_at': self.random_time(blog['created_at'], 30),
+            }
+            self.next_comment_id += 1
+            if thread and rng.random() < options['reply_ratio']:
+                parent = rng.choice(thread[-5:])
+                if parent['depth'] < options['max_depth']:
+                    comment['parent_id'] = parent['id']
+                    comment['root_id'] = parent['root_id'] or parent['id']
+                    comment['depth'] = parent['depth'] + 1
+                    comment['created_at'] = self.random_time(parent['created_at'], 2)
+            thread.append(comment)
+
+        for comment in thread:
+            comment['updated_at'] = comment['created_at']
+        return thread
+
+    def reset_sequences(self):
+        """Explicit primary keys bypass sequences on PostgreSQL; move them past the new rows."""
+        statements = connection.ops.sequence_reset_sql(no_style(), [User, Category, Tag, Blog, Comment])
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
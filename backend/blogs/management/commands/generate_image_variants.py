@@ -0,0 +1,36 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from blog_project.images import generate, variants_field
+from blogs.models import Blog
+
+IMAGE_FIELDS = {
+    'blogs': (Blog, 'featured_image'),
+    'users': (get_user_model(), 'avatar'),
+}
+
+
+class Command(BaseCommand):
+    """Backfill resized variants for featured images and avatars."""
+
+    help = 'Generate missing resized variants of blog featured images and user avatars.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=sorted(IMAGE_FIELDS), help='Only process blogs or users.')
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate variants even for images that already have them.')
+
+    def handle(self, *args, **options):
+        for label, (model, field_name) in IMAGE_FIELDS.items():
+            if options['only'] and options['only'] != label:
+                continue
+            rows = model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            generated = skipped = 0
+            for pk, name, variants in list(rows.values_list('pk', field_name, variants_field(field_name))):
+                if not options['force'] and (variants or {}).get('source') == name:
+                    skipped += 1
+                    continue
+                generate(model, pk, field_name)
+                generated += 1
+            self.stdout.write(f'{label}: {generated} generated, {skipped} already up to date')
+        self.stdout.write(self.style.SUCCESS('Image variants generated.'))
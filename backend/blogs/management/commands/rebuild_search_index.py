@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from blogs.search import FallbackSearchBackend, get_search_backend
+
+
+class Command(BaseCommand):
+    """Rebuild the full-text search index from scratch."""
+
+    help = 'Re-index every published blog post in the full-text search backend.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database alias whose search index should be rebuilt.'
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options['database'])
+        if isinstance(backend, FallbackSearchBackend):
+            self.stdout.write(self.style.WARNING(
+                'This database has no full-text index; search falls back to icontains.'
+            ))
+            return
+
+        with transaction.atomic(using=options['database']):
+            backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt the search index with {type(backend).__name__}.'
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blogs.models import Category, Tag
+from blogs.taxonomy import recount_categories, recount_tags
+
+
+class Command(BaseCommand):
+    """Repair drift in the denormalized Category/Tag blog counts."""
+
+    help = 'Recompute published-post counts for every category and tag.'
+
+    def handle(self, *args, **options):
+        before = {
+            'categories': dict(Category.objects.values_list('pk', 'blog_count')),
+            'tags': dict(Tag.objects.values_list('pk', 'blog_count')),
+        }
+        with transaction.atomic():
+            recount_categories()
+            recount_tags()
+        after = {
+            'categories': dict(Category.objects.values_list('pk', 'blog_count')),
+            'tags': dict(Tag.objects.values_list('pk', 'blog_count')),
+        }
+
+        for kind in ('categories', 'tags'):
+            drifted = sum(1 for pk, count in after[kind].items() if before[kind].get(pk) != count)
+            self.stdout.write(f'{kind}: {len(after[kind])} checked, {drifted} corrected')
+        self.stdout.write(self.style.SUCCESS('Blog counts reconciled.'))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from blogs.models import Blog
+from blogs.rendering import content_hash, render_markdown
+
+
+class Command(BaseCommand):
+    """Backfill or refresh the stored markdown HTML for blog posts."""
+
+    help = 'Render blog markdown into the stored HTML cache (only stale posts unless --force).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render every post, even if its stored HTML is up to date.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Number of posts to load and update per batch.'
+        )
+
+    def handle(self, *args, **options):
+        force = options['force']
+        batch_size = options['batch_size']
+
+        checked = rendered = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Blog.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .only('pk', 'content', 'content_html_hash')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            stale = []
+            for blog in batch:
+                new_hash = content_hash(blog.content)
+                if force or blog.content_html_hash != new_hash:
+                    blog.content_html = render_markdown(blog.content)
+                    blog.content_html_hash = new_hash
+                    stale.append(blog)
+
+            if stale:
+                Blog.objects.bulk_update(stale, ['content_html', 'content_html_hash'])
+            checked += len(batch)
+            rendered += len(stale)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} posts, rendered {rendered}.'
+        ))
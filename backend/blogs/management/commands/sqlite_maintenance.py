@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    """Routine upkeep of an SQLite database: statistics, free pages, WAL and backups."""
+
+    help = (
+        'Run ANALYZE and PRAGMA optimize, reclaim free pages with incremental vacuum, '
+        'checkpoint the WAL and optionally take an online backup (run periodically, e.g. nightly from cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to maintain.')
+        parser.add_argument('--skip-analyze', action='store_true',
+                            help='Only run PRAGMA optimize instead of a full ANALYZE.')
+        parser.add_argument('--vacuum-pages', type=int, default=0,
+                            help='Free pages to reclaim by incremental vacuum (default: all).')
+        parser.add_argument('--full-vacuum', action='store_true',
+                            help='Rebuild the whole file with VACUUM. It blocks writers while it runs, but is '
+                                 'needed once to turn on incremental vacuum for a database created without it.')
+        parser.add_argument('--backup', metavar='PATH',
+                            help='Write an online backup to PATH (a directory gets a timestamped file).')
+        parser.add_argument('--backup-pages', type=int, default=256,
+                            help='Pages copied per backup step; writers can proceed between steps.')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"Database '{options['database']}' is not SQLite.")
+
+        with connection.cursor() as cursor:
+            if not options['skip_analyze']:
+                started = time.monotonic()
+                cursor.execute('ANALYZE')
+                self.stdout.write(f'ANALYZE done in {time.monotonic() - started:.2f}s')
+            cursor.execute('PRAGMA optimize')
+            cursor.fetchall()
+
+            if options['full_vacuum']:
+                started = time.monotonic()
+                cursor.execute('VACUUM')
+                self.stdout.write(f'VACUUM done in {time.monotonic() - started:.2f}s')
+            else:
+                self.incremental_vacuum(cursor, options['vacuum_pages'])
+
+            # Fold the WAL back into the database file and truncate it.
+            cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            busy, log_pages, checkpointed = cursor.fetchone()
+            if log_pages >= 0:
+                state = 'incomplete (readers still active)' if busy else 'complete'
+                self.stdout.write(f'WAL checkpoint {state}: {checkpointed}/{log_pages} pages')
+
+        if options['backup']:
+            self.backup(connection, options['backup'], options['backup_pages'])
+        self.stdout.write(self.style.SUCCESS('SQLite maintenance finished.'))
+
+    def incremental_vacuum(self, cursor, pages):
+        cursor.execute('PRAGMA auto_vacuum')
+        if cursor.fetchone()[0] != 2:
+            self.stdout.write(self.style.WARNING(
+                'Incremental vacuum is off for this database; run once with --full-vacuum to enable it.'
+            ))
+            return
+        cursor.execute('PRAGMA freelist_count')
+        before = cursor.fetchone()[0]
+        # Pages are only freed as the pragma's result rows are stepped through.
+        cursor.execute(f'PRAGMA incremental_vacuum({int(pages)})')
+        cursor.fetchall()
+        cursor.execute('PRAGMA freelist_count')
+        self.stdout.write(f'Incremental vacuum reclaimed {before - cursor.fetchone()[0]} of {before} free pages')
+
+    def backup(self, connection, path, pages):
+        if os.path.isdir(path):
+            name = os.path.splitext(os.path.basename(connection.settings_dict['NAME']))[0]
+            path = os.path.join(path, f"{name}-{timezone.now().strftime('%Y%m%d-%H%M%S')}.sqlite3")
+        partial = f'{path}.partial'
+        started = time.monotonic()
+        connection.ensure_connection()
+        target = sqlite3.connect(partial)
+        try:
+            connection.connection.backup(target, pages=pages)
+            # A self-contained copy: no -wal file needed to open it.
+            target.execute('PRAGMA journal_mode = DELETE').fetchall()
+            result = target.execute('PRAGMA quick_check').fetchone()[0]
+        finally:
+            target.close()
+        if result != 'ok':
+            os.remove(partial)
+            raise CommandError(f'Backup failed its integrity check: {result}')
+        os.replace(partial, path)
+        self.stdout.write(
+            f'Backup written to {path} ({os.path.getsize(path) / 1024:.0f} KiB in {time.monotonic() - started:.2f}s)'
+        )
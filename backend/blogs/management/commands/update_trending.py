@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blogs.cache import invalidate
+from blogs.trending import update_trending
+
+
+class Command(BaseCommand):
+    """Fold new views, likes and comments into the trending scores."""
+
+    help = 'Update time-decayed trending scores (run periodically, e.g. every 5 minutes from cron).'
+
+    def handle(self, *args, **options):
+        updated = update_trending()
+        if updated:
+            invalidate('popular')
+        self.stdout.write(self.style.SUCCESS(f'Updated trending scores for {updated} posts.'))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, help_text='Rendered HTML for the markdown content'),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='content_html_hash',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the content and renderer config used for content_html', max_length=64),
+        ),
+    ]
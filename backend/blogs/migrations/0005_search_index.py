@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS blogs_blog_fts USING fts5("
+            "title, excerpt, content, author_name, tokenize = 'porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO blogs_blog_fts (rowid, title, excerpt, content, author_name) "
+            "SELECT b.id, b.title, b.excerpt, b.content, u.name "
+            "FROM blogs_blog b JOIN users_user u ON u.id = b.author_id "
+            "WHERE b.status = 'published'"
+        )
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS blogs_blog_search ("
+            "blog_id bigint PRIMARY KEY REFERENCES blogs_blog (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS blogs_blog_search_document_idx "
+            "ON blogs_blog_search USING GIN (document)"
+        )
+        # The same text search configuration the runtime backend indexes with.
+        config = getattr(settings, 'BLOG_SEARCH', {}).get('POSTGRES_CONFIG', 'english')
+        schema_editor.execute(
+            "INSERT INTO blogs_blog_search (blog_id, document) "
+            "SELECT b.id, "
+            "setweight(to_tsvector(%s::regconfig, b.title), 'A') || "
+            "setweight(to_tsvector(%s::regconfig, b.excerpt), 'B') || "
+            "setweight(to_tsvector(%s::regconfig, u.name), 'B') || "
+            "setweight(to_tsvector(%s::regconfig, b.content), 'C') "
+            "FROM blogs_blog b JOIN users_user u ON u.id = b.author_id "
+            "WHERE b.status = 'published'",
+            [config] * 4,
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS blogs_blog_fts')
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE IF EXISTS blogs_blog_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0004_bloglike'),
+        ('users', '0002_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
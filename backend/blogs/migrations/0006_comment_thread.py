@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_comment_threads(apps, schema_editor):
+    """Compute root and depth for existing comments."""
+    Comment = apps.get_model('blogs', 'Comment')
+    parents = dict(Comment.objects.values_list('pk', 'parent_id'))
+
+    resolved = {}
+
+    def resolve(pk):
+        # Walk up to the top-level comment iteratively (threads can be deep).
+        chain = []
+        current = pk
+        while current not in resolved and parents.get(current) is not None:
+            chain.append(current)
+            current = parents[current]
+        if current not in resolved:
+            resolved[current] = (None, 0)
+        root, depth = resolved[current]
+        root = root or current
+        for node in reversed(chain):
+            depth += 1
+            resolved[node] = (root, depth)
+        return resolved[pk]
+
+    updates = []
+    for pk in parents:
+        root, depth = resolve(pk)
+        if depth:
+            updates.append(Comment(pk=pk, root_id=root, depth=depth))
+    Comment.objects.bulk_update(updates, ['root', 'depth'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='root',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='thread_comments', to='blogs.comment'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['blog', 'is_approved', 'created_at'], name='blogs_comme_blog_id_2f83cb_idx'),
+        ),
+        migrations.RunPython(backfill_comment_threads, migrations.RunPython.noop),
+    ]
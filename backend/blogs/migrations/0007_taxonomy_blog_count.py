@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:03
+
+from django.db import migrations, models
+
+
+def count_published_blogs(apps, schema_editor):
+    """Initialise the denormalized counts from the current data."""
+    Blog = apps.get_model('blogs', 'Blog')
+    Category = apps.get_model('blogs', 'Category')
+    Tag = apps.get_model('blogs', 'Tag')
+    published = Blog.objects.filter(status='published')
+
+    for category in Category.objects.all():
+        category.blog_count = published.filter(category=category).count()
+        category.save(update_fields=['blog_count'])
+    for tag in Tag.objects.all():
+        tag.blog_count = published.filter(tags=tag).count()
+        tag.save(update_fields=['blog_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0006_comment_thread'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='blog_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of published blog posts (maintained automatically)'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='blog_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of published blog posts (maintained automatically)'),
+        ),
+        migrations.RunPython(count_published_blogs, migrations.RunPython.noop),
+    ]
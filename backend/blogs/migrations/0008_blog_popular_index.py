@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0007_taxonomy_blog_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['status', '-views'], name='blogs_blog_popular_idx'),
+        ),
+    ]
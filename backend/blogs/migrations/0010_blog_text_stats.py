@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:06
+
+from django.db import migrations, models
+
+
+def backfill_text_stats(apps, schema_editor):
+    """Store word count and reading time for existing posts."""
+    Blog = apps.get_model('blogs', 'Blog')
+    updates = []
+    for pk, content in Blog.objects.values_list('pk', 'content').iterator(chunk_size=500):
+        word_count = len(content.split())
+        updates.append(Blog(pk=pk, word_count=word_count, reading_time=max(1, round(word_count / 200))))
+        if len(updates) >= 500:
+            Blog.objects.bulk_update(updates, ['word_count', 'reading_time'])
+            updates = []
+    Blog.objects.bulk_update(updates, ['word_count', 'reading_time'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0009_tag_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Estimated reading time in minutes'),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of words in the content'),
+        ),
+        migrations.RunPython(backfill_text_stats, migrations.RunPython.noop),
+    ]
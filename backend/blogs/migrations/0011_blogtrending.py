@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0010_blog_text_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogTrending',
+            fields=[
+                ('blog', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='blogs.blog')),
+                ('day_score', models.FloatField()),
+                ('week_score', models.FloatField()),
+                ('seen_views', models.PositiveIntegerField(default=0)),
+                ('seen_likes', models.PositiveIntegerField(default=0)),
+                ('seen_comments', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Blog trending score',
+                'verbose_name_plural': 'Blog trending scores',
+                'indexes': [models.Index(fields=['-day_score'], name='blogs_trending_day_idx'), models.Index(fields=['-week_score'], name='blogs_trending_week_idx')],
+            },
+        ),
+    ]
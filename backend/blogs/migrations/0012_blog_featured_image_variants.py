@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0011_blogtrending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='featured_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Storage names of the resized variants (see blog_project/images.py)'),
+        ),
+    ]
@@ -2,9 +2,10 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils.text import slugify
 from django.urls import reverse
-import markdown
 import re
 
+from .rendering import content_hash, render_markdown
+
 User = get_user_model()
 
 
@@ -14,6 +15,11 @@ class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=100, unique=True)
     description = models.TextField(blank=True)
+    blog_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of published blog posts (maintained automatically)'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -37,7 +43,13 @@ class Tag(models.Model):
     
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(max_length=50, unique=True)
+    blog_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of published blog posts (maintained automatically)'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = 'Tag'
@@ -54,6 +66,17 @@ class Tag(models.Model):
         super().save(*args, **kwargs)
 
 
+class BlogQuerySet(models.QuerySet):
+    """Queryset helpers for blog posts."""
+    
+    # Post bodies are only needed on the detail page.
+    BODY_FIELDS = ('content', 'content_html')
+    
+    def for_listing(self):
+        """Leave out the post bodies, which list pages never send."""
+        return self.defer(*self.BODY_FIELDS)
+
+
 class Blog(models.Model):
     """Blog post model."""
     
@@ -74,6 +97,27 @@ class Blog(models.Model):
     content = models.TextField(
         help_text='Write your blog content here'
     )
+    content_html = models.TextField(
+        blank=True,
+        editable=False,
+        help_text='Rendered HTML for the markdown content'
+    )
+    content_html_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        editable=False,
+        help_text='Hash of the content and renderer config used for content_html'
+    )
+    word_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of words in the content'
+    )
+    reading_time = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text='Estimated reading time in minutes'
+    )
     excerpt = models.TextField(
         max_length=500,
         blank=True,
@@ -85,6 +129,12 @@ class Blog(models.Model):
         null=True,
         help_text='Featured image for your blog post (optional)'
     )
+    featured_image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text='Storage names of the resized variants (see blog_project/images.py)'
+    )
     
     # Relationships
     author = models.ForeignKey(
@@ -141,6 +191,8 @@ class Blog(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(null=True, blank=True)
     
+    objects = BlogQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Blog'
         verbose_name_plural = 'Blogs'
@@ -149,11 +201,36 @@ class Blog(models.Model):
             models.Index(fields=['status', 'created_at']),
             models.Index(fields=['author', 'status']),
             models.Index(fields=['category', 'status']),
+            models.Index(fields=['status', '-views'], name='blogs_blog_popular_idx'),
         ]
     
     def __str__(self):
         return self.title
     
+    # Field values remembered as of the last load/save, so signal handlers can
+    # tell what a save changed (see blogs/taxonomy.py and blogs/cache.py).
+    TRACKED_FIELDS = ('status', 'category_id', 'is_featured')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored values of the tracked fields."""
+        instance = super().from_db(db, field_names, values)
+        instance.remember_stored_state()
+        return instance
+    
+    def remember_stored_state(self, update_fields=None):
+        """Snapshot the tracked fields that are loaded (and, if given, were saved)."""
+        loaded = self.__dict__
+        names = [name for name in self.TRACKED_FIELDS if name in loaded]
+        if update_fields is not None:
+            saved = {self._meta.get_field(name).attname for name in update_fields}
+            names = [name for name in names if name in saved]
+        self._stored_state = {**self.stored_state(), **{name: loaded[name] for name in names}}
+    
+    def stored_state(self):
+        """Tracked field values as last loaded or saved (empty if unknown)."""
+        return getattr(self, '_stored_state', {})
+    
     def save(self, *args, **kwargs):
         """Auto-generate slug and excerpt if not provided."""
         if not self.slug:
@@ -169,37 +246,77 @@ class Blog(models.Model):
             from django.utils import timezone
             self.published_at = timezone.now()
         
+        # Re-render markdown and recount words only when the content is saved
+        update_fields = kwargs.get('update_fields')
+        content_loaded = 'content' not in self.get_deferred_fields()
+        if content_loaded and (update_fields is None or 'content' in update_fields):
+            self.update_text_stats()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'word_count', 'reading_time'}
+            if self.render_content() and update_fields is not None:
+                kwargs['update_fields'] = set(kwargs['update_fields']) | {'content_html', 'content_html_hash'}
+        
         super().save(*args, **kwargs)
+        self.remember_stored_state(kwargs.get('update_fields'))
     
     def get_absolute_url(self):
         """Get the absolute URL for this blog post."""
-        return reverse('blog_detail', kwargs={'slug': self.slug})
+        return reverse('blog-detail', kwargs={'slug': self.slug})
     
-    @property
-    def reading_time(self):
-        """Calculate estimated reading time in minutes."""
-        word_count = len(self.content.split())
-        return max(1, round(word_count / 200))  # Average reading speed: 200 words/minute
-    
-    @property
-    def word_count(self):
-        """Get the word count of the content."""
-        return len(self.content.split())
+    def update_text_stats(self):
+        """Recompute the stored word count and reading time from the content."""
+        self.word_count = len(self.content.split())
+        self.reading_time = max(1, round(self.word_count / 200))  # Average reading speed: 200 words/minute
     
     @property
     def formatted_content(self):
-        """Convert markdown content to HTML."""
-        return markdown.markdown(self.content, extensions=['extra', 'codehilite'])
+        """Get the rendered HTML, falling back to rendering a stale cache."""
+        if self.content_html_hash and self.content_html_hash == content_hash(self.content):
+            return self.content_html
+        return render_markdown(self.content)
+    
+    def render_content(self, force=False):
+        """Refresh the stored HTML if it is stale. Returns True if it changed."""
+        new_hash = content_hash(self.content)
+        if not force and self.content_html_hash == new_hash:
+            return False
+        self.content_html = render_markdown(self.content)
+        self.content_html_hash = new_hash
+        return True
     
     def increment_views(self):
-        """Increment the view count."""
-        self.views += 1
-        self.save(update_fields=['views'])
+        """Buffer a view; it is written to the database on the next flush."""
+        from .analytics import view_counter
+        if view_counter.add(self.pk):
+            self.views += 1
+    
+    def add_like(self, user):
+        """Record a like by user. Returns False if they already liked it."""
+        from .analytics import like_counter
+        _, created = BlogLike.objects.get_or_create(user=user, blog=self)
+        if created and like_counter.add(self.pk, 1):
+            self.likes += 1
+        return created
     
-    def increment_likes(self):
-        """Increment the like count."""
-        self.likes += 1
-        self.save(update_fields=['likes'])
+    def remove_like(self, user):
+        """Remove a like by user. Returns False if they had not liked it."""
+        from .analytics import like_counter
+        deleted, _ = BlogLike.objects.filter(user=user, blog=self).delete()
+        if deleted and like_counter.add(self.pk, -1):
+            self.likes = max(self.likes - 1, 0)
+        return bool(deleted)
+    
+    @property
+    def current_views(self):
+        """View count including deltas that have not been flushed yet."""
+        from .analytics import view_counter
+        return self.views + view_counter.pending(self.pk)
+    
+    @property
+    def current_likes(self):
+        """Like count including deltas that have not been flushed yet."""
+        from .analytics import like_counter
+        return self.likes + like_counter.pending(self.pk)
     
     def get_meta_title(self):
         """Get the meta title, fallback to post title."""
@@ -210,6 +327,93 @@ class Blog(models.Model):
         return self.meta_description or self.excerpt
 
 
+class BlogLikeManager(models.Manager):
+    """Manager for the per-user like ledger."""
+    
+    def liked_blog_ids(self, user, blog_ids):
+        """Return the subset of blog_ids that user has liked, in one query."""
+        if not user or not user.is_authenticated or not blog_ids:
+            return set()
+        return set(
+            self.filter(user_id=user.pk, blog_id__in=blog_ids).values_list('blog_id', flat=True)
+        )
+    
+    async def aliked_blog_ids(self, user, blog_ids):
+        """liked_blog_ids for async views."""
+        if not user or not user.is_authenticated or not blog_ids:
+            return set()
+        return {
+            blog_id async for blog_id in
+            self.filter(user_id=user.pk, blog_id__in=blog_ids).values_list('blog_id', flat=True)
+        }
+
+
+class BlogLike(models.Model):
+    """A single user's like of a blog post."""
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='blog_likes'
+    )
+    blog = models.ForeignKey(
+        Blog,
+        on_delete=models.CASCADE,
+        related_name='like_records'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    objects = BlogLikeManager()
+    
+    class Meta:
+        verbose_name = 'Blog like'
+        verbose_name_plural = 'Blog likes'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'blog'], name='unique_blog_like'),
+        ]
+    
+    def __str__(self):
+        return f'{self.user} likes {self.blog}'
+
+
+class BlogTrending(models.Model):
+    """
+    Materialized time-decayed popularity of a blog post (see blogs/trending.py).
+    
+    Scores are stored in log space relative to a fixed epoch, so they only
+    change when the post gets new activity and can be compared directly.
+    """
+    
+    blog = models.OneToOneField(
+        Blog,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending'
+    )
+    day_score = models.FloatField()
+    week_score = models.FloatField()
+    
+    # Counter values already folded into the scores
+    seen_views = models.PositiveIntegerField(default=0)
+    seen_likes = models.PositiveIntegerField(default=0)
+    seen_comments = models.PositiveIntegerField(default=0)
+    
+    # Start of the run that last folded in activity
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = 'Blog trending score'
+        verbose_name_plural = 'Blog trending scores'
+        indexes = [
+            models.Index(fields=['-day_score'], name='blogs_trending_day_idx'),
+            models.Index(fields=['-week_score'], name='blogs_trending_week_idx'),
+        ]
+    
+    def __str__(self):
+        return f'Trending score for {self.blog_id}'
+
+
 class Comment(models.Model):
     """Blog comment model."""
     
@@ -230,6 +434,18 @@ class Comment(models.Model):
         blank=True,
         related_name='replies'
     )
+    # Thread bookkeeping: the top-level comment of this thread (None for
+    # top-level comments themselves) and the nesting depth, so a whole thread
+    # can be loaded with a single query.
+    root = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='thread_comments'
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     content = models.TextField()
     is_approved = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -239,10 +455,23 @@ class Comment(models.Model):
         verbose_name = 'Comment'
         verbose_name_plural = 'Comments'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['blog', 'is_approved', 'created_at']),
+        ]
     
     def __str__(self):
         return f'Comment by {self.author.name} on {self.blog.title}'
     
+    def save(self, *args, **kwargs):
+        """Derive the thread root and depth from the parent comment."""
+        if self.parent_id:
+            self.root_id = self.parent.root_id or self.parent_id
+            self.depth = self.parent.depth + 1
+        else:
+            self.root_id = None
+            self.depth = 0
+        super().save(*args, **kwargs)
+    
     @property
     def is_reply(self):
         """Check if this comment is a reply to another comment."""
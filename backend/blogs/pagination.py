@@ -0,0 +1,219 @@
+"""
+Pagination for blog and comment listings.
+
+KeysetPagination keeps the regular page-number behaviour by default and
+switches to keyset (cursor) pagination when the client sends ``?cursor=``
+or asks for it with ``?pagination=cursor``. Keyset pages are addressed by
+the (ordering value, id) of the last row seen (or, for the previous page,
+the first), so fetching page 500 costs the same as page 1 and no COUNT(*)
+is issued.
+"""
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db import models
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+async def apaginate_page_number(paginator, queryset, request):
+    """PageNumberPagination.paginate_queryset for async views (COUNT and page via the async ORM)."""
+    page_size = paginator.get_page_size(request)
+    if not page_size:
+        return None
+
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    # Paginator.count is a cached_property; fill it so nothing below queries synchronously.
+    django_paginator.count = await queryset.acount()
+    page_number = paginator.get_page_number(request, django_paginator)
+    try:
+        paginator.page = django_paginator.page(page_number)
+    except InvalidPage as exc:
+        raise NotFound(paginator.invalid_page_message.format(page_number=page_number, message=str(exc)))
+    paginator.page.object_list = [row async for row in paginator.page.object_list]
+
+    if django_paginator.num_pages > 1 and paginator.template is not None:
+        paginator.display_page_controls = True
+    paginator.request = request
+    return paginator.page.object_list
+
+
+class KeysetPagination(PageNumberPagination):
+    """Page-number pagination with an opt-in keyset (cursor) mode."""
+
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    invalid_cursor_message = 'Invalid cursor'
+    # Cursor ids and integer values must fit a signed 64-bit column.
+    max_cursor_int = 2 ** 63 - 1
+
+    def use_keyset(self, request):
+        """Whether this request asked for keyset pagination."""
+        params = request.query_params
+        return self.cursor_query_param in params or params.get(self.mode_query_param) == 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.use_keyset(request)
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        queryset = self.keyset_queryset(queryset, request)
+        return self.keyset_page(list(queryset[:page_size + 1]), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views, fetching the page with the async ORM."""
+        self.keyset = self.use_keyset(request)
+        if not self.keyset:
+            return await apaginate_page_number(self, queryset, request)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        queryset = self.keyset_queryset(queryset, request)
+        return self.keyset_page([row async for row in queryset[:page_size + 1]], page_size)
+
+    def keyset_queryset(self, queryset, request):
+        """Order the queryset for keyset paging and skip past the request's cursor."""
+        field, descending = self.get_ordering(queryset)
+        self.ordering_field = field
+        cursor = self.decode_cursor(request, queryset.model, field)
+        self.has_cursor = cursor is not None
+        # A previous-page cursor walks back from the first row of the page it came from.
+        self.reverse = self.has_cursor and cursor[2]
+        queryset = queryset.order_by(*self.order_expressions(field, descending, self.reverse))
+        if cursor is not None:
+            queryset = queryset.filter(self.after(field, descending, *cursor))
+        return queryset
+
+    def keyset_page(self, rows, page_size):
+        """Keep one page of the page_size + 1 rows fetched."""
+        more = len(rows) > page_size
+        self.page = rows[:page_size]
+        if self.reverse:
+            self.page.reverse()
+            # The row the cursor was taken from follows this page.
+            self.has_previous, self.has_next = more, True
+        else:
+            self.has_previous, self.has_next = self.has_cursor, more
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.cursor_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.cursor_link(self.page[0], reverse=True)
+
+    def cursor_link(self, row, reverse):
+        """This request's URL with a cursor for the rows after (or, if reverse, before) row."""
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self.encode_cursor(getattr(row, self.ordering_field), row.pk, reverse),
+        )
+
+    def get_ordering(self, queryset):
+        """Return (field name, descending) of the queryset's primary ordering."""
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        if not ordering or not isinstance(ordering[0], str):
+            return 'pk', True
+        field = ordering[0]
+        descending = field.startswith('-')
+        return field.lstrip('-'), descending
+
+    def order_expressions(self, field, descending, reverse=False):
+        """Order by the field (nulls last) with the primary key as tie-breaker; reverse flips it all."""
+        descending = descending != reverse
+        if field == 'pk':
+            return ['-pk' if descending else 'pk']
+        nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+        if descending:
+            return [F(field).desc(**nulls), '-pk']
+        return [F(field).asc(**nulls), 'pk']
+
+    def after(self, field, descending, value, pk, reverse=False):
+        """Filter for rows strictly after (or, if reverse, before) (value, pk) in the page ordering."""
+        beyond = 'lt' if descending != reverse else 'gt'
+        if field == 'pk':
+            return Q(**{f'pk__{beyond}': pk})
+        # Nulls sort last, so only other nulls follow a null and every null follows a value.
+        if value is None:
+            following = Q(**{f'{field}__isnull': True, f'pk__{beyond}': pk})
+            return following | Q(**{f'{field}__isnull': False}) if reverse else following
+        following = Q(**{f'{field}__{beyond}': value}) | Q(**{field: value, f'pk__{beyond}': pk})
+        return following if reverse else following | Q(**{f'{field}__isnull': True})
+
+    def encode_cursor(self, value, pk, reverse=False):
+        if isinstance(value, datetime.datetime):
+            # Full isoformat: the keyset comparison needs microsecond precision.
+            value = value.isoformat()
+        payload = {'v': value, 'id': pk}
+        if reverse:
+            payload['r'] = 1
+        payload = json.dumps(payload, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request, model, field):
+        """Return (value, pk, reverse) from the request cursor, or None for the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            value, pk, reverse = payload['v'], int(payload['id']), bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, AttributeError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if abs(pk) > self.max_cursor_int:
+            raise NotFound(self.invalid_cursor_message)
+
+        if value is not None and field != 'pk':
+            try:
+                model_field = model._meta.get_field(field)
+            except FieldDoesNotExist:
+                model_field = None
+            if isinstance(model_field, models.DateTimeField):
+                value = parse_datetime(value) if isinstance(value, str) else None
+                if value is None:
+                    raise NotFound(self.invalid_cursor_message)
+            elif model_field is not None:
+                # A tampered value must not reach the query as something the column cannot hold.
+                try:
+                    value = model_field.to_python(value)
+                except (ValidationError, TypeError, ValueError):
+                    raise NotFound(self.invalid_cursor_message)
+                if isinstance(value, int) and abs(value) > self.max_cursor_int:
+                    raise NotFound(self.invalid_cursor_message)
+        return value, pk, reverse
@@ -13,7 +13,8 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
             return True
         
         # Write permissions are only allowed to the author of the blog post.
-        return obj.author == request.user
+        # Compare ids so the author row is never loaded just for this check.
+        return obj.author_id == request.user.pk
 
 
 class IsCommentAuthorOrReadOnly(permissions.BasePermission):
@@ -28,7 +29,7 @@ class IsCommentAuthorOrReadOnly(permissions.BasePermission):
             return True
         
         # Write permissions are only allowed to the author of the comment.
-        return obj.author == request.user
+        return obj.author_id == request.user.pk
 
 
 class IsAuthenticatedOrReadOnly(permissions.BasePermission):
@@ -0,0 +1,50 @@
+"""
+Markdown rendering for blog content.
+
+Rendered HTML is stored on the blog row together with a hash of the source
+content and the renderer configuration, so it only has to be regenerated
+when either of them changes.
+"""
+import hashlib
+import json
+
+import markdown
+
+try:
+    import pygments
+except ImportError:  # codehilite degrades to plain <pre><code> without Pygments
+    pygments = None
+
+# Bump RENDERER_VERSION whenever the output of render_markdown() changes for
+# reasons not captured by the extension list (e.g. a Pygments style change).
+RENDERER_VERSION = 1
+MARKDOWN_EXTENSIONS = ['extra', 'codehilite']
+MARKDOWN_EXTENSION_CONFIGS = {}
+
+
+def renderer_signature():
+    """Return a stable string describing the current renderer configuration."""
+    return json.dumps({
+        'version': RENDERER_VERSION,
+        'markdown': markdown.__version__,
+        'pygments': getattr(pygments, '__version__', None),
+        'extensions': MARKDOWN_EXTENSIONS,
+        'configs': MARKDOWN_EXTENSION_CONFIGS,
+    }, sort_keys=True)
+
+
+def content_hash(content):
+    """Hash markdown source together with the renderer configuration."""
+    digest = hashlib.sha256(renderer_signature().encode('utf-8'))
+    digest.update(b'\0')
+    digest.update((content or '').encode('utf-8'))
+    return digest.hexdigest()
+
+
+def render_markdown(content):
+    """Convert markdown content to HTML."""
+    return markdown.markdown(
+        content or '',
+        extensions=MARKDOWN_EXTENSIONS,
+        extension_configs=MARKDOWN_EXTENSION_CONFIGS,
+    )
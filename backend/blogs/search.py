@@ -0,0 +1,296 @@
+"""
+Full-text search over published blog posts.
+
+Each database vendor gets its own inverted index, kept in a side table that
+is maintained incrementally from the Blog post_save/post_delete signals:
+
+* SQLite: an FTS5 virtual table (``blogs_blog_fts``) ranked with bm25().
+* PostgreSQL: a weighted ``tsvector`` table (``blogs_blog_search``) with a
+  GIN index, ranked with ts_rank_cd().
+
+Other databases (or SQLite builds without FTS5) fall back to ``icontains``.
+"""
+import html
+import re
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+
+# Control characters never appear in posts, so they are safe highlight markers
+# to swap for <mark> tags after the snippet text has been HTML-escaped.
+MARK_START = '\x02'
+MARK_END = '\x03'
+
+INDEXED_FIELDS = {'title', 'excerpt', 'content', 'status', 'author'}
+
+
+def search_setting(name, default):
+    """Read a BLOG_SEARCH setting."""
+    return getattr(settings, 'BLOG_SEARCH', {}).get(name, default)
+
+
+def highlight(snippet):
+    """Escape a snippet and turn the highlight markers into <mark> tags."""
+    escaped = html.escape(snippet or '')
+    return escaped.replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+def search_terms(query):
+    """Split a user query into plain word tokens."""
+    return re.findall(r'\w+', query or '', re.UNICODE)
+
+
+class SearchBackend:
+    """Base class for search backends."""
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def filter(self, queryset, query):
+        """Restrict queryset to matches, annotated with a search_rank (higher is better)."""
+        raise NotImplementedError
+
+    def snippets(self, query, blog_ids):
+        """Return {blog_id: highlighted HTML snippet} for the given matches."""
+        return {}
+
+    def update(self, blog, author_name):
+        """Add or refresh a blog in the index."""
+
+    def remove(self, blog_id):
+        """Drop a blog from the index."""
+
+    def rebuild(self):
+        """Re-index every published blog."""
+
+
+class FallbackSearchBackend(SearchBackend):
+    """Unindexed icontains search for databases without full-text support."""
+
+    def filter(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) |
+                Q(content__icontains=term) |
+                Q(excerpt__icontains=term) |
+                Q(author__name__icontains=term)
+            )
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """SQLite FTS5 backend."""
+
+    table = 'blogs_blog_fts'
+
+    def match_expression(self, query):
+        """Build an FTS5 MATCH expression: every term, each as a prefix."""
+        return ' '.join('"%s"*' % term for term in search_terms(query))
+
+    # Title matches weigh most, then excerpt/author, then the body.
+    rank_function = 'bm25(10.0, 4.0, 1.0, 4.0)'
+
+    def filter(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        # Join the index once: MATCH runs a single time and each matched row
+        # carries its rank. The unary + keeps SQLite from driving the join
+        # from blogs_blog and re-running the MATCH for every candidate row.
+        return queryset.extra(
+            tables=[self.table],
+            where=[
+                f'blogs_blog.id = +{self.table}.rowid',
+                f'{self.table} MATCH %s',
+                f'{self.table}.rank MATCH %s',
+            ],
+            params=[match, self.rank_function],
+        ).annotate(search_rank=RawSQL(f'-{self.table}.rank', [], output_field=FloatField()))
+
+    def snippets(self, query, blog_ids):
+        match = self.match_expression(query)
+        if not match or not blog_ids:
+            return {}
+        placeholders = ', '.join(['%s'] * len(blog_ids))
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, snippet({self.table}, -1, %s, %s, '…', 24) FROM {self.table} "
+                f"WHERE {self.table} MATCH %s AND rowid IN ({placeholders})",
+                [MARK_START, MARK_END, match, *blog_ids],
+            )
+            return {blog_id: highlight(snippet) for blog_id, snippet in cursor.fetchall()}
+
+    def update(self, blog, author_name):
+        # One transaction, so concurrent saves of the same post cannot both insert its row.
+        with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [blog.pk])
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, excerpt, content, author_name) '
+                f'VALUES (%s, %s, %s, %s, %s)',
+                [blog.pk, blog.title, blog.excerpt, blog.content, author_name],
+            )
+
+    def remove(self, blog_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE rowid = %s', [blog_id])
+
+    def rebuild(self):
+        with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (rowid, title, excerpt, content, author_name) '
+                f'SELECT b.id, b.title, b.excerpt, b.content, u.name '
+                f'FROM blogs_blog b JOIN users_user u ON u.id = b.author_id '
+                f"WHERE b.status = 'published'"
+            )
+            cursor.execute(f"INSERT INTO {self.table} ({self.table}) VALUES ('optimize')")
+
+
+class PostgresSearchBackend(SearchBackend):
+    """PostgreSQL tsvector backend."""
+
+    table = 'blogs_blog_search'
+
+    @property
+    def config(self):
+        return search_setting('POSTGRES_CONFIG', 'english')
+
+    def document_sql(self):
+        """SQL building the weighted document from title, excerpt, author and content."""
+        return (
+            "setweight(to_tsvector(%s::regconfig, %s), 'A') || "
+            "setweight(to_tsvector(%s::regconfig, %s), 'B') || "
+            "setweight(to_tsvector(%s::regconfig, %s), 'B') || "
+            "setweight(to_tsvector(%s::regconfig, %s), 'C')"
+        )
+
+    def filter(self, queryset, query):
+        if not search_terms(query):
+            return queryset.none()
+        # Join the index once rather than looking each candidate up in a subquery.
+        return queryset.extra(
+            tables=[self.table],
+            where=[
+                f'{self.table}.blog_id = blogs_blog.id',
+                f'{self.table}.document @@ websearch_to_tsquery(%s::regconfig, %s)',
+            ],
+            params=[self.config, query],
+        ).annotate(search_rank=RawSQL(
+            f'ts_rank_cd({self.table}.document, websearch_to_tsquery(%s::regconfig, %s))',
+            [self.config, query],
+            output_field=FloatField(),
+        ))
+
+    def snippets(self, query, blog_ids):
+        if not search_terms(query) or not blog_ids:
+            return {}
+        options = f'StartSel={MARK_START}, StopSel={MARK_END}, MinWords=15, MaxWords=35'
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT id, ts_headline(%s::regconfig, content, '
+                'websearch_to_tsquery(%s::regconfig, %s), %s) '
+                'FROM blogs_blog WHERE id = ANY(%s)',
+                [self.config, self.config, query, options, list(blog_ids)],
+            )
+            return {blog_id: highlight(snippet) for blog_id, snippet in cursor.fetchall()}
+
+    def update(self, blog, author_name):
+        config = self.config
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (blog_id, document) VALUES (%s, {self.document_sql()}) '
+                f'ON CONFLICT (blog_id) DO UPDATE SET document = EXCLUDED.document',
+                [
+                    blog.pk,
+                    config, blog.title,
+                    config, blog.excerpt,
+                    config, author_name,
+                    config, blog.content,
+                ],
+            )
+
+    def remove(self, blog_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table} WHERE blog_id = %s', [blog_id])
+
+    def rebuild(self):
+        config = self.config
+        document = self.document_sql() % (
+            '%s', 'b.title', '%s', 'b.excerpt', '%s', 'u.name', '%s', 'b.content'
+        )
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            cursor.execute(
+                f'INSERT INTO {self.table} (blog_id, document) '
+                f'SELECT b.id, {document} '
+                f'FROM blogs_blog b JOIN users_user u ON u.id = b.author_id '
+                f"WHERE b.status = 'published'",
+                [config] * 4,
+            )
+
+
+def sqlite_has_fts5(connection):
+    """Check whether the SQLite library was compiled with FTS5."""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+_backends = {}
+
+
+def get_search_backend(using='default'):
+    """Return the search backend for a database alias."""
+    if using not in _backends:
+        connection = connections[using]
+        backend_class = FallbackSearchBackend
+        if connection.vendor == 'postgresql':
+            backend_class = PostgresSearchBackend
+        elif connection.vendor == 'sqlite' and sqlite_has_fts5(connection):
+            backend_class = SQLiteSearchBackend
+        _backends[using] = backend_class(using)
+    return _backends[using]
+
+
+def index_blog(blog, using='default'):
+    """Bring a single blog's index entry in line with its current state."""
+    backend = get_search_backend(using)
+    if blog.status == 'published':
+        backend.update(blog, blog.author.name)
+    else:
+        backend.remove(blog.pk)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    DRF filter backend for ?search= using the configured search backend.
+
+    Results are ordered by relevance unless the client asked for an explicit
+    ?ordering=, so this backend must run after OrderingFilter.
+    """
+
+    search_param = 'search'
+    ordering_param = 'ordering'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        if not search_terms(query):
+            return queryset.none()
+
+        queryset = get_search_backend(queryset.db).filter(queryset, query)
+        request.search_query = query
+        if not request.query_params.get(self.ordering_param):
+            queryset = queryset.order_by('-search_rank', '-created_at')
+        return queryset
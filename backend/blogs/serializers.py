@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Blog, Category, Tag, Comment
+from blog_project.images import ImageVariantsField
+from .models import Blog, BlogLike, Category, Tag, Comment
+from .comments import build_comment_tree, load_comment_tree, load_subtree
+from .search import get_search_backend
 
 User = get_user_model()
 
@@ -10,7 +13,8 @@ class CategorySerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Category
-        fields = ['id', 'name', 'slug', 'description', 'created_at']
+        fields = ['id', 'name', 'slug', 'description', 'blog_count', 'created_at']
+        read_only_fields = ['blog_count']
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -18,15 +22,18 @@ class TagSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Tag
-        fields = ['id', 'name', 'slug', 'created_at']
+        fields = ['id', 'name', 'slug', 'blog_count', 'created_at']
+        read_only_fields = ['blog_count']
 
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for User model in blog context."""
     
+    avatar_variants = ImageVariantsField()
+    
     class Meta:
         model = User
-        fields = ['id', 'name', 'email', 'avatar', 'bio', 'website']
+        fields = ['id', 'name', 'email', 'avatar', 'avatar_variants', 'bio', 'website']
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -41,12 +48,35 @@ class CommentSerializer(serializers.ModelSerializer):
             'id', 'content', 'author', 'parent', 'is_approved',
             'created_at', 'updated_at', 'replies'
         ]
-        read_only_fields = ['author', 'is_approved', 'created_at', 'updated_at']
+        # Moving a comment would leave its subtree's root and depth stale.
+        read_only_fields = ['author', 'parent', 'is_approved', 'created_at', 'updated_at']
     
     def get_replies(self, obj):
-        """Get replies for this comment."""
-        replies = Comment.objects.filter(parent=obj, is_approved=True)
-        return CommentSerializer(replies, many=True).data
+        """Get replies for this comment from the preloaded comment tree."""
+        replies = getattr(obj, 'tree_replies', None)
+        if replies is None:
+            replies = load_subtree(obj)
+        return CommentSerializer(replies, many=True, context=self.context).data
+
+
+class BlogListListSerializer(serializers.ListSerializer):
+    """List serializer that looks up the viewer's likes for a whole page at once."""
+    
+    def to_representation(self, data):
+        blogs = list(data.all() if hasattr(data, 'all') else data)
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        # Async views look these up with the async ORM and pass them in.
+        if user is not None and user.is_authenticated and 'liked_blog_ids' not in self.context:
+            self.context['liked_blog_ids'] = BlogLike.objects.liked_blog_ids(
+                user, [blog.pk for blog in blogs]
+            )
+        search_query = getattr(request, 'search_query', None)
+        if search_query and blogs and 'search_snippets' not in self.context:
+            self.context['search_snippets'] = get_search_backend(blogs[0]._state.db).snippets(
+                search_query, [blog.pk for blog in blogs]
+            )
+        return super().to_representation(blogs)
 
 
 class BlogListSerializer(serializers.ModelSerializer):
@@ -55,14 +85,37 @@ class BlogListSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
+    # Counts include this worker's buffered deltas (see blogs/analytics.py).
+    views = serializers.IntegerField(source='current_views', read_only=True)
+    likes = serializers.IntegerField(source='current_likes', read_only=True)
+    is_liked = serializers.SerializerMethodField()
+    search_snippet = serializers.SerializerMethodField()
+    featured_image_variants = ImageVariantsField()
     
     class Meta:
         model = Blog
+        list_serializer_class = BlogListListSerializer
         fields = [
-            'id', 'title', 'slug', 'excerpt', 'featured_image',
+            'id', 'title', 'slug', 'excerpt', 'featured_image', 'featured_image_variants',
             'author', 'category', 'tags', 'status', 'is_featured',
-            'views', 'likes', 'reading_time', 'created_at', 'published_at'
+            'views', 'likes', 'is_liked', 'reading_time', 'created_at', 'published_at',
+            'search_snippet'
         ]
+    
+    def get_is_liked(self, obj):
+        """Whether the requesting user liked this post (None for anonymous requests)."""
+        liked_blog_ids = self.context.get('liked_blog_ids')
+        if liked_blog_ids is not None:
+            return obj.pk in liked_blog_ids
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return None
+        return obj.pk in BlogLike.objects.liked_blog_ids(user, [obj.pk])
+    
+    def get_search_snippet(self, obj):
+        """Highlighted match context when the list is a search result, else None."""
+        return self.context.get('search_snippets', {}).get(obj.pk)
 
 
 class BlogDetailSerializer(serializers.ModelSerializer):
@@ -71,7 +124,9 @@ class BlogDetailSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
+    views = serializers.IntegerField(source='current_views', read_only=True)
+    likes = serializers.IntegerField(source='current_likes', read_only=True)
+    comments = serializers.SerializerMethodField()
     formatted_content = serializers.SerializerMethodField()
     
     class Meta:
@@ -87,6 +142,14 @@ class BlogDetailSerializer(serializers.ModelSerializer):
     def get_formatted_content(self, obj):
         """Get formatted HTML content."""
         return obj.formatted_content
+    
+    def get_comments(self, obj):
+        """Get the approved comment threads, built from a single query."""
+        if hasattr(obj, 'approved_comments'):
+            roots = build_comment_tree(obj.approved_comments)
+        else:
+            roots = load_comment_tree(obj)
+        return CommentSerializer(roots, many=True, context=self.context).data
 
 
 class BlogCreateSerializer(serializers.ModelSerializer):
@@ -159,6 +222,12 @@ class CommentCreateSerializer(serializers.ModelSerializer):
         model = Comment
         fields = ['content', 'parent']
     
+    def validate_parent(self, value):
+        """Replies must belong to the same blog post."""
+        if value is not None and value.blog_id != self.context['blog'].pk:
+            raise serializers.ValidationError("Parent comment belongs to a different blog post.")
+        return value
+    
     def create(self, validated_data):
         """Create a new comment."""
         validated_data['author'] = self.context['request'].user
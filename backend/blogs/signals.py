@@ -0,0 +1,220 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from blog_project import images
+
+from . import feeds, sitemaps, taxonomy
+from .cache import invalidate, invalidate_on_commit
+from .models import Blog, Category, Tag
+from .search import INDEXED_FIELDS, get_search_backend, index_blog
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Blog)
+def update_search_index(sender, instance, update_fields=None, raw=False, using='default', **kwargs):
+    """Keep the full-text index in sync when a blog is saved."""
+    if raw:
+        return
+    if update_fields is not None and not INDEXED_FIELDS.intersection(update_fields):
+        return
+    index_blog(instance, using=using)
+
+
+@receiver(post_delete, sender=Blog)
+def remove_from_search_index(sender, instance, using='default', **kwargs):
+    """Drop deleted blogs from the full-text index."""
+    get_search_backend(using).remove(instance.pk)
+
+
+@receiver(pre_save, sender=User)
+def remember_author_name(sender, instance, update_fields=None, raw=False, using='default', **kwargs):
+    """Note the stored name so a save that leaves it unchanged skips re-indexing."""
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and 'name' not in update_fields:
+        return
+    instance._stored_name = User.objects.using(using).filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def reindex_author_blogs(sender, instance, update_fields=None, raw=False, using='default', **kwargs):
+    """Re-index an author's posts when their name (which is searchable) changed."""
+    if raw or kwargs.get('created'):
+        return
+    if update_fields is not None and 'name' not in update_fields:
+        return
+    if getattr(instance, '_stored_name', None) == instance.name:
+        return
+    backend = get_search_backend(using)
+    for blog in Blog.objects.using(using).filter(author=instance, status='published').only(
+        'pk', 'title', 'excerpt', 'content'
+    ):
+        backend.update(blog, instance.name)
+
+
+@receiver(post_save, sender=Blog)
+def update_taxonomy_counts(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """Keep Category/Tag published-post counts in sync with blog saves."""
+    if raw:
+        return
+    if update_fields is not None and not {'status', 'category'}.intersection(update_fields):
+        return
+    taxonomy.blog_saved(instance, created)
+
+
+@receiver(pre_delete, sender=Blog)
+def remember_deleted_blog_tags(sender, instance, **kwargs):
+    """Capture tag ids before the m2m rows are deleted along with the blog."""
+    instance._deleted_tag_ids = taxonomy.blog_tag_ids(instance)
+
+
+@receiver(post_delete, sender=Blog)
+def update_taxonomy_counts_on_delete(sender, instance, **kwargs):
+    """Decrement Category/Tag counts when a published blog is deleted."""
+    taxonomy.blog_deleted(instance, getattr(instance, '_deleted_tag_ids', []))
+
+
+@receiver(m2m_changed, sender=Blog.tags.through)
+def update_tag_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep Tag counts in sync when a blog's tags change (from either side)."""
+    if action == 'pre_clear':
+        if not reverse:
+            instance._cleared_tag_ids = taxonomy.blog_tag_ids(instance)
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        taxonomy.tag_blogs_changed(instance, action, pk_set or [])
+    else:
+        if action == 'post_clear':
+            pk_set = getattr(instance, '_cleared_tag_ids', [])
+        taxonomy.blog_tags_changed(instance, action, pk_set or [])
+
+
+def listing_groups(blog, created=False):
+    """Cached listing groups that a change to this blog can affect."""
+    stored = {} if created else blog.stored_state()
+    was_published = stored.get('status', 'published') == 'published'
+    was_featured = stored.get('is_featured', True)
+
+    groups = []
+    if blog.status == 'published' or was_published:
+        groups.append('popular')
+        if blog.is_featured or was_featured:
+            groups.append('featured')
+    return groups
+
+
+@receiver(post_save, sender=Blog)
+def invalidate_listing_cache(sender, instance, created, update_fields=None, raw=False, using='default', **kwargs):
+    """Drop cached featured/popular listings when a relevant blog changes."""
+    if raw:
+        return
+    invalidate_on_commit(*listing_groups(instance, created), using=using)
+
+
+@receiver(post_delete, sender=Blog)
+def invalidate_listing_cache_on_delete(sender, instance, using='default', **kwargs):
+    """Drop cached featured/popular listings when a listed blog is deleted."""
+    invalidate_on_commit(*listing_groups(instance), using=using)
+
+
+@receiver(m2m_changed, sender=Blog.tags.through)
+def invalidate_listing_cache_on_tags(sender, instance, action, reverse, using='default', **kwargs):
+    """Listings embed tags, so tag changes on listed blogs invalidate them too."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        invalidate_on_commit('popular', 'featured', using=using)
+    else:
+        invalidate_on_commit(*listing_groups(instance), using=using)
+
+
+@receiver(pre_save, sender=Blog)
+def clear_featured_image_variants(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Forget the resized variants of a replaced or removed featured image."""
+    if raw:
+        return
+    images.clear_stale_variants(instance, 'featured_image', update_fields)
+
+
+@receiver(post_save, sender=Blog)
+def schedule_featured_image_variants(sender, instance, update_fields=None, raw=False, using='default', **kwargs):
+    """Resize a new featured image in the background once the save commits."""
+    if raw:
+        return
+    images.schedule(instance, 'featured_image', update_fields, using=using)
+
+
+@receiver(images.variants_generated, sender=Blog)
+def invalidate_listing_cache_on_variants(sender, pk, **kwargs):
+    """Cached listings embed the variant URLs."""
+    invalidate('popular', 'featured')
+
+
+@receiver(post_save, sender=Blog)
+def invalidate_feeds(sender, instance, created, update_fields=None, raw=False, using='default', **kwargs):
+    """Drop the cached feeds a published (or unpublished) blog appears in."""
+    if raw:
+        return
+    if update_fields is not None and not feeds.FEED_FIELDS.intersection(update_fields):
+        return
+    invalidate_on_commit(*feeds.blog_feed_groups(instance, created), using=using)
+
+
+@receiver(post_delete, sender=Blog)
+def invalidate_feeds_on_delete(sender, instance, using='default', **kwargs):
+    """Drop the cached feeds a deleted blog appeared in."""
+    groups = feeds.blog_feed_groups(instance, tag_ids=getattr(instance, '_deleted_tag_ids', []))
+    invalidate_on_commit(*groups, using=using)
+
+
+@receiver(m2m_changed, sender=Blog.tags.through)
+def invalidate_feeds_on_tags(sender, instance, action, reverse, pk_set, using='default', **kwargs):
+    """Feed items list their tags, and tag feeds list their posts."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        invalidate_on_commit('feeds', using=using)
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_tag_ids', [])
+    invalidate_on_commit(*feeds.blog_feed_groups(instance, tag_ids=pk_set or []), using=using)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+def invalidate_feeds_on_taxonomy(sender, raw=False, using='default', **kwargs):
+    """Category and tag names appear in feed titles and items."""
+    if not raw:
+        invalidate_on_commit('feeds', using=using)
+
+
+@receiver(post_save, sender=User)
+def invalidate_feeds_on_author_name(sender, instance, update_fields=None, raw=False, using='default', **kwargs):
+    """Author names appear in feed titles and items."""
+    if raw or kwargs.get('created'):
+        return
+    if update_fields is not None and 'name' not in update_fields:
+        return
+    if getattr(instance, '_stored_name', None) != instance.name:
+        invalidate_on_commit('feeds', using=using)
+
+
+@receiver(post_save, sender=Blog)
+def invalidate_sitemap(sender, instance, created, update_fields=None, raw=False, using='default', **kwargs):
+    """Drop the cached sitemap chunk of a listed (or unlisted) blog and the index."""
+    if raw:
+        return
+    invalidate_on_commit(*sitemaps.blog_sitemap_groups(instance, created, update_fields), using=using)
+
+
+@receiver(post_delete, sender=Blog)
+def invalidate_sitemap_on_delete(sender, instance, using='default', **kwargs):
+    """Drop the cached sitemap chunk of a deleted blog and the index."""
+    invalidate_on_commit(*sitemaps.blog_sitemap_groups(instance), using=using)
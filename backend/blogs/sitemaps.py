@@ -0,0 +1,184 @@
+"""
+Sitemap index and chunked sitemaps of published posts.
+
+Posts are split into chunks by primary key: chunk n holds the published
+posts with pk in ((n - 1) * CHUNK_SIZE, n * CHUNK_SIZE], so a chunk never
+exceeds the protocol's 50,000 URLs and a post never moves between chunks.
+
+    /sitemap.xml        sitemap index: one <sitemap> per non-empty chunk
+    /sitemap-<n>.xml    <urlset> of the posts in chunk n (frontend URLs)
+
+A chunk is built by streaming (slug, updated_at) rows with iterator()
+straight into a gzip buffer, so neither model instances nor the
+uncompressed document are held in memory. The compressed document is
+cached per chunk (blogs/cache.py group 'sitemap-<n>'), and blogs/signals.py
+invalidates only the chunk of a post whose URL, status or updated_at
+changed, plus the per-chunk lastmod list behind the index. Crawlers that
+accept gzip get the cached bytes as they are. Both are built through
+cached(), which reads from the primary, so a lagging replica cannot leave
+a just-published post out of its chunk or the index for a day.
+
+The URLs point at the frontend (SITEMAP['SITE_URL']) while the sitemap is
+served by the API, so the frontend's robots.txt must reference it
+(``Sitemap: https://api.example.com/sitemap.xml``) for crawlers to accept
+the cross-host entries.
+"""
+import gzip
+import hashlib
+import io
+import re
+import time
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import F, IntegerField, Max
+from django.db.models.functions import Cast
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .cache import cached
+from .models import Blog
+
+DEFAULTS = {
+    'SITE_URL': 'http://localhost:3000',
+    'CHUNK_SIZE': 50000,
+    'TIMEOUT': 86400,
+    'MAX_AGE': 3600,
+}
+
+NAMESPACE = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+# Blog fields that show up in a sitemap entry (the URL, whether it is listed, lastmod).
+SITEMAP_FIELDS = {'slug', 'status', 'updated_at'}
+
+accepts_gzip = re.compile(r'\bgzip\b').search
+
+
+def sitemap_setting(name):
+    """Read a SITEMAP setting, falling back to the module defaults."""
+    return getattr(settings, 'SITEMAP', {}).get(name, DEFAULTS[name])
+
+
+def chunk_of(pk):
+    """Number of the chunk holding the post with this primary key."""
+    return (pk - 1) // sitemap_setting('CHUNK_SIZE') + 1
+
+
+def chunk_group(number):
+    return f'sitemap-{number}'
+
+
+def blog_sitemap_groups(blog, created=False, update_fields=None):
+    """Cache groups a change to this blog can affect."""
+    stored = {} if created else blog.stored_state()
+    if blog.status != 'published' and stored.get('status', 'published') != 'published':
+        return []
+    if update_fields is not None and not SITEMAP_FIELDS.intersection(update_fields):
+        return []
+    return ['sitemap-index', chunk_group(chunk_of(blog.pk))]
+
+
+def build_index():
+    """{chunk number: latest updated_at} for every chunk with published posts, in one grouped query."""
+    chunk = Cast((F('pk') - 1) / sitemap_setting('CHUNK_SIZE') + 1, IntegerField())
+    rows = (
+        Blog.objects.filter(status='published')
+        .annotate(chunk=chunk)
+        .order_by()
+        .values('chunk')
+        .annotate(lastmod=Max('updated_at'))
+        .values_list('chunk', 'lastmod')
+    )
+    return {'chunks': dict(sorted(rows)), 'last_modified': int(time.time())}
+
+
+def w3c(timestamp):
+    return timestamp.isoformat(timespec='seconds')
+
+
+def build_chunk(number, batch_size=2000):
+    """Render chunk `number` into a gzip buffer; returns the cache entry served by sitemap_chunk."""
+    size = sitemap_setting('CHUNK_SIZE')
+    site_url = sitemap_setting('SITE_URL').rstrip('/')
+    rows = (
+        Blog.objects.filter(status='published', pk__gt=(number - 1) * size, pk__lte=number * size)
+        .order_by('pk')
+        .values_list('slug', 'updated_at')
+        .iterator(chunk_size=batch_size)
+    )
+    digest = hashlib.sha256()
+    buffer = io.BytesIO()
+    # mtime=0 keeps the bytes (and the ETag) identical when nothing changed.
+    with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as document:
+        def write(text):
+            data = text.encode('utf-8')
+            digest.update(data)
+            document.write(data)
+
+        write(f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{NAMESPACE}">\n')
+        urls = []
+        for slug, updated_at in rows:
+            urls.append(
+                f'<url><loc>{escape(f"{site_url}/blog/{slug}")}</loc>'
+                f'<lastmod>{w3c(updated_at)}</lastmod></url>\n'
+            )
+            if len(urls) == batch_size:
+                write(''.join(urls))
+                urls.clear()
+        write(''.join(urls) + '</urlset>\n')
+    return {
+        'body': buffer.getvalue(),
+        'etag': digest.hexdigest()[:32],
+        # Build time rather than the newest post: unpublishing a post must not move it back.
+        'last_modified': int(time.time()),
+    }
+
+
+def xml_response(request, body, etag, last_modified, gzipped=False):
+    """Serve a sitemap document with strong validators, decompressing for clients without gzip."""
+    if gzipped and not accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        body, gzipped = gzip.decompress(body), False
+    # Strong ETags must differ between encodings of the same document.
+    etag = f'"{etag}-gzip"' if gzipped else f'"{etag}"'
+    response = HttpResponse(body, content_type='application/xml; charset=utf-8')
+    if gzipped:
+        response['Content-Encoding'] = 'gzip'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    patch_cache_control(response, public=True, max_age=sitemap_setting('MAX_AGE'))
+    return get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
+
+
+def cached_index():
+    return cached('sitemap-index', 'chunks', build_index, timeout=sitemap_setting('TIMEOUT'))
+
+
+@require_safe
+def sitemap_index(request):
+    """The sitemap index, listing each chunk with its lastmod."""
+    index = cached_index()
+    entries = ''.join(
+        f'<sitemap><loc>{escape(request.build_absolute_uri(reverse("sitemap-chunk", args=[number])))}</loc>'
+        f'<lastmod>{w3c(lastmod)}</lastmod></sitemap>\n'
+        for number, lastmod in index['chunks'].items()
+    )
+    body = (
+        f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{NAMESPACE}">\n'
+        f'{entries}</sitemapindex>\n'
+    ).encode('utf-8')
+    return xml_response(request, body, hashlib.sha256(body).hexdigest()[:32], index['last_modified'])
+
+
+@require_safe
+def sitemap_chunk(request, number):
+    """One chunk of post URLs, from the cache unless a post in it changed."""
+    if number not in cached_index()['chunks']:
+        raise Http404('No such sitemap.')
+    entry = cached(
+        chunk_group(number), 'xml', lambda: build_chunk(number), timeout=sitemap_setting('TIMEOUT')
+    )
+    return xml_response(request, entry['body'], entry['etag'], entry['last_modified'], gzipped=True)
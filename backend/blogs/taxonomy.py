@@ -0,0 +1,137 @@
+"""
+Denormalized published-post counts for categories and tags.
+
+Category.blog_count and Tag.blog_count are adjusted with F() updates from
+the Blog save/delete and tags m2m signals (see blogs/signals.py), and can
+be recomputed from scratch with the reconcile_blog_counts command. Every
+count update also touches updated_at, which the list and post ETags
+(blogs/views.py) are built from.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Blog, Category, Tag
+
+
+def adjust_counts(model, ids, delta):
+    """Add delta to blog_count for the given category or tag ids."""
+    ids = [pk for pk in ids if pk is not None]
+    if not ids or not delta:
+        return
+    value = F('blog_count') + delta
+    if delta < 0:
+        value = Greatest(value, 0)
+    model.objects.filter(pk__in=ids).update(blog_count=value, updated_at=timezone.now())
+
+
+def published_tag_count(tag_pk):
+    """Subquery counting published blogs for the tag referenced by tag_pk."""
+    through = Blog.tags.through
+    return Subquery(
+        through.objects.filter(tag_id=tag_pk, blog__status='published')
+        .values('tag_id')
+        .annotate(total=Count('blog_id'))
+        .values('total'),
+        output_field=IntegerField(),
+    )
+
+
+def published_category_count(category_pk):
+    """Subquery counting published blogs for the category referenced by category_pk."""
+    return Subquery(
+        Blog.objects.filter(category_id=category_pk, status='published')
+        .values('category_id')
+        .annotate(total=Count('pk'))
+        .values('total'),
+        output_field=IntegerField(),
+    )
+
+
+def recount_categories(ids=None):
+    """Recompute blog_count for some (or all) categories. Returns rows corrected."""
+    queryset = Category.objects.all() if ids is None else Category.objects.filter(pk__in=ids)
+    count = Coalesce(published_category_count(OuterRef('pk')), Value(0))
+    # Only rows that were off, so a reconcile does not change every row's ETag.
+    return queryset.alias(count=count).exclude(blog_count=F('count')).update(
+        blog_count=F('count'), updated_at=timezone.now()
+    )
+
+
+def recount_tags(ids=None):
+    """Recompute blog_count for some (or all) tags. Returns rows corrected."""
+    queryset = Tag.objects.all() if ids is None else Tag.objects.filter(pk__in=ids)
+    count = Coalesce(published_tag_count(OuterRef('pk')), Value(0))
+    # Only rows that were off, so a reconcile does not change every row's ETag.
+    return queryset.alias(count=count).exclude(blog_count=F('count')).update(
+        blog_count=F('count'), updated_at=timezone.now()
+    )
+
+
+def blog_tag_ids(blog):
+    """Tag ids currently linked to a blog."""
+    return list(Blog.tags.through.objects.filter(blog_id=blog.pk).values_list('tag_id', flat=True))
+
+
+def stored_counted_state(blog):
+    """(was published, category id) as last stored, or None if unknown."""
+    stored = blog.stored_state()
+    if 'status' not in stored or 'category_id' not in stored:
+        return None
+    return stored['status'] == 'published', stored['category_id']
+
+
+def blog_saved(blog, created):
+    """Apply count changes caused by a blog being created or saved."""
+    previous = (False, None) if created else stored_counted_state(blog)
+    current = (blog.status == 'published', blog.category_id)
+
+    if previous is None:
+        # The stored state was not loaded (e.g. deferred fields): recount the
+        # affected rows instead of guessing a delta. A deferred field is not
+        # saved, so the old category is known whenever it can have changed.
+        old_category = blog.stored_state().get('category_id')
+        recount_categories([pk for pk in {old_category, blog.category_id} if pk is not None])
+        recount_tags(blog_tag_ids(blog))
+    elif previous != current:
+        was_published, old_category = previous
+        is_published, new_category = current
+        if was_published:
+            adjust_counts(Category, [old_category], -1)
+        if is_published:
+            adjust_counts(Category, [new_category], 1)
+        if was_published != is_published and not created:
+            adjust_counts(Tag, blog_tag_ids(blog), 1 if is_published else -1)
+
+
+def blog_deleted(blog, tag_ids):
+    """Apply count changes caused by deleting a blog."""
+    state = stored_counted_state(blog)
+    was_published = state[0] if state is not None else blog.status == 'published'
+    if was_published:
+        adjust_counts(Category, [blog.category_id], -1)
+        adjust_counts(Tag, tag_ids, -1)
+
+
+def blog_tags_changed(blog, action, tag_ids):
+    """Apply count changes for tags added to or removed from one blog."""
+    state = stored_counted_state(blog)
+    is_published = state[0] if state is not None else blog.status == 'published'
+    if not is_published:
+        return
+    if action == 'post_add':
+        adjust_counts(Tag, tag_ids, 1)
+    elif action in ('post_remove', 'post_clear'):
+        adjust_counts(Tag, tag_ids, -1)
+
+
+def tag_blogs_changed(tag, action, blog_ids):
+    """Apply count changes for blogs added to or removed from one tag."""
+    if action == 'post_clear':
+        recount_tags([tag.pk])
+        return
+    published = Blog.objects.filter(pk__in=blog_ids, status='published').count()
+    if action == 'post_add':
+        adjust_counts(Tag, [tag.pk], published)
+    elif action == 'post_remove':
+        adjust_counts(Tag, [tag.pk], -published)
@@ -0,0 +1,621 @@
+import base64
+import datetime
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import URLResolver, get_resolver, resolve
+from django.utils import timezone
+from django.utils.http import http_date
+from django.views.static import serve
+from rest_framework.test import APIClient
+
+from benchmarks import dataset
+from benchmarks.scenarios import QUERY_BUDGETS, SCENARIOS, Fixtures
+from blog_project.testing import assert_max_queries
+
+from . import taxonomy
+from .analytics import CounterBuffer, like_counter, view_counter
+from .export import StaticExporter, list_route
+from .models import Blog, BlogTrending, Category, Comment, Tag
+from .trending import WINDOW_FIELDS, trending_blogs, update_trending
+
+User = get_user_model()
+
+
+class GenerateDataTests(TestCase):
+    """Smoke tests for the generate_data management command."""
+
+    def generate(self, **options):
+        options = {
+            'users': 5, 'blogs': 20, 'categories': 2, 'tags': 6,
+            'chunk_size': 7, 'verbosity': 0, 'stdout': StringIO(), **options,
+        }
+        call_command('generate_data', **options)
+
+    def test_fills_an_empty_database(self):
+        self.generate()
+
+        self.assertEqual(User.objects.count(), 5)
+        self.assertEqual(Blog.objects.count(), 20)
+        self.assertEqual(Category.objects.count(), 2)
+        self.assertEqual(Tag.objects.count(), 6)
+        published = Blog.objects.filter(status='published')
+        self.assertEqual(
+            sum(Category.objects.values_list('blog_count', flat=True)),
+            published.exclude(category=None).count(),
+        )
+        for comment in Comment.objects.exclude(parent=None).select_related('parent'):
+            self.assertEqual(comment.depth, comment.parent.depth + 1)
+            self.assertEqual(comment.root_id, comment.parent.root_id or comment.parent_id)
+
+    def test_rows_load_through_the_orm(self):
+        self.generate()
+
+        blog = Blog.objects.select_related('author').first()
+        self.assertFalse(blog.featured_image)
+        self.assertEqual(blog.featured_image_variants, {})
+        self.assertFalse(blog.author.avatar)
+        self.assertEqual(blog.author.avatar_variants, {})
+        self.assertIsNotNone(blog.created_at.tzinfo)
+
+    def test_same_seed_same_data(self):
+        self.generate(prefix='a')
+        self.generate(prefix='b')
+
+        titles = {
+            prefix: list(Blog.objects.filter(slug__startswith=f'{prefix}-').order_by('pk').values_list('title', flat=True))
+            for prefix in ('a', 'b')
+        }
+        self.assertEqual(titles['a'], titles['b'])
+
+
+@override_settings(BLOG_COUNTERS={'FLUSH_INTERVAL': 60})
+class CounterBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author@example.com', 'Author', 'password')
+        cls.first = Blog.objects.create(title='First', content='One', author=author, status='published')
+        cls.second = Blog.objects.create(title='Second', content='Two', author=author, status='published')
+
+    def test_add_reports_whether_its_own_delta_was_written(self):
+        buffer = CounterBuffer('views')
+        self.assertFalse(buffer.add(self.first.pk))
+        self.assertEqual(buffer.pending(self.first.pk), 1)
+        buffer._last_flush -= 60
+        self.assertTrue(buffer.add(self.first.pk))
+        self.assertEqual(buffer.pending(self.first.pk), 0)
+
+    def test_add_is_false_when_a_concurrent_flush_wrote_its_delta(self):
+        buffer = CounterBuffer('views')
+        flush = buffer._flush
+
+        def racing_flush():
+            # Another thread flushes this delta, then a different blog is buffered.
+            flush()
+            with buffer._lock:
+                buffer._pending[self.second.pk] += 1
+            return flush()
+
+        buffer._last_flush -= 60
+        with mock.patch.object(buffer, '_flush', racing_flush):
+            self.assertFalse(buffer.add(self.first.pk))
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.views, self.second.views), (1, 1))
+
+    def test_api_counts_include_buffered_deltas(self):
+        for counter in (view_counter, like_counter):
+            self.addCleanup(counter._pending.clear)
+        reader = User.objects.create_user('reader@example.com', 'Reader', 'password')
+        self.client.force_login(reader)
+        self.first.add_like(reader)
+        self.client.get('/api/blogs/first/', HTTP_USER_AGENT='Mozilla/5.0')
+
+        detail = self.client.get('/api/blogs/first/', HTTP_USER_AGENT='Mozilla/5.0').json()
+        listed = next(blog for blog in self.client.get('/api/blogs/').json()['results'] if blog['id'] == self.first.pk)
+        self.assertEqual((detail['views'], detail['likes']), (2, 1))
+        self.assertEqual((listed['views'], listed['likes']), (2, 1))
+
+
+class TaxonomyCountTests(TestCase):
+    """Category and Tag blog_count follow every change that can publish or unpublish a post for them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author@example.com', 'Author', 'password')
+        cls.python = Category.objects.create(name='Python', slug='python')
+        cls.django = Category.objects.create(name='Django', slug='django')
+        cls.orm, cls.async_, cls.tests = (
+            Tag.objects.create(name=name, slug=name) for name in ('orm', 'async', 'tests')
+        )
+
+    def post(self, status='published', category=None, tags=()):
+        blog = Blog.objects.create(
+            title=f'Post {Blog.objects.count()}', content='Body', author=self.author,
+            status=status, category=category,
+        )
+        blog.tags.add(*tags)
+        return Blog.objects.get(pk=blog.pk)
+
+    def assertCounts(self, python=0, django=0, orm=0, async_=0, tests=0):
+        counts = dict(Category.objects.values_list('slug', 'blog_count'))
+        counts.update(Tag.objects.values_list('slug', 'blog_count'))
+        self.assertEqual(
+            counts, {'python': python, 'django': django, 'orm': orm, 'async': async_, 'tests': tests}
+        )
+        # And a full recount agrees.
+        self.assertEqual((taxonomy.recount_categories(), taxonomy.recount_tags()), (0, 0))
+
+    def test_publish_and_unpublish(self):
+        blog = self.post(status='draft', category=self.python, tags=[self.orm, self.tests])
+        self.assertCounts()
+
+        blog.status = 'published'
+        blog.save()
+        self.assertCounts(python=1, orm=1, tests=1)
+
+        blog.status = 'draft'
+        blog.save(update_fields=['status'])
+        self.assertCounts()
+
+    def test_move_to_another_category(self):
+        blog = self.post(category=self.python)
+        self.post(status='draft', category=self.python)
+        blog.category = self.django
+        blog.save()
+        self.assertCounts(django=1)
+
+        blog.category = None
+        blog.save()
+        self.assertCounts()
+
+    def test_save_without_loaded_state_recounts(self):
+        blog = self.post(category=self.python, tags=[self.orm])
+        partial = Blog.objects.only('title', 'category').get(pk=blog.pk)
+        partial.category = self.django
+        partial.save()
+        self.assertCounts(django=1, orm=1)
+
+        partial = Blog.objects.only('title', 'status').get(pk=blog.pk)
+        partial.status = 'draft'
+        partial.save()
+        self.assertCounts()
+
+    def test_add_remove_and_clear_tags(self):
+        blog = self.post(category=self.python)
+        draft = self.post(status='draft')
+        blog.tags.add(self.orm, self.async_)
+        draft.tags.add(self.orm)
+        self.assertCounts(python=1, orm=1, async_=1)
+
+        blog.tags.remove(self.orm)
+        self.assertCounts(python=1, async_=1)
+
+        blog.tags.set([self.tests, self.async_])
+        self.assertCounts(python=1, async_=1, tests=1)
+
+        blog.tags.clear()
+        self.assertCounts(python=1)
+
+    def test_tag_side_changes(self):
+        first, second = self.post(), self.post()
+        draft = self.post(status='draft')
+        self.orm.blogs.add(first, second, draft)
+        self.assertCounts(orm=2)
+
+        self.orm.blogs.remove(first, draft)
+        self.assertCounts(orm=1)
+
+        self.orm.blogs.clear()
+        self.assertCounts()
+
+    def test_delete(self):
+        blog = self.post(category=self.python, tags=[self.orm, self.async_])
+        draft = self.post(status='draft', category=self.python, tags=[self.orm])
+        self.assertCounts(python=1, orm=1, async_=1)
+
+        draft.delete()
+        self.assertCounts(python=1, orm=1, async_=1)
+        blog.delete()
+        self.assertCounts()
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author@example.com', 'Author', 'password')
+        for i in range(12):
+            Blog.objects.create(title=f'Post {i}', content='Body', author=author, status='published', views=i * 7 % 12)
+        update_trending()
+        # A hot post that has since been unpublished must not rank.
+        Blog.objects.filter(title='Post 5').update(status='draft')
+        BlogTrending.objects.filter(blog__title='Post 5').update(day_score=1e6, week_score=1e6)
+
+    def test_top_posts_by_score(self):
+        for window, field in WINDOW_FIELDS.items():
+            with self.subTest(window):
+                expected = list(
+                    BlogTrending.objects.filter(blog__status='published')
+                    .order_by(f'-{field}').values_list('blog_id', flat=True)[:6]
+                )
+                self.assertEqual([blog.pk for blog in trending_blogs(window, 6)], expected)
+                response = self.client.get('/api/blogs/popular/', {'window': window})
+                self.assertEqual([blog['id'] for blog in response.json()], expected)
+
+    def test_ranking_walks_the_score_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Query plan checked on SQLite only.')
+        for window, field in WINDOW_FIELDS.items():
+            with self.subTest(window):
+                sql, params = trending_blogs(window, 6).query.sql_with_params()
+                with connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                    plan = [row[-1] for row in cursor.fetchall()]
+                # The ranking scans the score index; posts are only looked up by primary key.
+                self.assertTrue(any(step.endswith(f'USING INDEX blogs_trending_{window}_idx') for step in plan), plan)
+                self.assertFalse([step for step in plan if step.startswith('SCAN') and 'blogs_trending' not in step], plan)
+
+
+class ConditionalGetTests(TestCase):
+    """Blog read endpoints answer revalidations with 304 and change validators when what they embed changes."""
+
+    prefixes = ('/api/blogs/', '/api/async/blogs/')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user('author@example.com', 'Author', 'password')
+        cls.category = Category.objects.create(name='Python', slug='python')
+        cls.tag = Tag.objects.create(name='orm', slug='orm')
+        cls.blog = Blog.objects.create(
+            title='Post', content='Body', author=cls.author, category=cls.category, status='published'
+        )
+        cls.blog.tags.add(cls.tag)
+
+    def get(self, path, **headers):
+        return self.client.get(path, headers=headers)
+
+    def etags(self):
+        return [self.get(f'{prefix}post/')['ETag'] for prefix in self.prefixes]
+
+    def test_if_none_match(self):
+        for prefix in self.prefixes:
+            for path in (f'{prefix}post/', f'{prefix}post/comments/', f'{prefix}categories/', f'{prefix}tags/'):
+                with self.subTest(path):
+                    response = self.get(path)
+                    self.assertEqual(response.status_code, 200)
+                    etag = response['ETag']
+                    self.assertTrue(etag.startswith('W/"'))
+                    revalidated = self.get(path, if_none_match=etag)
+                    self.assertEqual(revalidated.status_code, 304)
+                    self.assertEqual(revalidated['ETag'], etag)
+                    self.assertEqual(revalidated.content, b'')
+                    self.assertEqual(self.get(path, if_none_match='W/"other"').status_code, 200)
+
+    def test_if_modified_since(self):
+        for prefix in self.prefixes:
+            with self.subTest(prefix):
+                last_modified = self.get(f'{prefix}post/')['Last-Modified']
+                self.assertEqual(self.get(f'{prefix}post/', if_modified_since=last_modified).status_code, 304)
+                earlier = http_date(self.blog.updated_at.timestamp() - 60)
+                self.assertEqual(self.get(f'{prefix}post/', if_modified_since=earlier).status_code, 200)
+
+    def test_etag_follows_embedded_objects(self):
+        edits = {
+            'post': lambda: Blog.objects.get(pk=self.blog.pk).save(),
+            'comment': lambda: Comment.objects.create(blog=self.blog, author=self.author, content='Hi'),
+            'author': lambda: User.objects.filter(pk=self.author.pk).update(name='Renamed', updated_at=timezone.now()),
+            'category': lambda: Category.objects.filter(pk=self.category.pk).update(
+                name='Renamed', updated_at=timezone.now()
+            ),
+            'tag': lambda: Tag.objects.filter(pk=self.tag.pk).update(name='renamed', updated_at=timezone.now()),
+            'new tag': lambda: self.blog.tags.add(Tag.objects.create(name='async', slug='async')),
+            'removed tag': lambda: self.blog.tags.remove(self.tag),
+        }
+        for name, edit in edits.items():
+            with self.subTest(name):
+                before = self.etags()
+                edit()
+                after = self.etags()
+                for prefix, old, new in zip(self.prefixes, before, after):
+                    self.assertNotEqual(old, new, prefix)
+                    self.assertEqual(self.get(f'{prefix}post/', if_none_match=old).status_code, 200)
+
+    def test_unsafe_methods_are_not_short_circuited(self):
+        etag = self.get('/api/blogs/post/')['ETag']
+        client = APIClient()
+        client.force_authenticate(self.author)
+        for method in ('post', 'put', 'patch', 'delete'):
+            with self.subTest(method):
+                response = getattr(client, method)('/api/blogs/post/', headers={'if-none-match': etag})
+                self.assertEqual(response.status_code, 405)
+        response = client.patch(
+            '/api/blogs/post/update/', {'title': 'Edited'}, format='json', headers={'if-none-match': etag},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Blog.objects.get(pk=self.blog.pk).title, 'Edited')
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author@example.com', 'Author', 'password')
+        for i in range(25):
+            Blog.objects.create(title=f'Post {i}', content='Body', author=author, status='published')
+        # Timestamps tie in groups of four, and a few posts have none.
+        start = timezone.now()
+        for i, pk in enumerate(Blog.objects.order_by('pk').values_list('pk', flat=True)):
+            Blog.objects.filter(pk=pk).update(
+                created_at=start - datetime.timedelta(minutes=i // 4),
+                published_at=None if i % 7 == 3 else start - datetime.timedelta(minutes=i // 4),
+            )
+
+    def walk(self, url, link='next'):
+        """Follow `link` from url; returns the ids of each page visited."""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([blog['id'] for blog in response.json()['results']])
+            url = response.json()[link]
+        return pages
+
+    def expected_order(self, ordering):
+        """Post ids in keyset order: by the field with nulls last, ties broken by id."""
+        field = ordering.lstrip('-')
+        rows = Blog.objects.values_list(field, 'pk')
+        values = sorted((row for row in rows if row[0] is not None), reverse=ordering.startswith('-'))
+        nulls = sorted((row for row in rows if row[0] is None), reverse=ordering.startswith('-'))
+        return [pk for _, pk in values + nulls]
+
+    def test_cursor_walks_every_post_once(self):
+        for ordering in ('-created_at', 'created_at', '-published_at', 'published_at', '-views'):
+            with self.subTest(ordering):
+                pages = self.walk(f'/api/blogs/?pagination=cursor&ordering={ordering}')
+                self.assertEqual([len(page) for page in pages], [10, 10, 5])
+                self.assertEqual([pk for page in pages for pk in page], self.expected_order(ordering))
+
+    def test_previous_cursor_walks_back_through_the_same_pages(self):
+        for ordering in ('-created_at', 'published_at'):
+            with self.subTest(ordering):
+                forward = self.walk(f'/api/blogs/?pagination=cursor&ordering={ordering}')
+                last = f'/api/blogs/?pagination=cursor&ordering={ordering}'
+                for _ in forward[1:]:
+                    last = self.client.get(last).json()['next']
+                backward = self.walk(last, link='previous')
+                self.assertEqual(backward[::-1], forward)
+
+    def test_first_page_has_no_previous_link(self):
+        response = self.client.get('/api/blogs/?pagination=cursor').json()
+        self.assertIsNone(response['previous'])
+        self.assertIsNotNone(self.client.get(response['next']).json()['previous'])
+
+    def test_invalid_cursor_is_not_found(self):
+        def encode(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+        cursors = [
+            'not a cursor', '%%%', encode([1, 2]), encode('text'), encode({'v': None}),
+            encode({'v': 'yesterday', 'id': 1}), encode({'v': {'a': 1}, 'id': 1}),
+            encode({'v': None, 'id': 10 ** 30}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor):
+                response = self.client.get('/api/blogs/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+        for cursor in (encode({'v': 'many', 'id': 1}), encode({'v': 10 ** 30, 'id': 1})):
+            with self.subTest(cursor):
+                response = self.client.get('/api/blogs/', {'cursor': cursor, 'ordering': '-views'})
+                self.assertEqual(response.status_code, 404)
+
+
+class StaticExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author@example.com', 'Author', 'password')
+        for i in range(25):
+            Blog.objects.create(title=f'Post {i}', content='Body', author=author, status='published')
+        # Timestamps tie in pairs, so pages split ties.
+        start = timezone.now()
+        for i, pk in enumerate(Blog.objects.order_by('pk').values_list('pk', flat=True)):
+            Blog.objects.filter(pk=pk).update(created_at=start - datetime.timedelta(minutes=i // 2))
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def export(self):
+        """Run an export; returns its manifest and the list pages it serialized."""
+        exporter = StaticExporter(self.root, 'http://testserver')
+        with mock.patch.object(exporter, 'render_list_page', wraps=exporter.render_list_page) as render:
+            exporter.export()
+        with open(os.path.join(self.root, 'manifest.json')) as manifest:
+            rendered = sorted(call.args[0] for call in render.call_args_list)
+            return json.load(manifest), rendered
+
+    def read(self, manifest, route):
+        with open(os.path.join(self.root, manifest['routes'][route])) as snapshot:
+            return json.load(snapshot)
+
+    def test_list_pages_match_the_api(self):
+        manifest, rendered = self.export()
+        self.assertEqual(rendered, [1, 2, 3])
+        for route in ('/api/blogs/', '/api/blogs/?page=2', '/api/blogs/?page=3'):
+            with self.subTest(route):
+                api = self.client.get(route).json()
+                snapshot = self.read(manifest, route)
+                self.assertEqual(
+                    [snapshot['count'], snapshot['next'], snapshot['previous']],
+                    [api['count'], api['next'], api['previous']],
+                )
+                # The API breaks created_at ties arbitrarily; the export by id.
+                self.assertEqual(
+                    [blog['created_at'] for blog in snapshot['results']],
+                    [blog['created_at'] for blog in api['results']],
+                )
+        ids = [blog['id'] for page in (1, 2, 3) for blog in self.read(manifest, list_route(page))['results']]
+        self.assertEqual(sorted(ids), sorted(Blog.objects.values_list('pk', flat=True)))
+
+    def test_only_changed_list_pages_are_serialized_again(self):
+        self.export()
+        self.assertEqual(self.export()[1], [])
+        pk = self.read(self.export()[0], '/api/blogs/?page=2')['results'][0]['id']
+        Blog.objects.filter(pk=pk).update(likes=5)
+        manifest, rendered = self.export()
+        self.assertEqual(rendered, [2])
+        self.assertEqual(self.read(manifest, '/api/blogs/?page=2')['results'][0]['likes'], 5)
+
+
+class LaggingReplicaTestCase(TransactionTestCase):
+    """
+    Routes GET reads to a 'lagging' replica: a snapshot of the primary taken by snapshot_replica().
+
+    Not a TestCase: the router sends reads inside a transaction to the primary.
+    """
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('The lagging replica is a copy of the SQLite database.')
+        fd, self.replica_path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(fd)
+        connections.settings['lagging'] = {**connection.settings_dict, 'NAME': self.replica_path}
+        self.addCleanup(self.remove_replica)
+        routing = override_settings(REPLICA_ROUTING={'ALIASES': ['lagging'], 'STICKY_SECONDS': 0})
+        routing.enable()
+        self.addCleanup(routing.disable)
+        self.author = User.objects.create_user('author@example.com', 'Author', 'password')
+
+    def remove_replica(self):
+        connections['lagging'].close()
+        del connections['lagging']
+        del connections.settings['lagging']
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.replica_path + suffix):
+                os.remove(self.replica_path + suffix)
+
+    def snapshot_replica(self):
+        """Copy the primary as it is now; later writes do not reach the replica."""
+        connections['lagging'].close()
+        connection.ensure_connection()
+        target = sqlite3.connect(self.replica_path)
+        try:
+            connection.connection.backup(target)
+        finally:
+            target.close()
+
+    def post(self, title, **fields):
+        return Blog.objects.create(
+            title=title, content='Body', author=self.author, status='published', **fields
+        )
+
+
+class CacheRebuildTests(LaggingReplicaTestCase):
+    def test_replica_serves_uncached_reads(self):
+        self.post('Replicated')
+        self.snapshot_replica()
+        self.post('Not replicated yet')
+        titles = [blog['title'] for blog in self.client.get('/api/blogs/').json()['results']]
+        self.assertEqual(titles, ['Replicated'])
+
+    def test_invalidated_entry_is_rebuilt_from_the_primary(self):
+        for path in ('/api/blogs/featured/', '/api/async/blogs/featured/'):
+            with self.subTest(path):
+                Blog.objects.all().delete()
+                self.post('First', is_featured=True)
+                self.snapshot_replica()
+                # Invalidates 'featured'; the replica has not seen the post yet.
+                self.post('Second', is_featured=True)
+                self.assertEqual(
+                    {blog['title'] for blog in self.client.get(path).json()}, {'First', 'Second'}
+                )
+                # And the entry that was stored is the fresh one.
+                self.assertEqual(
+                    {blog['title'] for blog in self.client.get(path).json()}, {'First', 'Second'}
+                )
+
+
+class FeedRebuildTests(LaggingReplicaTestCase):
+    def test_invalidated_feed_is_rebuilt_from_the_primary(self):
+        self.post('First')
+        self.snapshot_replica()
+        self.client.get('/api/blogs/feeds/rss/')
+        # Drops the cached site feed; the replica has not seen the post yet.
+        self.post('Second')
+        for _ in range(2):
+            feed = self.client.get('/api/blogs/feeds/rss/').content.decode()
+            self.assertIn('<title>Second</title>', feed)
+
+
+class SitemapRebuildTests(LaggingReplicaTestCase):
+    @override_settings(SITEMAP={'CHUNK_SIZE': 1})
+    def test_invalidated_sitemap_is_rebuilt_from_the_primary(self):
+        first = self.post('First')
+        self.snapshot_replica()
+        self.client.get('/sitemap.xml')
+        self.client.get(f'/sitemap-{first.pk}.xml')
+        # Drops the index and the new chunk; the replica has not seen the post yet.
+        second = self.post('Second')
+        for _ in range(2):
+            self.assertContains(self.client.get('/sitemap.xml'), f'/sitemap-{second.pk}.xml')
+            self.assertContains(self.client.get(f'/sitemap-{second.pk}.xml'), '/blog/second</loc>')
+
+
+class QueryBudgetTests(TransactionTestCase):
+    """Every benchmarked endpoint stays within its budget in benchmarks/scenarios.py.
+
+    Not a TestCase: its wrapping transaction would add savepoint queries to
+    every atomic() block and never run on_commit callbacks.
+    """
+
+    def setUp(self):
+        dataset.seed(users=20, blogs=60)
+        self.fixtures = Fixtures.load('test')
+        # Request 0 is measured, request 1 warms caches first.
+        self.fixtures.fill_pools(blogs=2, comments=2, refresh=2, logout=2)
+        response = self.client.post(
+            '/api/auth/login/', {'email': dataset.BENCH_EMAIL, 'password': dataset.BENCH_PASSWORD},
+            content_type='application/json',
+        )
+        self.fixtures.tokens = response.json()['tokens']
+
+    def request(self, scenario, i):
+        data = scenario.data(self.fixtures, i) if scenario.data else None
+        headers = {'HTTP_AUTHORIZATION': f"Bearer {self.fixtures.tokens['access']}"} if scenario.auth else {}
+        return self.client.generic(
+            scenario.method, scenario.path(self.fixtures, i),
+            json.dumps(data) if data is not None else '', content_type='application/json', **headers
+        )
+
+    def test_every_scenario_has_a_budget(self):
+        self.assertEqual({scenario.name for scenario in SCENARIOS}, set(QUERY_BUDGETS))
+
+    def test_every_route_has_a_scenario(self):
+        def routes(patterns, prefix=''):
+            for entry in patterns:
+                if isinstance(entry, URLResolver):
+                    if entry.app_name != 'admin':
+                        yield from routes(entry.url_patterns, prefix + str(entry.pattern))
+                elif entry.callback is not serve:
+                    yield prefix + str(entry.pattern)
+
+        covered = {
+            resolve(urlsplit(scenario.path(self.fixtures, 0)).path).route for scenario in SCENARIOS
+        }
+        self.assertEqual(set(routes(get_resolver().url_patterns)) - covered, set())
+
+    def test_endpoints_within_budget(self):
+        for scenario in SCENARIOS:
+            with self.subTest(scenario.name):
+                self.request(scenario, 1)
+                with assert_max_queries(QUERY_BUDGETS[scenario.name]):
+                    response = self.request(scenario, 0)
+                self.assertIn(response.status_code, scenario.ok)
@@ -0,0 +1,165 @@
+"""
+Time-decayed trending scores for blog posts.
+
+Every view, like and approved comment adds a weighted amount of "heat"
+that halves every HALF_LIVES[window] seconds. Instead of decaying every row
+on every run, each activity is scaled up by 2 ** (t / half_life) relative to
+a fixed epoch and the sum is kept as a logarithm:
+
+    score = log(sum(weight * 2 ** ((t - EPOCH) / half_life)))
+
+Ordering by that value equals ordering by the decayed heat at any moment,
+so update_trending() only has to touch posts whose counters moved since
+the last run. Activity is timestamped when a run first sees it, so the
+resolution of the scores is the interval of the periodic job.
+"""
+import datetime
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Q
+from django.utils import timezone
+
+from .models import Blog, BlogTrending, Comment
+
+EPOCH = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+MIN_HEAT = 1e-6
+
+WINDOW_FIELDS = {
+    'day': 'day_score',
+    'week': 'week_score',
+}
+
+DEFAULTS = {
+    # Seconds for the heat of an event to halve in each window.
+    'HALF_LIVES': {
+        'day': 4 * 3600,
+        'week': 28 * 3600,
+    },
+    'WEIGHTS': {
+        'views': 1.0,
+        'likes': 5.0,
+        'comments': 10.0,
+    },
+    'BATCH_SIZE': 500,
+}
+
+
+def trending_setting(name):
+    """Read a BLOG_TRENDING setting, falling back to the module defaults."""
+    return getattr(settings, 'BLOG_TRENDING', {}).get(name, DEFAULTS[name])
+
+
+def log_add(a, b):
+    """log(exp(a) + exp(b)) without overflow; b may be None for log(0)."""
+    if b is None:
+        return a
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def heat(amount, when, half_life):
+    """Log-space score contribution of `amount` weighted activity at `when`."""
+    if amount <= 0:
+        return None
+    elapsed = (when - EPOCH).total_seconds()
+    return math.log(amount) + elapsed / half_life * math.log(2)
+
+
+def activity(views, likes, comments):
+    """Weighted sum of new activity."""
+    weights = trending_setting('WEIGHTS')
+    return views * weights['views'] + likes * weights['likes'] + comments * weights['comments']
+
+
+def changed_blog_ids(since):
+    """Published posts whose counters may have moved since the last run."""
+    published = Blog.objects.filter(status='published')
+    changed = set(
+        published.filter(
+            Q(trending__isnull=True) |
+            Q(views__gt=F('trending__seen_views')) |
+            Q(likes__gt=F('trending__seen_likes'))
+        ).values_list('pk', flat=True)
+    )
+    comments = Comment.objects.filter(blog__status='published', is_approved=True)
+    if since is not None:
+        comments = comments.filter(updated_at__gte=since)
+    changed.update(comments.values_list('blog_id', flat=True).distinct())
+    return sorted(changed)
+
+
+def update_trending(now=None):
+    """Fold new activity into the trending scores. Returns the number of posts updated."""
+    now = now or timezone.now()
+    half_lives = trending_setting('HALF_LIVES')
+    batch_size = trending_setting('BATCH_SIZE')
+
+    since = BlogTrending.objects.aggregate(latest=Max('updated_at'))['latest']
+    blog_ids = changed_blog_ids(since)
+
+    updated = 0
+    for start in range(0, len(blog_ids), batch_size):
+        chunk = blog_ids[start:start + batch_size]
+        blogs = Blog.objects.filter(pk__in=chunk).only('pk', 'views', 'likes', 'created_at', 'published_at')
+        existing = BlogTrending.objects.in_bulk(chunk)
+        comment_counts = dict(
+            Comment.objects.filter(blog_id__in=chunk, is_approved=True)
+            .values('blog_id').annotate(total=Count('pk')).values_list('blog_id', 'total')
+        )
+
+        created, changed = [], []
+        for blog in blogs:
+            comments = comment_counts.get(blog.pk, 0)
+            trending = existing.get(blog.pk)
+            if trending is None:
+                # Activity from before the first run is dated to publication;
+                # the floor ranks posts without any activity by age.
+                when = blog.published_at or blog.created_at
+                amount = max(activity(blog.views, blog.likes, comments), MIN_HEAT)
+                trending = BlogTrending(blog=blog, **{
+                    field: heat(amount, when, half_lives[window])
+                    for window, field in WINDOW_FIELDS.items()
+                })
+                created.append(trending)
+            else:
+                amount = activity(
+                    max(blog.views - trending.seen_views, 0),
+                    max(blog.likes - trending.seen_likes, 0),
+                    max(comments - trending.seen_comments, 0),
+                )
+                for window, field in WINDOW_FIELDS.items():
+                    setattr(trending, field, log_add(getattr(trending, field), heat(amount, now, half_lives[window])))
+                changed.append(trending)
+            trending.seen_views = blog.views
+            trending.seen_likes = blog.likes
+            trending.seen_comments = comments
+            trending.updated_at = now
+
+        with transaction.atomic():
+            BlogTrending.objects.bulk_create(created)
+            BlogTrending.objects.bulk_update(
+                changed,
+                ['day_score', 'week_score', 'seen_views', 'seen_likes', 'seen_comments', 'updated_at'],
+            )
+        updated += len(created) + len(changed)
+    return updated
+
+
+def trending_blogs(window, limit):
+    """
+    The `limit` published posts with the highest score for a window, best first.
+
+    The ranking reads BlogTrending in score index order and stops after
+    `limit` published posts; only those are loaded from Blog. Posts
+    published since the last update_trending run have no score yet and are
+    left out until it scores them.
+    """
+    field = WINDOW_FIELDS[window]
+    # EXISTS rather than a join keeps BlogTrending the only table the ranking
+    # scans, so the planner walks the score index instead of sorting posts.
+    published = Blog.objects.filter(pk=OuterRef('blog_id'), status='published')
+    top = BlogTrending.objects.filter(Exists(published)).order_by(f'-{field}').values('blog_id')[:limit]
+    return Blog.objects.filter(pk__in=top).order_by(f'-trending__{field}', 'pk')
@@ -14,9 +14,12 @@ from .views import (
     CommentUpdateView,
     CommentDeleteView,
     like_blog,
+    unlike_blog,
+    liked_blogs,
     featured_blogs,
     popular_blogs
 )
+from .feeds import blog_feed
 
 urlpatterns = [
     # Blog CRUD endpoints
@@ -30,6 +33,13 @@ urlpatterns = [
     # Special endpoints (must come before slug patterns)
     path('featured/', featured_blogs, name='featured-blogs'),
     path('popular/', popular_blogs, name='popular-blogs'),
+    path('liked/', liked_blogs, name='liked-blogs'),
+    
+    # RSS/Atom feeds (must come before slug patterns)
+    path('feeds/<str:fmt>/', blog_feed, name='blog-feed'),
+    path('feeds/category/<slug:value>/<str:fmt>/', blog_feed, {'scope': 'category'}, name='category-feed'),
+    path('feeds/tag/<slug:value>/<str:fmt>/', blog_feed, {'scope': 'tag'}, name='tag-feed'),
+    path('feeds/author/<int:value>/<str:fmt>/', blog_feed, {'scope': 'author'}, name='author-feed'),
     
     # User blog endpoints
     path('user/<int:user_id>/', UserBlogListView.as_view(), name='user-blogs'),
@@ -44,6 +54,7 @@ urlpatterns = [
     path('<slug:slug>/update/', BlogUpdateView.as_view(), name='blog-update'),
     path('<slug:slug>/delete/', BlogDeleteView.as_view(), name='blog-delete'),
     path('<slug:slug>/like/', like_blog, name='like-blog'),
+    path('<slug:slug>/unlike/', unlike_blog, name='unlike-blog'),
     
     # Comment endpoints for specific blogs
     path('<slug:blog_slug>/comments/', CommentListView.as_view(), name='comment-list'),
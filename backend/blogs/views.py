@@ -1,11 +1,12 @@
 from rest_framework import status, generics, filters
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count
-from .models import Blog, Category, Tag, Comment
+from django.db.models import Count, Max, Prefetch
+from users.authentication import StatelessReadJWTAuthentication
+from .models import Blog, BlogLike, Category, Tag, Comment
 from .serializers import (
     BlogListSerializer,
     BlogDetailSerializer,
@@ -16,17 +17,91 @@ from .serializers import (
     CommentSerializer,
     CommentCreateSerializer
 )
+from .analytics import record_view
+from .cache import cached
+from .comments import approved_comments, attach_threads
+from .conditional import ConditionalGetMixin
+from .pagination import KeysetPagination
+from .search import FullTextSearchFilter
+from .trending import WINDOW_FIELDS, trending_blogs
 from .permissions import IsAuthorOrReadOnly, IsCommentAuthorOrReadOnly, IsAuthenticatedOrReadOnly
 
 
+def latest(*timestamps):
+    """Most recent of the given timestamps, ignoring missing ones."""
+    return max((ts for ts in timestamps if ts is not None), default=None)
+
+
+def comment_stats():
+    """Aggregates versioning a blog's approved comments, including their authors' profiles."""
+    return {'latest': Max('updated_at'), 'total': Count('pk'), 'authors': Max('author__updated_at')}
+
+
+def comment_version(blog):
+    """Latest update time and count of a blog's approved comments (one query)."""
+    return Comment.objects.filter(blog=blog, is_approved=True).aggregate(**comment_stats())
+
+
+def taxonomy_stats():
+    """Aggregates versioning a Category/Tag list: edits, count changes and additions/removals.
+
+    blogs/taxonomy.py touches updated_at whenever it changes a blog_count.
+    """
+    return {'latest': Max('updated_at'), 'total': Count('pk')}
+
+
+def taxonomy_validators(model, stats, request):
+    """Version of a Category/Tag list page from its taxonomy_stats()."""
+    return f"{model._meta.label}:{stats}:{request.get_full_path()}", stats['latest']
+
+
+def taxonomy_version(model, request):
+    """Cheap version of a Category/Tag list (one aggregate query)."""
+    return taxonomy_validators(model, model.objects.aggregate(**taxonomy_stats()), request)
+
+
+def blog_meta_queryset():
+    """Published posts with just what blog_validators() needs, author and category included."""
+    return Blog.objects.filter(status='published').select_related('author', 'category').only(
+        'pk', 'updated_at', 'views', 'author__updated_at', 'category__updated_at'
+    )
+
+
+def blog_tags_queryset(blog):
+    """(tag id, tag updated_at) pairs of a post, for blog_validators()."""
+    return (
+        Blog.tags.through.objects.filter(blog_id=blog.pk)
+        .order_by('tag_id').values_list('tag_id', 'tag__updated_at')
+    )
+
+
+def blog_validators(blog_meta, comments, tags):
+    """Version of a post from its own timestamp, the author, category and tags it embeds, and its comments."""
+    timestamps = [
+        blog_meta.updated_at,
+        blog_meta.author.updated_at,
+        blog_meta.category.updated_at if blog_meta.category else None,
+        *(updated_at for _, updated_at in tags),
+    ]
+    version = f"blog:{blog_meta.pk}:{[ts and ts.isoformat() for ts in timestamps]}:{comments}:{tags}"
+    return version, latest(*timestamps, comments['latest'], comments['authors'])
+
+
+def comment_list_validators(blog, comments, request):
+    """Version of a comment page from the blog's approved comments."""
+    return f"comments:{blog.pk}:{comments}:{request.get_full_path()}", latest(comments['latest'], comments['authors'])
+
+
 class BlogListView(generics.ListAPIView):
     """List all published blog posts with filtering and search."""
     
     serializer_class = BlogListSerializer
+    authentication_classes = [StatelessReadJWTAuthentication]
     permission_classes = [AllowAny]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = KeysetPagination
+    # FullTextSearchFilter must run after OrderingFilter so it can apply relevance ordering
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['category', 'tags', 'author', 'status', 'is_featured']
-    search_fields = ['title', 'content', 'excerpt', 'author__name']
     ordering_fields = ['created_at', 'updated_at', 'published_at', 'views', 'likes', 'title']
     ordering = ['-created_at']
     
@@ -34,22 +109,15 @@ class BlogListView(generics.ListAPIView):
         """Get queryset with optional filtering."""
         queryset = Blog.objects.filter(status='published').select_related(
             'author', 'category'
-        ).prefetch_related('tags')
+        ).prefetch_related('tags').for_listing()
         
-        # Filter by search query
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) |
-                Q(content__icontains=search) |
-                Q(excerpt__icontains=search) |
-                Q(author__name__icontains=search)
-            )
+        # Full-text search (?search=) is applied by FullTextSearchFilter
         
         # Filter by tag
         tag = self.request.query_params.get('tag', None)
         if tag:
-            queryset = queryset.filter(tags__name__icontains=tag)
+            # Several of a post's tags can match the fragment.
+            queryset = queryset.filter(tags__name__icontains=tag).distinct()
         
         # Filter by category
         category = self.request.query_params.get('category', None)
@@ -61,26 +129,39 @@ class BlogListView(generics.ListAPIView):
         if author:
             queryset = queryset.filter(author__id=author)
         
-        return queryset.distinct()
+        return queryset
 
 
-class BlogDetailView(generics.RetrieveAPIView):
+class BlogDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
     """Retrieve a single blog post."""
     
     serializer_class = BlogDetailSerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
     
+    def get_validators(self, request, *args, **kwargs):
+        """Version the post by its own timestamp, what it embeds and its approved comments."""
+        self.blog_meta = get_object_or_404(blog_meta_queryset(), slug=self.kwargs['slug'])
+        tags = list(blog_tags_queryset(self.blog_meta))
+        return blog_validators(self.blog_meta, comment_version(self.blog_meta), tags)
+    
+    def on_not_modified(self, request):
+        """A revalidated read is still a view."""
+        record_view(request, self.blog_meta)
+    
     def get_queryset(self):
         """Get queryset for published blogs."""
         return Blog.objects.filter(status='published').select_related(
             'author', 'category'
-        ).prefetch_related('tags', 'comments__author')
+        ).prefetch_related(
+            'tags',
+            Prefetch('comments', queryset=approved_comments(), to_attr='approved_comments')
+        )
     
     def retrieve(self, request, *args, **kwargs):
-        """Retrieve blog and increment view count."""
+        """Retrieve blog and record a (buffered) view."""
         instance = self.get_object()
-        instance.increment_views()
+        record_view(request, instance)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
@@ -131,7 +212,9 @@ class UserBlogListView(generics.ListAPIView):
     """List blog posts by a specific user."""
     
     serializer_class = BlogListSerializer
+    authentication_classes = [StatelessReadJWTAuthentication]
     permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         """Get queryset for user's published blogs."""
@@ -139,53 +222,81 @@ class UserBlogListView(generics.ListAPIView):
         return Blog.objects.filter(
             author_id=user_id,
             status='published'
-        ).select_related('author', 'category').prefetch_related('tags')
+        ).select_related('author', 'category').prefetch_related('tags').for_listing()
 
 
 class MyBlogListView(generics.ListAPIView):
     """List current user's blog posts."""
     
     serializer_class = BlogListSerializer
+    authentication_classes = [StatelessReadJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         """Get queryset for current user's blogs."""
-        return Blog.objects.filter(author=self.request.user).select_related(
+        return Blog.objects.filter(author_id=self.request.user.pk).select_related(
             'author', 'category'
-        ).prefetch_related('tags')
+        ).prefetch_related('tags').for_listing()
 
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(ConditionalGetMixin, generics.ListAPIView):
     """List all categories."""
     
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
-    queryset = Category.objects.annotate(blog_count=Count('blogs'))
+    queryset = Category.objects.all()
+    
+    def get_validators(self, request, *args, **kwargs):
+        """Version the list with a single aggregate over the table."""
+        return taxonomy_version(Category, request)
 
 
-class TagListView(generics.ListAPIView):
+class TagListView(ConditionalGetMixin, generics.ListAPIView):
     """List all tags."""
     
     serializer_class = TagSerializer
     permission_classes = [AllowAny]
-    queryset = Tag.objects.annotate(blog_count=Count('blogs'))
+    queryset = Tag.objects.all()
+    
+    def get_validators(self, request, *args, **kwargs):
+        """Version the list with a single aggregate over the table."""
+        return taxonomy_version(Tag, request)
 
 
-class CommentListView(generics.ListAPIView):
+class CommentListView(ConditionalGetMixin, generics.ListAPIView):
     """List comments for a blog post."""
     
     serializer_class = CommentSerializer
     permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
+    
+    def get_blog(self):
+        """The published blog whose comments are listed."""
+        if not hasattr(self, 'blog'):
+            self.blog = get_object_or_404(
+                Blog.objects.only('pk'), slug=self.kwargs.get('blog_slug'), status='published'
+            )
+        return self.blog
+    
+    def get_validators(self, request, *args, **kwargs):
+        """Version the thread list by its approved comments."""
+        return comment_list_validators(self.get_blog(), comment_version(self.get_blog()), request)
     
     def get_queryset(self):
         """Get queryset for blog comments."""
-        blog_slug = self.kwargs.get('blog_slug')
-        blog = get_object_or_404(Blog, slug=blog_slug, status='published')
-        return Comment.objects.filter(
+        blog = self.get_blog()
+        return approved_comments().filter(
             blog=blog,
-            is_approved=True,
-            parent=None  # Only top-level comments
-        ).select_related('author').prefetch_related('replies__author')
+            parent=None  # Only top-level comments; replies are attached per page
+        )
+    
+    def paginate_queryset(self, queryset):
+        """Load every reply of the page's threads with one extra query."""
+        page = super().paginate_queryset(queryset)
+        if page is None:
+            return None
+        return attach_threads(page)
 
 
 class CommentCreateView(generics.CreateAPIView):
@@ -234,35 +345,88 @@ class CommentDeleteView(generics.DestroyAPIView):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def like_blog(request, slug):
-    """Like a blog post."""
+    """Like a blog post (idempotent per user)."""
+    blog = get_object_or_404(Blog, slug=slug, status='published')
+    created = blog.add_like(request.user)
+    return Response({
+        'message': 'Blog post liked successfully' if created else 'Blog post already liked',
+        'liked': True,
+        'likes': blog.current_likes
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['POST', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def unlike_blog(request, slug):
+    """Remove the current user's like from a blog post (idempotent)."""
     blog = get_object_or_404(Blog, slug=slug, status='published')
-    blog.increment_likes()
+    removed = blog.remove_like(request.user)
     return Response({
-        'message': 'Blog post liked successfully',
-        'likes': blog.likes
+        'message': 'Blog post unliked successfully' if removed else 'Blog post was not liked',
+        'liked': False,
+        'likes': blog.current_likes
     }, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@authentication_classes([StatelessReadJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def liked_blogs(request):
+    """Return which of the given blog ids (?ids=1,2,3) the current user has liked."""
+    try:
+        blog_ids = [int(pk) for pk in request.query_params.get('ids', '').split(',') if pk.strip()]
+    except ValueError:
+        return Response({
+            'error': 'ids must be a comma-separated list of integers'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if len(blog_ids) > 100:
+        return Response({
+            'error': 'At most 100 ids can be checked at once'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    liked = BlogLike.objects.liked_blog_ids(request.user, blog_ids)
+    return Response({'liked': sorted(liked)})
+
+
+def featured_queryset():
+    """The featured posts listing."""
+    return Blog.objects.filter(
+        status='published',
+        is_featured=True
+    ).select_related('author', 'category').prefetch_related('tags').for_listing()[:6]
+
+
+def popular_queryset(window):
+    """The popular posts listing: trending over a window, or all-time views."""
+    if window == 'all':
+        blogs = Blog.objects.filter(status='published').order_by('-views')
+    else:
+        blogs = trending_blogs(window, 6)
+    return blogs.select_related('author', 'category').prefetch_related('tags').for_listing()[:6]
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def featured_blogs(request):
     """Get featured blog posts."""
-    blogs = Blog.objects.filter(
-        status='published',
-        is_featured=True
-    ).select_related('author', 'category').prefetch_related('tags')[:6]
+    def build():
+        return BlogListSerializer(featured_queryset(), many=True).data
     
-    serializer = BlogListSerializer(blogs, many=True)
-    return Response(serializer.data)
+    return Response(cached('featured', 'list', build))
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def popular_blogs(request):
-    """Get popular blog posts based on views."""
-    blogs = Blog.objects.filter(
-        status='published'
-    ).select_related('author', 'category').prefetch_related('tags').order_by('-views')[:6]
+    """Get popular blog posts: trending over ?window=day|week, or all-time views."""
+    window = request.query_params.get('window', 'all')
+    if window != 'all' and window not in WINDOW_FIELDS:
+        return Response({
+            'error': 'window must be one of: day, week, all'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    def build():
+        return BlogListSerializer(popular_queryset(window), many=True).data
     
-    serializer = BlogListSerializer(blogs, many=True)
-    return Response(serializer.data) 
\ No newline at end of file
+    return Response(cached('popular', f'list:{window}', build))
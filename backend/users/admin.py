@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.html import format_html
+from blog_project.images import variant_url
 from .models import User
 
 
@@ -36,7 +37,7 @@ class CustomUserAdmin(UserAdmin):
         if obj.avatar:
             return format_html(
                 '<img src="{}" width="30" height="30" style="border-radius: 50%;" />',
-                obj.avatar.url
+                variant_url(obj, 'avatar', 'thumb')
             )
         return format_html(
             '<div style="width: 30px; height: 30px; background-color: #e5e7eb; '
@@ -0,0 +1,108 @@
+"""
+JWT authentication without a user query on every request.
+
+CachedJWTAuthentication resolves the token's user through the cache
+(USER_AUTH_CACHE['TIMEOUT'] seconds) instead of querying users_user on
+every authenticated request. Cached users are dropped whenever the user is
+saved or deleted (see users/signals.py), so profile, password and
+is_active changes take effect on the next request.
+
+That only holds for a cache shared by all workers. A process-local cache
+(LocMemCache, the default) is only cleared in the worker that saved the
+user, so there entries live at most LOCAL_TIMEOUT seconds: a password
+change or deactivation reaches the other workers within that time.
+
+StatelessReadJWTAuthentication skips the lookup entirely for read-only
+requests and authenticates them as a TokenUser built from the token's
+claims (id only). It is meant for views that only need the user's id on
+GET; writes still resolve the real user. Because nothing is looked up, a
+deactivated user's token keeps working on those reads until it expires.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'TIMEOUT': 60,
+    'LOCAL_TIMEOUT': 5,
+    'KEY_PREFIX': 'auth-user',
+}
+
+
+def auth_cache_setting(name):
+    """Read a USER_AUTH_CACHE setting, falling back to the module defaults."""
+    return getattr(settings, 'USER_AUTH_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def get_cache():
+    return caches[auth_cache_setting('ALIAS')]
+
+
+def user_cache_timeout(cache):
+    """How long to cache a user; short when forget_user() cannot reach other workers."""
+    timeout = auth_cache_setting('TIMEOUT')
+    if isinstance(cache, LocMemCache):
+        return min(timeout, auth_cache_setting('LOCAL_TIMEOUT'))
+    return timeout
+
+
+def user_cache_key(user_id):
+    return f"{auth_cache_setting('KEY_PREFIX')}:{user_id}"
+
+
+def forget_user(user_id):
+    """Drop a cached user so the next request loads it from the database."""
+    get_cache().delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that caches the resolved user for a short time."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        cache = get_cache()
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            # The database path runs all of simplejwt's checks before caching.
+            user = super().get_user(validated_token)
+            cache.set(key, user, timeout=user_cache_timeout(cache))
+            return user
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
+
+
+class StatelessReadJWTAuthentication(CachedJWTAuthentication):
+    """Authenticate safe-method requests from the token claims alone."""
+
+    def authenticate(self, request):
+        if request.method not in SAFE_METHODS:
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        return api_settings.TOKEN_USER_CLASS(validated_token), validated_token
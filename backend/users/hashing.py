@@ -0,0 +1,253 @@
+"""
+Bounded password hashing.
+
+Password hashing is deliberately CPU-expensive. PooledPBKDF2PasswordHasher
+runs every PBKDF2 computation (login, registration, password changes and
+Django's dummy hash for unknown users) on a small dedicated thread pool
+instead of the request thread:
+
+* at most PASSWORD_HASHING['GLOBAL_LIMIT'] hashes run at once across all
+  processes sharing the cache: each hash first leases one of that many
+  slot keys with cache.add(), and a request that finds none free is
+  rejected before it hashes;
+* at most PASSWORD_HASHING['MAX_WORKERS'] hashes run at once per process
+  (hashlib releases the GIL, so this caps the cores auth can take);
+* at most PASSWORD_HASHING['MAX_QUEUE'] more may wait for a worker;
+* anything beyond that is rejected immediately with 503 and Retry-After,
+  so a login burst cannot occupy every request worker and starve reads.
+
+The per-process pool only queues requests of a process serving several at
+once (threaded or async workers). A sync worker serves one request at a
+time, so with several of them only the shared slots bound the burst. Those
+need a cache shared by all workers: with a process-local cache
+(LocMemCache, the default) the slots are skipped, and the pool is the only
+limit. A slot is leased for SLOT_TIMEOUT seconds, so one left behind by a
+killed worker frees itself.
+
+The iteration count is configurable (PASSWORD_HASHING['ITERATIONS']);
+stored hashes with a different count are upgraded on the next login.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MAX_WORKERS': 2,
+    'MAX_QUEUE': 16,
+    'QUEUE_TIMEOUT': 5.0,
+    'RETRY_AFTER': 1,
+    'ITERATIONS': PBKDF2PasswordHasher.iterations,
+    # Hashes at once across every process sharing the cache; 0 turns the slots off.
+    'GLOBAL_LIMIT': 4,
+    'SLOT_TIMEOUT': 30,
+    'CACHE_ALIAS': 'default',
+    'KEY_PREFIX': 'password-hash-slot',
+}
+
+
+def hashing_setting(name):
+    """Read a PASSWORD_HASHING setting, falling back to the module defaults."""
+    return getattr(settings, 'PASSWORD_HASHING', {}).get(name, DEFAULTS[name])
+
+
+class HashingUnavailable(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Authentication is temporarily overloaded, please retry shortly.'
+    default_code = 'hashing_unavailable'
+
+    def __init__(self, detail=None, code=None):
+        super().__init__(detail, code)
+        # DRF's exception handler turns `wait` into a Retry-After header.
+        self.wait = hashing_setting('RETRY_AFTER')
+
+
+class SharedSlots:
+    """GLOBAL_LIMIT slot keys in the shared cache; holding one allows one hash."""
+
+    @property
+    def cache(self):
+        return caches[hashing_setting('CACHE_ALIAS')]
+
+    @property
+    def limit(self):
+        return hashing_setting('GLOBAL_LIMIT')
+
+    def enabled(self):
+        """Only a cache every worker sees can bound them all."""
+        return bool(self.limit) and not isinstance(self.cache, LocMemCache)
+
+    def keys(self):
+        prefix = hashing_setting('KEY_PREFIX')
+        return [f'{prefix}:{number}' for number in range(self.limit)]
+
+    def acquire(self):
+        """Lease a free slot and return its key, or None if all are taken."""
+        keys = self.keys()
+        # Start at a random slot so concurrent requests do not all race for the first.
+        start = random.randrange(len(keys))
+        for key in keys[start:] + keys[:start]:
+            if self.cache.add(key, os.getpid(), timeout=hashing_setting('SLOT_TIMEOUT')):
+                return key
+        return None
+
+    def release(self, key):
+        self.cache.delete(key)
+
+    def in_use(self):
+        return len(self.cache.get_many(self.keys()))
+
+
+class HashingPool:
+    """A thread pool with a hard cap on running plus waiting jobs, behind the shared slots."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+        self._slots = None
+        self.shared_slots = SharedSlots()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.globally_rejected = 0
+        self.in_flight = 0
+        self.running = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_seconds = 0.0
+        self.hash_seconds = 0.0
+
+    def _ensure_started(self):
+        """Create the executor once per process (forked workers included)."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self.max_workers = hashing_setting('MAX_WORKERS')
+            self.capacity = self.max_workers + hashing_setting('MAX_QUEUE')
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password-hash')
+            self._slots = threading.BoundedSemaphore(self.capacity)
+            self._pid = pid
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool, or raise HashingUnavailable if it or the shared slots are saturated."""
+        self._ensure_started()
+        shared_slot = None
+        if self.shared_slots.enabled():
+            shared_slot = self.shared_slots.acquire()
+            if shared_slot is None:
+                with self._lock:
+                    self.globally_rejected += 1
+                logger.warning(
+                    'All %d shared password hashing slots taken; request rejected', self.shared_slots.limit
+                )
+                raise HashingUnavailable()
+
+        def release_shared_slot():
+            if shared_slot is not None:
+                self.shared_slots.release(shared_slot)
+
+        if not self._slots.acquire(blocking=False):
+            release_shared_slot()
+            with self._lock:
+                self.rejected += 1
+            logger.warning('Password hashing pool saturated (%d in flight); request rejected', self.capacity)
+            raise HashingUnavailable()
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        def job():
+            started = time.perf_counter()
+            with self._lock:
+                self.running += 1
+                self.wait_seconds += started - submitted
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.in_flight -= 1
+                    self.completed += 1
+                    self.hash_seconds += time.perf_counter() - started
+                self._slots.release()
+                release_shared_slot()
+
+        try:
+            future = self._executor.submit(job)
+        except BaseException:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+            release_shared_slot()
+            raise
+        try:
+            return future.result(timeout=hashing_setting('QUEUE_TIMEOUT'))
+        except FutureTimeoutError:
+            # The job still finishes (and frees its slots); this request gives up.
+            with self._lock:
+                self.timed_out += 1
+            raise HashingUnavailable()
+
+    def stats(self):
+        """
+        Snapshot of the pool's load and counters.
+
+        Everything except 'shared' is for this process only (see 'pid');
+        'shared' reads the slots every process leases from the cache.
+        """
+        self._ensure_started()
+        shared = {'enabled': self.shared_slots.enabled(), 'limit': self.shared_slots.limit, 'in_use': None}
+        if shared['enabled']:
+            shared['in_use'] = self.shared_slots.in_use()
+        with self._lock:
+            completed = self.completed
+            return {
+                'scope': 'process',
+                'pid': os.getpid(),
+                'max_workers': self.max_workers,
+                'capacity': self.capacity,
+                'in_flight': self.in_flight,
+                'running': self.running,
+                'queued': self.in_flight - self.running,
+                'peak_in_flight': self.peak_in_flight,
+                'completed': completed,
+                'rejected': self.rejected,
+                'globally_rejected': self.globally_rejected,
+                'timed_out': self.timed_out,
+                'avg_wait_ms': round(self.wait_seconds / completed * 1000, 2) if completed else None,
+                'avg_hash_ms': round(self.hash_seconds / completed * 1000, 2) if completed else None,
+                'shared': shared,
+            }
+
+
+hashing_pool = HashingPool()
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with a configurable cost, computed on the bounded hashing pool."""
+
+    @property
+    def iterations(self):
+        return hashing_setting('ITERATIONS')
+
+    def encode(self, password, salt, iterations=None):
+        return hashing_pool.run(super().encode, password, salt, iterations)
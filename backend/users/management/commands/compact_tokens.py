@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    """Purge expired outstanding and blacklisted refresh tokens in small batches."""
+
+    help = (
+        'Delete expired refresh tokens from the outstanding and blacklist tables '
+        '(run periodically, e.g. nightly from cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tokens deleted per transaction.')
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help='Seconds to sleep between batches to leave room for other writers.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many tokens would be deleted.')
+
+    def handle(self, *args, **options):
+        expired = OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+        if options['dry_run']:
+            blacklisted = BlacklistedToken.objects.filter(token__in=expired).count()
+            self.stdout.write(f'{expired.count()} expired tokens ({blacklisted} blacklisted) would be deleted.')
+            return
+
+        batch_size = options['batch_size']
+        outstanding = blacklisted = 0
+        last_id = 0
+        while True:
+            ids = list(
+                expired.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                outstanding += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            last_id = ids[-1]
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {outstanding} expired outstanding tokens and {blacklisted} blacklisted tokens.'
+        ))
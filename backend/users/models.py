@@ -55,6 +55,12 @@ class User(AbstractUser):
         verbose_name='Profile picture',
         help_text='Upload a profile picture (optional).'
     )
+    avatar_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text='Storage names of the resized variants (see blog_project/images.py)'
+    )
     
     bio = models.TextField(
         max_length=500,
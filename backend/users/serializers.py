@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from blog_project.images import ImageVariantsField
 from .models import User
+from .tokens import RefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -74,10 +77,12 @@ class UserLoginSerializer(serializers.Serializer):
 class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile."""
     
+    avatar_variants = ImageVariantsField()
+    
     class Meta:
         model = User
         fields = (
-            'id', 'email', 'name', 'avatar', 'bio', 'website',
+            'id', 'email', 'name', 'avatar', 'avatar_variants', 'bio', 'website',
             'twitter', 'linkedin', 'github', 'date_joined',
             'last_login', 'created_at', 'updated_at'
         )
@@ -132,4 +137,10 @@ class ChangePasswordSerializer(serializers.Serializer):
         user = self.context['request'].user
         if not user.check_password(value):
             raise serializers.ValidationError("Old password is not correct.")
-        return value 
\ No newline at end of file
+        return value
+
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """Refresh (and rotate) using the filtered blacklist check."""
+    
+    token_class = RefreshToken
@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from blog_project import images
+from blog_project.replicas import pin_user
+
+from .authentication import forget_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    """Profile, password and is_active changes must not be served from the auth cache."""
+    user_id = instance.pk
+    forget_user(user_id)
+    # A request may re-cache the old row before the change commits; drop it again after.
+    transaction.on_commit(lambda: forget_user(user_id))
+
+
+@receiver(post_save, sender=User)
+def pin_new_user_to_primary(sender, instance, created=False, raw=False, **kwargs):
+    """A new account is not on the replicas yet; read it from the primary until it is."""
+    if created and not raw:
+        user_id = instance.pk
+        transaction.on_commit(lambda: pin_user(user_id))
+
+
+@receiver(pre_save, sender=User)
+def clear_avatar_variants(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Forget the resized variants of a replaced or removed avatar."""
+    if raw:
+        return
+    images.clear_stale_variants(instance, 'avatar', update_fields)
+
+
+@receiver(post_save, sender=User)
+def schedule_avatar_variants(sender, instance, update_fields=None, raw=False, using='default', **kwargs):
+    """Resize a new avatar in the background once the save commits."""
+    if raw:
+        return
+    images.schedule(instance, 'avatar', update_fields, using=using)
+
+
+@receiver(images.variants_generated, sender=User)
+def forget_user_on_variants(sender, pk, **kwargs):
+    """Variants are stored with a queryset update, which the save signals above never see."""
+    forget_user(pk)
+
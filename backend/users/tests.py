@@ -0,0 +1,54 @@
+import tempfile
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from .hashing import HashingPool, HashingUnavailable
+
+SHARED_CACHE = {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': tempfile.mkdtemp(prefix='hash-slots-'),
+}
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}, 'shared': SHARED_CACHE},
+    PASSWORD_HASHING={'CACHE_ALIAS': 'shared', 'GLOBAL_LIMIT': 2, 'MAX_WORKERS': 2},
+)
+class SharedHashingSlotTests(SimpleTestCase):
+    """The shared slots bound hashes across processes; another worker is simulated by leasing keys directly."""
+
+    def setUp(self):
+        self.pool = HashingPool()
+        self.cache = caches['shared']
+        self.cache.clear()
+        self.addCleanup(self.cache.clear)
+
+    def test_hash_holds_a_slot_only_while_it_runs(self):
+        in_use = []
+        self.assertEqual(self.pool.run(lambda: in_use.append(self.pool.shared_slots.in_use()) or 'hash'), 'hash')
+        self.assertEqual(in_use, [1])
+        self.assertEqual(self.pool.shared_slots.in_use(), 0)
+
+    def test_rejects_when_other_workers_hold_every_slot(self):
+        for key in self.pool.shared_slots.keys():
+            self.cache.add(key, 'other worker')
+        with self.assertRaises(HashingUnavailable), self.assertLogs('users.hashing', 'WARNING'):
+            self.pool.run(lambda: 'hash')
+        stats = self.pool.stats()
+        self.assertEqual((stats['globally_rejected'], stats['completed']), (1, 0))
+        self.assertEqual(stats['shared'], {'enabled': True, 'limit': 2, 'in_use': 2})
+
+        self.cache.delete(self.pool.shared_slots.keys()[0])
+        self.assertEqual(self.pool.run(lambda: 'hash'), 'hash')
+
+    def test_failed_hash_frees_its_slot(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.pool.run(lambda: 1 / 0)
+        self.assertEqual(self.pool.shared_slots.in_use(), 0)
+
+    @override_settings(PASSWORD_HASHING={'CACHE_ALIAS': 'default', 'GLOBAL_LIMIT': 2})
+    def test_process_local_cache_skips_the_slots(self):
+        self.assertFalse(self.pool.shared_slots.enabled())
+        self.assertEqual(self.pool.run(lambda: 'hash'), 'hash')
+        self.assertEqual(self.pool.stats()['shared']['in_use'], None)
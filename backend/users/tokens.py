@@ -0,0 +1,207 @@
+"""
+Refresh tokens with an in-memory blacklist filter.
+
+With ROTATE_REFRESH_TOKENS and BLACKLIST_AFTER_ROTATION every refresh
+blacklists the old token, and simplejwt checks the blacklist with a
+database query on every refresh. RefreshToken here first asks a per-process
+Bloom filter of blacklisted JTIs: a JTI the filter has never seen cannot be
+blacklisted, so only filter hits (real ones plus ~ERROR_RATE false
+positives) reach the database.
+
+The filter is warmed from the database on first use, updated in place when
+this process blacklists a token, and picks up tokens blacklisted by other
+processes when the shared version counter in the cache changes (and at
+least every MAX_STALENESS seconds). It is rebuilt every REBUILD_INTERVAL
+seconds, which also drops JTIs purged by `manage.py compact_tokens`.
+
+A miss is only trusted when the version counter lives in a cache shared by
+all workers. With a process-local cache (LocMemCache) another worker's
+blacklisting would go unseen for up to MAX_STALENESS seconds, enough to
+replay a rotated refresh token, so every check then goes to the database.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'KEY_PREFIX': 'token-blacklist',
+    'CAPACITY': 100000,
+    'ERROR_RATE': 0.001,
+    'MAX_STALENESS': 5,
+    'REBUILD_INTERVAL': 3600,
+    # Blacklist rows are re-read this far behind the newest id seen, so rows
+    # whose transactions commit out of id order are not missed.
+    'ID_LOOKBACK': 20,
+}
+
+
+def blacklist_setting(name):
+    """Read a TOKEN_BLACKLIST setting, falling back to the module defaults."""
+    return getattr(settings, 'TOKEN_BLACKLIST', {}).get(name, DEFAULTS[name])
+
+
+def get_cache():
+    return caches[blacklist_setting('ALIAS')]
+
+
+def version_key():
+    return f"{blacklist_setting('KEY_PREFIX')}:version"
+
+
+def blacklist_version():
+    return get_cache().get(version_key(), 0)
+
+
+def bump_blacklist_version():
+    """Tell every process's filter that new tokens were blacklisted; return the new version."""
+    cache = get_cache()
+    try:
+        return cache.incr(version_key())
+    except ValueError:
+        if cache.add(version_key(), 1, timeout=None):
+            return 1
+        return cache.incr(version_key())
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter of strings."""
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(value))
+
+
+class BlacklistFilter:
+    """Per-process Bloom filter over the JTIs of unexpired blacklisted tokens."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.bloom = None
+        self.last_id = 0
+        self.version = None
+        self.synced_at = 0.0
+        self.built_at = 0.0
+
+    def might_contain(self, jti):
+        """False means the JTI is certainly not blacklisted."""
+        if isinstance(get_cache(), LocMemCache):
+            # Other workers' blacklistings never reach this process's cache.
+            return True
+        self.sync()
+        return jti in self.bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+    def blacklisted_here(self):
+        """Publish a blacklisting done by this process (after it was added locally)."""
+        version = bump_blacklist_version()
+        with self._lock:
+            # Nobody else blacklisted anything since our last sync: no need to re-read.
+            if self.version is not None and version == self.version + 1:
+                self.version = version
+
+    def sync(self):
+        version = blacklist_version()
+        now = time.monotonic()
+        bloom = self.bloom
+        if (
+            bloom is not None
+            and version == self.version
+            and now - self.synced_at < blacklist_setting('MAX_STALENESS')
+        ):
+            return
+        with self._lock:
+            if (
+                self.bloom is None
+                or self.bloom.count > self.bloom.capacity
+                or now - self.built_at >= blacklist_setting('REBUILD_INTERVAL')
+            ):
+                self.rebuild(version, now)
+            elif version != self.version or now - self.synced_at >= blacklist_setting('MAX_STALENESS'):
+                self.load_since(self.last_id - blacklist_setting('ID_LOOKBACK'))
+                self.version = version
+                self.synced_at = now
+
+    def rebuild(self, version, now):
+        live = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        expected = live.count()
+        bloom = BloomFilter(max(blacklist_setting('CAPACITY'), expected * 2), blacklist_setting('ERROR_RATE'))
+        last_id = 0
+        for pk, jti in live.order_by().values_list('id', 'token__jti').iterator(chunk_size=5000):
+            bloom.add(jti)
+            last_id = max(last_id, pk)
+        self.bloom = bloom
+        self.last_id = last_id
+        self.version = version
+        self.synced_at = self.built_at = now
+
+    def load_since(self, last_id):
+        rows = BlacklistedToken.objects.filter(id__gt=last_id).values_list('id', 'token__jti')
+        for pk, jti in rows:
+            if jti not in self.bloom:
+                self.bloom.add(jti)
+            self.last_id = max(self.last_id, pk)
+
+
+blacklist_filter = BlacklistFilter()
+
+
+class RefreshToken(BaseRefreshToken):
+    """A refresh token whose blacklist check skips the database when it can."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if not blacklist_filter.might_contain(jti):
+            return
+        if BlacklistedToken.objects.filter(token__jti=jti).exists():
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        token, _ = OutstandingToken.objects.get_or_create(
+            jti=jti,
+            defaults={'token': str(self), 'expires_at': datetime_from_epoch(self.payload['exp'])},
+        )
+        # A single INSERT instead of get_or_create; blacklisting twice is harmless.
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token)], ignore_conflicts=True)
+        blacklist_filter.add(jti)
+        transaction.on_commit(blacklist_filter.blacklisted_here)
+        return token
@@ -7,7 +7,8 @@ from .views import (
     ProfileView,
     UpdateProfileView,
     ChangePasswordView,
-    get_current_user
+    get_current_user,
+    hashing_stats
 )
 
 urlpatterns = [
@@ -22,4 +23,7 @@ urlpatterns = [
     path('profile/update/', UpdateProfileView.as_view(), name='update_profile'),
     path('profile/change-password/', ChangePasswordView.as_view(), name='change_password'),
     path('me/', get_current_user, name='current_user'),
+    
+    # Operations
+    path('hashing-stats/', hashing_stats, name='hashing_stats'),
 ] 
\ No newline at end of file
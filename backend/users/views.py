@@ -1,9 +1,10 @@
 from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from .hashing import hashing_pool
+from .tokens import RefreshToken
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -153,4 +154,11 @@ class ChangePasswordView(generics.UpdateAPIView):
 def get_current_user(request):
     """Get current user information."""
     serializer = UserProfileSerializer(request.user)
-    return Response(serializer.data) 
\ No newline at end of file
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def hashing_stats(request):
+    """Load and rejection counters of the hashing pool of the process serving this request, plus the shared slots."""
+    return Response(hashing_pool.stats())